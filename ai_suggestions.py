@@ -2,62 +2,31 @@
 # Analyzes project history to detect procrastination patterns and provide personalized tips
 
 from datetime import datetime, timedelta
+from analytics import ProjectFrame, pattern_stats
 
-def analyze_patterns(projects):
+def analyze_patterns(projects, frame=None):
     """
     Analyze project history to detect procrastination patterns.
     Returns a list of detected pattern objects with type and details.
+    `frame` is an analytics ProjectFrame covering `projects` (built on the fly when omitted).
     """
     if not projects:
         return []
     
     patterns = []
     
-    # Filter completed projects for analysis
-    completed = []
-    late_projects = []
-    
-    today = datetime.now().date()
-    
-    for p in projects:
-        tasks = p.get('tasks', [])
-        if not tasks:
-            continue
-        
-        completion = sum(1 for t in tasks if t.get('completed', False)) / len(tasks)
-        
-        start_d = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-        end_d = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-        
-        if completion >= 1.0:
-            completed.append({
-                'project': p,
-                'start': start_d,
-                'end': end_d,
-                'duration': (end_d - start_d).days + 1,
-                'completion': completion
-            })
-        elif today > end_d:
-            late_projects.append({
-                'project': p,
-                'start': start_d,
-                'end': end_d,
-                'duration': (end_d - start_d).days + 1,
-                'delay': (today - end_d).days,
-                'completion': completion
-            })
+    # Completed / late counts and the other aggregates, over projects that have tasks
+    if frame is None:
+        frame = ProjectFrame.from_projects(projects)
+    stats = pattern_stats(frame, frame.rows(projects), datetime.now().date())
+    completed_count, late_count = stats['completed'], stats['late']
     
     # Pattern 1: Weekend Procrastinator
     # Check if most delays correlate with weekend start dates
-    weekend_delays = 0
-    weekday_delays = 0
-    for lp in late_projects:
-        if lp['start'].weekday() >= 5:  # Saturday=5, Sunday=6
-            weekend_delays += 1
-        else:
-            weekday_delays += 1
+    weekend_delays = stats['weekend_delays']
+    weekday_delays = stats['weekday_delays']
     
-    if len(late_projects) >= 3 and weekend_delays > weekday_delays:
+    if late_count >= 3 and weekend_delays > weekday_delays:
         patterns.append({
             'type': 'weekend_procrastinator',
             'title': '📅 Weekend Procrastinator',
@@ -66,13 +35,10 @@ def analyze_patterns(projects):
         })
     
     # Pattern 2: Long Project Avoider
-    # Check if longer projects have lower completion rates
-    long_projects = [p for p in late_projects if p['duration'] > 14]
-    short_projects = [p for p in completed if p['duration'] <= 7]
-    
-    if len(long_projects) >= 2 and len(short_projects) >= 2:
-        long_avg_comp = sum(p['completion'] for p in long_projects) / len(long_projects) if long_projects else 1.0
-        short_avg_comp = sum(p['completion'] for p in short_projects) / len(short_projects) if short_projects else 0
+    # Check if longer projects (late, >2 weeks) have lower completion than short completed ones (<=1 week)
+    if stats['long_late'] >= 2 and stats['short_done'] >= 2:
+        long_avg_comp = stats['long_late_completion']
+        short_avg_comp = stats['short_done_completion']
         
         if long_avg_comp < 0.5 and short_avg_comp > 0.8:
             patterns.append({
@@ -84,8 +50,8 @@ def analyze_patterns(projects):
     
     # Pattern 3: Deadline Sprinter
     # Check if tasks are completed close to deadline (would need task timestamps - simplified version)
-    if len(late_projects) >= 2:
-        avg_delay = sum(p['delay'] for p in late_projects) / len(late_projects)
+    if late_count >= 2:
+        avg_delay = stats['avg_delay']
         if avg_delay > 3:
             patterns.append({
                 'type': 'deadline_sprinter',
@@ -95,15 +61,15 @@ def analyze_patterns(projects):
             })
     
     # Pattern 4: High Performer (Positive!) - More lenient
-    if len(completed) >= 2 and len(late_projects) == 0:
+    if completed_count >= 2 and late_count == 0:
         patterns.append({
             'type': 'high_performer',
             'title': '🌟 Rhythm Master',
-            'description': f'Excellent! {len(completed)} projects completed on time.',
+            'description': f'Excellent! {completed_count} projects completed on time.',
             'tip': 'Keep up the great work! Consider setting more ambitious goals.'
         })
-    elif len(completed) >= 1 and len(late_projects) <= 1:
-        on_time_rate = len(completed) / (len(completed) + len(late_projects)) * 100 if (len(completed) + len(late_projects)) > 0 else 100
+    elif completed_count >= 1 and late_count <= 1:
+        on_time_rate = completed_count / (completed_count + late_count) * 100 if (completed_count + late_count) > 0 else 100
         patterns.append({
             'type': 'good_progress',
             'title': '👍 Making Progress',
@@ -123,7 +89,7 @@ def analyze_patterns(projects):
     # Default: If still no patterns, add a general encouraging message
     if not patterns:
         total_projects = len(projects)
-        active_count = total_projects - len(completed) - len(late_projects)
+        active_count = total_projects - completed_count - late_count
         if active_count > 0:
             patterns.append({
                 'type': 'keep_going',
@@ -0,0 +1,321 @@
+# Pacer Analytics
+# Columnar (NumPy) view of the projects for the KPI panels: one array per field instead of a loop over
+# Project objects per metric. Days are stored as proleptic ordinals (date.toordinal()), 0 = no date.
+# The store keeps one ProjectFrame and syncs it when the projects/deleted revisions move. The store's
+# mutation paths record which projects they changed, so a sync normally rewrites just those rows; only
+# when that isn't known (first sync, a merge from disk) does it compare every project's fields. The KPI functions take the frame plus an array of row
+# numbers (see ProjectFrame.rows) and return plain Python numbers.
+
+from itertools import chain
+from collections import OrderedDict
+import threading
+from typing import NamedTuple
+import numpy as np
+
+# Column name -> dtype
+COLUMNS = {
+    "start": np.int32,      # start_day ordinal
+    "end": np.int32,        # end_day ordinal
+    "completed": np.int32,  # completed_day ordinal, 0 if never completed
+    "done": np.int32,       # completed tasks
+    "total": np.int32,      # tasks
+    "tag": np.int32,        # code of the first tag (see tag_names), -1 if untagged
+    "deleted": np.bool_,    # in the recycle bin
+    "used": np.bool_,       # row holds a project (False for freed rows)
+}
+
+
+def _ordinal(day):
+    return day.toordinal() if day is not None else 0
+
+
+def weekday(ordinals):
+    """Monday=0 .. Sunday=6 for an array of day ordinals (ordinal 1 is a Monday)."""
+    return (ordinals - 1) % 7
+
+
+class ProjectFrame:
+    """Live and binned projects as parallel arrays; freed rows are reused."""
+
+    def __init__(self):
+        self._capacity = 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        self._row = {}     # project id -> row number
+        self._sig = {}     # project id -> field values last written to its row
+        self._free = []
+        self.tag_names = []
+        self._tag_codes = {}
+        self.synced_at = None  # (projects revision, deleted revision) of the last sync
+
+    def __len__(self):
+        return len(self._row)
+
+    @classmethod
+    def from_projects(cls, projects, deleted=()):
+        frame = cls()
+        frame._apply(projects, deleted)
+        return frame
+
+    def sync(self, store, ids=None):
+        """
+        Bring the frame up to date with the store; a no-op while its project revisions are unchanged.
+        `ids` are the only projects changed since the last sync, or None to check every project.
+        """
+        key = (store.revisions["projects"], store.revisions["deleted"])
+        if key != self.synced_at:
+            if ids is None or self.synced_at is None:
+                self._apply(store.projects, store.deleted)
+            else:
+                self._update(store, ids)
+            self.synced_at = key
+        return self
+
+    def _tag_code(self, project):
+        if not project.tags:
+            return -1
+        tag = project.tags[0]
+        code = self._tag_codes.get(tag)
+        if code is None:
+            code = self._tag_codes[tag] = len(self.tag_names)
+            self.tag_names.append(tag)
+        return code
+
+    def _grow(self, needed):
+        capacity = max(needed, self._capacity * 2, 64)
+        for name in COLUMNS:
+            col = getattr(self, name)
+            grown = np.zeros(capacity, dtype=col.dtype)
+            grown[:len(col)] = col
+            setattr(self, name, grown)
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+
+    def _write(self, p, is_deleted):
+        sig = (p.start_day, p.end_day, p.completed_day, p.done_count, p.total_count,
+               p.tags[0] if p.tags else None, is_deleted)
+        if self._sig.get(p.id) == sig:
+            return
+        row = self._row.get(p.id)
+        if row is None:
+            if not self._free:
+                self._grow(len(self._row) + 1)
+            row = self._row[p.id] = self._free.pop()
+        self.start[row] = _ordinal(p.start_day)
+        self.end[row] = _ordinal(p.end_day)
+        self.completed[row] = _ordinal(p.completed_day)
+        self.done[row] = p.done_count
+        self.total[row] = p.total_count
+        self.tag[row] = self._tag_code(p)
+        self.deleted[row] = is_deleted
+        self.used[row] = True
+        self._sig[p.id] = sig
+
+    def _release(self, pid):
+        row = self._row.pop(pid)
+        self.used[row] = False
+        self._free.append(row)
+        del self._sig[pid]
+
+    def _apply(self, projects, deleted):
+        seen = set()
+        for p, is_deleted in chain(((p, False) for p in projects), ((p, True) for p in deleted)):
+            seen.add(p.id)
+            self._write(p, is_deleted)
+        for pid in [pid for pid in self._row if pid not in seen]:
+            self._release(pid)
+
+    def _update(self, store, ids):
+        """Rewrite (or free) just the rows of the projects `ids`."""
+        for pid in ids:
+            p, is_deleted = store.projects.get(pid), False
+            if p is None:
+                p, is_deleted = store.deleted.get(pid), True
+            if p is not None:
+                self._write(p, is_deleted)
+            elif pid in self._row:
+                self._release(pid)
+
+    def rows(self, projects=None):
+        """Row numbers of `projects` (default: every live project), as an index array."""
+        if projects is None:
+            return np.flatnonzero(self.used & ~self.deleted)
+        get = self._row.get
+        return np.fromiter((r for r in map(get, (p.id for p in projects)) if r is not None), dtype=np.intp)
+
+
+# --- KPIs ---
+# Same definitions as the per-project calculators they replace (completion, status, rhythm, debt).
+
+def _completion(frame, rows):
+    total = frame.total[rows]
+    return np.divide(frame.done[rows], total, out=np.zeros(len(rows)), where=total > 0)
+
+
+def _fully_done(frame, rows):
+    total = frame.total[rows]
+    return (total > 0) & (frame.done[rows] >= total)
+
+
+def period_stats(frame, rows, today):
+    """
+    KPI panel numbers for a set of projects:
+    (count, avg completion, early rate, on-time rate, late rate, avg days late of the late ones).
+    """
+    cnt = len(rows)
+    if not cnt:
+        return 0, 0, 0, 0, 0, 0
+    today = today.toordinal()
+    end, completed = frame.end[rows], frame.completed[rows]
+    done = _fully_done(frame, rows)
+    early = done & (completed > 0) & (completed < end)
+    late = ~done & (today > end)
+    late_cnt = int(late.sum())
+    total_delay = int((today - end[late]).sum())
+    return (
+        cnt,
+        float(_completion(frame, rows).mean()),
+        int(early.sum()) / cnt,
+        int((done & ~early).sum()) / cnt,
+        late_cnt / cnt,
+        total_delay / late_cnt if late_cnt else 0,
+    )
+
+
+def _finish_days(frame, done_rows, today):
+    """Completion day of each fully done project (today when completed_at was never set)."""
+    completed = frame.completed[done_rows]
+    return np.where(completed > 0, completed, today.toordinal())
+
+
+def _rhythm(frame, done_rows, finished):
+    if not len(done_rows):
+        return 100  # No completed projects = perfect rhythm (no failures)
+    return int((int((finished <= frame.end[done_rows]).sum()) / len(done_rows)) * 100)
+
+
+def _debt(frame, done_rows, finished):
+    return int((frame.end[done_rows].astype(np.int64) - finished).sum())
+
+
+def rhythm_score(frame, rows, today):
+    """Share (0-100) of the completed projects that finished on or before their end date."""
+    done_rows = rows[_fully_done(frame, rows)]
+    return _rhythm(frame, done_rows, _finish_days(frame, done_rows, today))
+
+
+def time_debt(frame, rows, today):
+    """Days finished ahead of plan (positive) or behind it (negative), summed over completed projects."""
+    done_rows = rows[_fully_done(frame, rows)]
+    return _debt(frame, done_rows, _finish_days(frame, done_rows, today))
+
+
+def pattern_stats(frame, rows, today):
+    """Aggregates behind analyze_patterns(), over the projects that have tasks."""
+    rows = rows[frame.total[rows] > 0]
+    today = today.toordinal()
+    start, end = frame.start[rows], frame.end[rows]
+    completion = _completion(frame, rows)
+    done = completion >= 1.0
+    late = ~done & (today > end)
+    duration = end - start + 1
+    weekend = weekday(start) >= 5
+    long_late = late & (duration > 14)
+    short_done = done & (duration <= 7)
+    return {
+        "completed": int(done.sum()),
+        "late": int(late.sum()),
+        "weekend_delays": int((late & weekend).sum()),
+        "weekday_delays": int((late & ~weekend).sum()),
+        "long_late": int(long_late.sum()),
+        "long_late_completion": float(completion[long_late].mean()) if long_late.any() else 1.0,
+        "short_done": int(short_done.sum()),
+        "short_done_completion": float(completion[short_done].mean()) if short_done.any() else 0,
+        "avg_delay": float((today - end[late]).mean()) if late.any() else 0,
+    }
+
+
+def dashboard_metrics(frame, rows, today):
+    """
+    Sidebar numbers in one go: TIME BANK (rhythm score, time debt) and the PROJECT DASHBOARD
+    counters (active / planned / delayed / done), sharing the completion masks.
+    """
+    done = _fully_done(frame, rows)
+    done_rows, open_rows = rows[done], rows[~done]
+    finished = _finish_days(frame, done_rows, today)
+    today = today.toordinal()
+    planned = frame.start[open_rows] > today
+    delayed = ~planned & (frame.end[open_rows] < today)
+    return {
+        "rhythm": _rhythm(frame, done_rows, finished),
+        "debt": _debt(frame, done_rows, finished),
+        "total": len(rows),
+        "done": len(done_rows),
+        "planned": int(planned.sum()),
+        "delayed": int(delayed.sum()),
+        "active": int((~planned & ~delayed).sum()),
+    }
+
+
+# --- Project Status ---
+
+class ProjectStatus(NamedTuple):
+    """How a project stands on a given day, as shown across the review dashboard."""
+    status: str        # "Early", "On Time", "Late" or "Active"
+    completion: float  # share of completed tasks
+    early: bool        # completed before its end date
+    delay_days: int    # days past the end date (Late only, else 0)
+    days_left: int     # days until the end date (negative once past it)
+
+    @property
+    def done(self):
+        return self.status in ("Early", "On Time")
+
+    @property
+    def label(self):
+        """Coarse status: "Completed", "Late" or "Active"."""
+        return "Completed" if self.done else self.status
+
+
+def project_status(project, today):
+    completion = project.completion
+    days_left = (project.end_day - today).days
+    if completion >= 1.0:
+        early = project.completed_day is not None and project.completed_day < project.end_day
+        return ProjectStatus("Early" if early else "On Time", completion, early, 0, days_left)
+    if days_left < 0:
+        return ProjectStatus("Late", completion, False, -days_left, days_left)
+    return ProjectStatus("Active", completion, False, 0, days_left)
+
+
+def project_statuses(projects, today):
+    """project id -> ProjectStatus."""
+    return {p.id: project_status(p, today) for p in projects}
+
+
+class MetricsCache:
+    """
+    Keeps the values computed for the last `size` keys (least recently used goes first);
+    counts hits and misses.
+    """
+
+    def __init__(self, size=1):
+        self.size = size
+        self._values = OrderedDict()
+        self._lock = threading.Lock()  # guards the bookkeeping only; compute() runs unlocked
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._values[key] = value
+            if len(self._values) > self.size:
+                self._values.popitem(last=False)
+        return value
@@ -5,14 +5,17 @@ import os
 import time
 import base64
 import uuid
-import json
+import streamlit.components.v1 as components
 import textwrap
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 from streamlit_calendar import calendar
 from utils import generate_checklist, extract_tags
-from review import render_review_dashboard
-from persistence import load_data, save_data, load_focus_data, save_focus_data, load_tags, save_tags
+from review import render_review_dashboard, review_data
+from store import PacerStore
+from analytics import MetricsCache
+import fragments
+from models import Project, Task
 from styles import GLOBAL_STYLES
 
 # Ensure local modules are found
@@ -95,18 +98,18 @@ def open_recycle_bin():
     
     st.markdown("<hr style='margin: 10px 0 20px 0; border: 1px dashed #002FA7; opacity: 0.3;'>", unsafe_allow_html=True)
 
-    if 'deleted_projects' not in st.session_state or not st.session_state.deleted_projects:
+    if not store.deleted:
         st.markdown("<div style='text-align:center; padding:40px; font-family: VT323; font-size: 20px;'>THE BIN IS EMPTY!</div>", unsafe_allow_html=True)
         return
         
     if 'bin_expanded' not in st.session_state:
         st.session_state.bin_expanded = set()
         
-    for p in list(st.session_state.deleted_projects):
-        p_id = p.get('id')
+    for p in list(store.deleted):
+        p_id = p.id
         with st.container(border=False):
             # Project name on its own line
-            st.markdown(f"<div style='font-family: VT323; font-size: 18px; line-height: 1.3; padding: 4px 0;'><b>{p['goal']}</b></div>", unsafe_allow_html=True)
+            st.markdown(f"<div style='font-family: VT323; font-size: 18px; line-height: 1.3; padding: 4px 0;'><b>{p.goal}</b></div>", unsafe_allow_html=True)
             # 3 equal-width buttons below
             btn1, btn2, btn3 = st.columns([1, 1, 1])
             
@@ -117,28 +120,107 @@ def open_recycle_bin():
                     st.session_state.bin_expanded.remove(p_id)
             
             if btn2.button("RESTORE", key=f"top_rest_{p_id}", type="primary", use_container_width=True):
-                if 'deleted_at' in p: del p['deleted_at']
-                st.session_state.projects.append(p)
-                st.session_state.deleted_projects = [x for x in st.session_state.deleted_projects if x.get('id') != p_id]
-                atomic_save()
+                store.restore_project(p_id)
                 st.rerun()
             
             if btn3.button("DELETE", key=f"top_perm_del_{p_id}", type="primary", use_container_width=True):
-                st.session_state.deleted_projects = [x for x in st.session_state.deleted_projects if x.get('id') != p_id]
-                atomic_save()
+                store.purge_project(p_id)
                 st.rerun()
             
             if p_id in st.session_state.bin_expanded:
                 st.markdown("---")
-                deleted_at = p.get('deleted_at', 'Unknown')
+                deleted_at = p.deleted_at or 'Unknown'
                 st.markdown(f"""
                 <div style="font-family: 'VT323', monospace; color: #002FA7; line-height: 1.4; padding: 10px; background: #E2E8F0; border: 2px solid #002FA7;">
-                    <p style="margin: 0; font-size: 1.1rem;">📅 <b>PERIOD:</b> {p['start_date']} → {p['end_date']}</p>
+                    <p style="margin: 0; font-size: 1.1rem;">📅 <b>PERIOD:</b> {p.start_date} → {p.end_date}</p>
                     <p style="margin: 0; font-size: 1.1rem;">🗑️ <b>DELETED ON:</b> {deleted_at}</p>
                 </div>
                 """, unsafe_allow_html=True)
 @st.dialog("PROJECT DETAILS") # MASTER DIALOG: Shared by Calendar & Review
 def show_project_dialog(proj_id):
+    render_project_details(str(proj_id))
+
+# --- Project Details Callbacks ---
+# Edits are applied in widget callbacks, so fragments.invalidate() can rerun only the views showing
+# the changed data (this panel, the sidebar numbers, the calendar or review modules).
+def _edit_goal(proj_id):
+    proj = store.get_project(proj_id)
+    new_title = st.session_state[f"dlg_title_{proj_id}"]
+    if proj and new_title != proj.goal:
+        proj.goal = new_title
+        store.commit_project(proj)
+        fragments.invalidate(store.revisions)
+
+def _edit_dates(proj_id):
+    proj = store.get_project(proj_id)
+    new_s = st.session_state[f"dlg_start_{proj_id}"]
+    new_e = st.session_state[f"dlg_end_{proj_id}"]
+    if not proj: return
+    if new_s and new_s != proj.start_day:
+        store.set_project_dates(proj, start_date=new_s)
+    if new_e and new_e != proj.end_day:
+        store.set_project_dates(proj, end_date=new_e)
+    fragments.invalidate(store.revisions)
+
+def _edit_reward(proj_id):
+    proj = store.get_project(proj_id)
+    new_reward = st.session_state[f"dlg_reward_{proj_id}"]
+    if proj and new_reward != (proj.reward or ''):
+        proj.reward = new_reward
+        store.commit_project(proj)
+        fragments.invalidate(store.revisions)
+
+def _edit_tags(proj_id):
+    proj = store.get_project(proj_id)
+    new_tags = st.session_state[f"dlg_tags_{proj_id}"]
+    if proj and new_tags != proj.tags:
+        store.set_project_tags(proj, new_tags)
+        fragments.invalidate(store.revisions)
+
+def _toggle_task(proj_id, i, key):
+    proj = store.get_project(proj_id)
+    if not proj or i >= len(proj.tasks): return
+    is_checked = st.session_state[key]
+    t = proj.tasks[i]
+    if is_checked == t.completed: return
+    proj.set_task_completed(t, is_checked)
+    celebrate = proj.all_done and is_checked
+    if celebrate:
+        proj.completed_at = datetime.now()
+        st.session_state.celebrate_project = proj_id
+    atomic_save("projects", ids=[proj.id])
+    if celebrate:
+        st.rerun()  # the dispatcher swaps this dialog for MISSION ACCOMPLISHED
+    fragments.invalidate(store.revisions)
+
+def _rename_task(proj_id, i):
+    proj = store.get_project(proj_id)
+    if not proj or i >= len(proj.tasks): return
+    new_name = st.session_state[f"edit_chk_{proj_id}_{i}"]
+    t = proj.tasks[i]
+    if new_name != t.label:
+        t.task = new_name
+        store.commit_project(proj)
+        fragments.invalidate(store.revisions)
+
+def _remove_task(proj_id, i):
+    proj = store.get_project(proj_id)
+    if not proj or i >= len(proj.tasks): return
+    proj.remove_task(i)
+    store.commit_project(proj)
+    fragments.invalidate(store.revisions)
+
+def _add_task(proj_id):
+    proj = store.get_project(proj_id)
+    new_task = st.session_state.get(f"dlg_new_t_{proj_id}")
+    if proj and new_task:
+        proj.add_task(Task(new_task, id=str(uuid.uuid4())))
+        store.commit_project(proj)
+        fragments.invalidate(store.revisions)
+
+@st.fragment(key="project_details")
+def render_project_details(proj_id):
+    fragments.track("project_details", store.revisions, "projects", "tags")
     # SURGICAL CSS: ONLY hide the default header, don't touch margins of content
     st.markdown("""
     <style>
@@ -152,18 +234,14 @@ def show_project_dialog(proj_id):
     </style>
     """, unsafe_allow_html=True)
     
-    proj_id = str(proj_id)
-    if 'projects' not in st.session_state:
-        st.error("Session data missing.")
-        return
-
     # Locate Project
-    proj = next((x for x in st.session_state.projects if str(x.get('id')) == proj_id), None)
+    proj = store.get_project(proj_id)
     
     if not proj:
         st.error(f"Project not found. ID: {proj_id}")
         if st.button("Close", key="err_close"): 
             st.session_state.selected_project_id = None
+            release_calendar_click()
             st.rerun()
         return
 
@@ -174,6 +252,7 @@ def show_project_dialog(proj_id):
     with c_h2:
         if st.button("❌", key=f"close_x_{proj_id}", use_container_width=True):
             st.session_state.selected_project_id = None
+            release_calendar_click()
             st.rerun()
     
     st.markdown("<hr style='margin: 10px 0 20px 0; border: 1px dashed #002FA7; opacity: 0.3;'>", unsafe_allow_html=True)
@@ -183,11 +262,7 @@ def show_project_dialog(proj_id):
     # --- HEADER: Title & Status ---
     c1, c2 = st.columns([0.75, 0.25])
     with c1:
-        new_title = st.text_input("Goal", value=proj['goal'], key=f"dlg_title_{proj_id}")
-        if new_title != proj['goal']:
-            proj['goal'] = new_title
-            atomic_save()
-            st.rerun()
+        st.text_input("Goal", value=proj.goal, key=f"dlg_title_{proj_id}", on_change=_edit_goal, args=(proj_id,))
     with c2:
         st.markdown(f'<div style="height: 28px;"></div>', unsafe_allow_html=True) # Spacer
         st.markdown(f"<div class='pixel-status-badge' style='color:{col}; border-color:{col};'>{status}</div>", unsafe_allow_html=True)
@@ -195,27 +270,17 @@ def show_project_dialog(proj_id):
     # --- DATES ---
     c_d1, c_d2 = st.columns(2)
     with c_d1:
-        curr_start = proj['start_date'].date() if isinstance(proj['start_date'], datetime) else proj['start_date']
-        new_s = st.date_input("Start Date", value=curr_start, key=f"dlg_start_{proj_id}")
-        if new_s != curr_start:
-            proj['start_date'] = datetime.combine(new_s, datetime.min.time())
-            atomic_save()
-            st.rerun()
+        st.date_input("Start Date", value=proj.start_day, key=f"dlg_start_{proj_id}", on_change=_edit_dates, args=(proj_id,))
     with c_d2:
-        curr_end = proj['end_date'].date() if isinstance(proj['end_date'], datetime) else proj['end_date']
-        new_e = st.date_input("End Date", value=curr_end, key=f"dlg_end_{proj_id}")
-        if new_e != curr_end:
-            proj['end_date'] = datetime.combine(new_e, datetime.min.time())
-            atomic_save()
-            st.rerun()
+        st.date_input("End Date", value=proj.end_day, key=f"dlg_end_{proj_id}", on_change=_edit_dates, args=(proj_id,))
             
     # --- PROGRESS & RHYTHM VISUALIZATION ---
     try:
-        pct_exec = calculate_completion(proj['tasks'])
+        pct_exec = calculate_completion(proj)
         
         # Time Calculations
-        start_d = proj['start_date'].date() if isinstance(proj['start_date'], datetime) else proj['start_date']
-        end_d = proj['end_date'].date() if isinstance(proj['end_date'], datetime) else proj['end_date']
+        start_d = proj.start_day
+        end_d = proj.end_day
         today_d = datetime.now().date()
         
         total_days = max((end_d - start_d).days + 1, 1)
@@ -282,25 +347,18 @@ def show_project_dialog(proj_id):
 .badge-ok {{ background: #10B981; color: white; }}
 .badge-warn {{ background: {time_color}; color: white; }}
 </style>
-<div class="progress-panel {pulse_class}"><div class="panel-left"><div class="svg-icon"><svg viewBox="0 0 50 70" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M5 5 L45 5 L45 10 L30 35 L45 60 L45 65 L5 65 L5 60 L20 35 L5 10 Z" stroke="{time_color}" stroke-width="2" fill="none"/><path d="M10 10 L40 10 L28 {35 - sand_top * 0.2} L22 {35 - sand_top * 0.2} Z" fill="{time_color}" opacity="0.7"/><path d="M10 60 L40 60 L28 {60 - sand_bottom * 0.2} L22 {60 - sand_bottom * 0.2} Z" fill="{time_color}" opacity="0.9"/>{sand_stream_html}</svg></div><div class="panel-info"><div class="panel-label">⏳ Time Left</div><div class="panel-value" style="color:{time_color}">{remaining_days}d ({int(pct_remaining*100)}%)</div><div class="panel-badge {'badge-ok' if not is_behind else 'badge-warn'}">{'✅ On Rhythm' if not is_behind else f'⚠️ Gap {int(rhythm_gap*100)}%'}</div></div></div><div class="panel-divider"></div><div class="panel-right"><div class="svg-icon"><svg viewBox="0 0 50 70" fill="none" xmlns="http://www.w3.org/2000/svg"><rect x="10" y="5" width="30" height="4" rx="1" fill="#9CA3AF" opacity="0.6"/><path d="M13 9 L13 62 Q13 65 16 65 L34 65 Q37 65 37 62 L37 9 Z" stroke="{exec_color}" stroke-width="2" fill="none"/><rect x="15" y="{beaker_fill_y}" width="20" height="{beaker_fill_h}" fill="{exec_color}" opacity="0.7" rx="1"/><line x1="15" y1="25" x2="18" y2="25" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="35" x2="18" y2="35" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="45" x2="18" y2="45" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="55" x2="18" y2="55" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/></svg></div><div class="panel-info"><div class="panel-label">🧪 Execution</div><div class="panel-value" style="color:{exec_color}">{exec_pct_int}%</div><div class="panel-badge" style="background:{exec_color};color:white">{'🏁 DONE' if pct_exec >= 1.0 else f'📊 {len([t for t in proj["tasks"] if t["completed"]])}/{len(proj["tasks"])} tasks'}</div></div></div></div>"""
+<div class="progress-panel {pulse_class}"><div class="panel-left"><div class="svg-icon"><svg viewBox="0 0 50 70" fill="none" xmlns="http://www.w3.org/2000/svg"><path d="M5 5 L45 5 L45 10 L30 35 L45 60 L45 65 L5 65 L5 60 L20 35 L5 10 Z" stroke="{time_color}" stroke-width="2" fill="none"/><path d="M10 10 L40 10 L28 {35 - sand_top * 0.2} L22 {35 - sand_top * 0.2} Z" fill="{time_color}" opacity="0.7"/><path d="M10 60 L40 60 L28 {60 - sand_bottom * 0.2} L22 {60 - sand_bottom * 0.2} Z" fill="{time_color}" opacity="0.9"/>{sand_stream_html}</svg></div><div class="panel-info"><div class="panel-label">⏳ Time Left</div><div class="panel-value" style="color:{time_color}">{remaining_days}d ({int(pct_remaining*100)}%)</div><div class="panel-badge {'badge-ok' if not is_behind else 'badge-warn'}">{'✅ On Rhythm' if not is_behind else f'⚠️ Gap {int(rhythm_gap*100)}%'}</div></div></div><div class="panel-divider"></div><div class="panel-right"><div class="svg-icon"><svg viewBox="0 0 50 70" fill="none" xmlns="http://www.w3.org/2000/svg"><rect x="10" y="5" width="30" height="4" rx="1" fill="#9CA3AF" opacity="0.6"/><path d="M13 9 L13 62 Q13 65 16 65 L34 65 Q37 65 37 62 L37 9 Z" stroke="{exec_color}" stroke-width="2" fill="none"/><rect x="15" y="{beaker_fill_y}" width="20" height="{beaker_fill_h}" fill="{exec_color}" opacity="0.7" rx="1"/><line x1="15" y1="25" x2="18" y2="25" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="35" x2="18" y2="35" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="45" x2="18" y2="45" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/><line x1="15" y1="55" x2="18" y2="55" stroke="#9CA3AF" stroke-width="1" opacity="0.4"/></svg></div><div class="panel-info"><div class="panel-label">🧪 Execution</div><div class="panel-value" style="color:{exec_color}">{exec_pct_int}%</div><div class="panel-badge" style="background:{exec_color};color:white">{'🏁 DONE' if pct_exec >= 1.0 else f'📊 {proj.done_count}/{proj.total_count} tasks'}</div></div></div></div>"""
         st.markdown(combined_html, unsafe_allow_html=True)
 
     except Exception as e:
         st.error(f"Time Widget Error: {e}")
     
     # --- REWARD & TAGS ---
-    curr_reward = proj.get('reward', '')
-    new_reward = st.text_input("🎁 Reward", value=curr_reward, key=f"dlg_reward_{proj_id}", placeholder="Reward for yourself...")
-    if new_reward != curr_reward:
-        proj['reward'] = new_reward
-        atomic_save()
-
-    curr_tags = proj.get('tags', [])
-    new_tags = st.multiselect("Tags", options=st.session_state.tags, default=[t for t in curr_tags if t in st.session_state.tags], key=f"dlg_tags_{proj_id}")
-    if new_tags != curr_tags:
-        proj['tags'] = new_tags
-        atomic_save()
-        st.rerun()
+    st.text_input("🎁 Reward", value=proj.reward or '', key=f"dlg_reward_{proj_id}", placeholder="Reward for yourself...",
+                  on_change=_edit_reward, args=(proj_id,))
+
+    st.multiselect("Tags", options=store.tags, default=[t for t in proj.tags if t in store.tags], key=f"dlg_tags_{proj_id}",
+                   on_change=_edit_tags, args=(proj_id,))
 
     st.divider()
     
@@ -308,37 +366,21 @@ def show_project_dialog(proj_id):
     st.markdown("<div style='font-family: VT323; font-size: 20px; color: #002FA7; margin-bottom: 10px;'>CHECKPOINTS</div>", unsafe_allow_html=True)
     
     # Checkpoints
-    for i, t in enumerate(proj['tasks']):
+    for i, t in enumerate(proj.tasks):
         col_a, col_b, col_c = st.columns([0.06, 0.82, 0.12])
         with col_a:
-            is_checked = st.checkbox("", value=t['completed'], key=f"dlg_chk_{t.get('id', i)}")
-            if is_checked != t['completed']:
-                t['completed'] = is_checked
-                atomic_save()
-                all_done = all(task['completed'] for task in proj['tasks'])
-                if all_done and is_checked:
-                    proj['completed_at'] = datetime.now()
-                    atomic_save()
-                    st.session_state.celebrate_project = proj_id
-                st.rerun()
+            chk_key = f"dlg_chk_{t.id or i}"
+            st.checkbox("", value=t.completed, key=chk_key, on_change=_toggle_task, args=(proj_id, i, chk_key))
         with col_b:
-            task_name = t.get('task', t.get('name', 'Unnamed'))
-            new_name = st.text_input("task", value=task_name, key=f"edit_chk_{proj_id}_{i}", label_visibility="collapsed")
-            if new_name != task_name:
-                t['task'] = new_name
-                atomic_save()
+            st.text_input("task", value=t.label, key=f"edit_chk_{proj_id}_{i}", label_visibility="collapsed",
+                          on_change=_rename_task, args=(proj_id, i))
         with col_c:
-            if st.button("✕", key=f"dlg_del_t_{t.get('id', i)}", help="Remove", use_container_width=True):
-                proj['tasks'].pop(i)
-                atomic_save()
-                st.rerun()
+            st.button("✕", key=f"dlg_del_t_{t.id or i}", help="Remove", use_container_width=True,
+                      on_click=_remove_task, args=(proj_id, i))
     
     # Add Task
-    new_task = st.text_input("New Checkpoint", placeholder="Type next step...", key=f"dlg_new_t_{proj_id}", label_visibility="collapsed")
-    if st.button("ADD", key=f"dlg_add_t_{proj_id}", use_container_width=True) and new_task:
-        proj['tasks'].append({"id": str(uuid.uuid4()), "task": new_task, "completed": False})
-        atomic_save()
-        st.rerun()
+    st.text_input("New Checkpoint", placeholder="Type next step...", key=f"dlg_new_t_{proj_id}", label_visibility="collapsed")
+    st.button("ADD", key=f"dlg_add_t_{proj_id}", use_container_width=True, on_click=_add_task, args=(proj_id,))
         
     st.markdown("---")
     
@@ -347,15 +389,9 @@ def show_project_dialog(proj_id):
     bin_icon = f'<img src="data:image/png;base64,{bin_b64}" width="32" style="image-rendering:pixelated;vertical-align:middle">' if bin_b64 else '🗑️'
     st.markdown(f'<div style="display:flex;align-items:center;gap:12px;margin:8px 0;"><span>{bin_icon}</span><span style="font-family:VT323,monospace;font-size:14px;color:#9CA3AF;">Move this project to the Recycle Bin</span></div>', unsafe_allow_html=True)
     if st.button("🗑️ THROW IN BIN", key=f"dlg_del_proj_{proj_id}", type="primary", use_container_width=True):
-        if 'deleted_projects' not in st.session_state: st.session_state.deleted_projects = []
-        proj_to_del = next((p for p in st.session_state.projects if str(p['id']) == str(proj_id)), None)
-        if proj_to_del:
-            proj_to_del['deleted_at'] = datetime.now().isoformat()
-            st.session_state.deleted_projects.append(proj_to_del)
-        
-        st.session_state.projects = [p for p in st.session_state.projects if str(p['id']) != str(proj_id)]
+        store.bin_project(proj_id, datetime.now())
         st.session_state.selected_project_id = None
-        atomic_save()
+        release_calendar_click()
         st.toast("Moved to Recycle Bin", icon="🗑️")
         st.rerun()
 
@@ -380,6 +416,7 @@ def show_new_project_dialog():
     with c_h2:
         if st.button("❌", key="close_new_proj_dialog", use_container_width=True):
             st.session_state.selected_project_id = None
+            release_calendar_click()
             st.rerun()
     
     st.markdown("<hr style='margin: 10px 0 20px 0; border: 1px dashed #002FA7; opacity: 0.3;'>", unsafe_allow_html=True)
@@ -392,7 +429,7 @@ def show_new_project_dialog():
     with col2:
         end_d = st.date_input("Deadline", value=datetime.now() + timedelta(days=7), key="dlg_new_project_end")
     
-    all_tags = st.session_state.get('tags', [])
+    all_tags = store.tags
     sel_tags = st.multiselect("Tags", all_tags, key="dlg_new_project_tags")
     
     st.markdown("---")
@@ -402,12 +439,14 @@ def show_new_project_dialog():
             if new_goal:
                 create_project(new_goal, start_d, end_d, tags=sel_tags)
                 st.session_state.selected_project_id = None
+                release_calendar_click()
                 st.rerun()
             else:
                 st.error("Please enter a goal.")
     with c2:
         if st.button("CANCEL", use_container_width=True):
             st.session_state.selected_project_id = None
+            release_calendar_click()
             st.rerun()
 
 @st.dialog("MISSION ACCOMPLISHED")
@@ -432,6 +471,7 @@ def show_congrats_dialog():
         if st.button("❌", key="top_close_congrats", use_container_width=True):
             st.session_state.celebrate_project = None
             st.session_state.selected_project_id = None
+            release_calendar_click()
             st.rerun()
     
     st.markdown("<hr style='margin: 10px 0 20px 0; border: 1px dashed #002FA7; opacity: 0.3;'>", unsafe_allow_html=True)
@@ -465,21 +505,50 @@ st.markdown("""
 
 st.markdown(GLOBAL_STYLES, unsafe_allow_html=True)
 
-# --- Session State ---
-if 'projects' not in st.session_state or 'deleted_projects' not in st.session_state:
-    st.session_state.projects, st.session_state.deleted_projects = load_data()
+# --- Shared Store ---
+@st.cache_resource
+def get_store():
+    """Parsed once per process and shared by every session; writes go through the store."""
+    return PacerStore.load()
 
-if 'focus_sessions' not in st.session_state:
-    st.session_state.focus_sessions = load_focus_data()
+store = get_store()
+# Pick up saves made by other workers sharing the data directory
+store.refresh()
+# A full run re-renders every fragment; they re-register as they render (see fragments.py)
+fragments.reset()
 
-if 'tags' not in st.session_state:
-    st.session_state.tags = load_tags()
+# --- Session State ---
+# Local edits that lost against another worker's concurrent save are reported once per session
+if 'seen_conflicts' not in st.session_state:
+    st.session_state.seen_conflicts = len(store.conflicts)
+for conflict in store.conflicts[st.session_state.seen_conflicts:]:
+    st.toast(f"{len(conflict['keys'])} edit(s) to {conflict['collection']} were replaced by a newer save from another window", icon="⚠️")
+st.session_state.seen_conflicts = len(store.conflicts)
+
+# Another session may have written since this one last rendered: drop selections that no longer exist
+if st.session_state.get('seen_revision') != store.revision:
+    sel = st.session_state.get('selected_project_id')
+    if sel and sel != "DRAFT" and store.get_project(sel) is None:
+        st.session_state.selected_project_id = None
+    st.session_state.seen_revision = store.revision
 
 if 'new_project_tags' not in st.session_state:
     st.session_state.new_project_tags = []
 
-if 'calendar_version' not in st.session_state:
-    st.session_state.calendar_version = 0
+# Calendar clicks: the component keeps returning its last callback payload on every rerun, so a
+# payload equal to the last one handled is a replay, not a new click. Payloads carry no nonce, so a
+# second click on the same event or day can only be told apart once the component has forgotten the
+# first: release_calendar_click() does that when the selection a click made is used up.
+if 'calendar_last_click' not in st.session_state:
+    st.session_state.calendar_last_click = None
+if 'calendar_instance' not in st.session_state:
+    st.session_state.calendar_instance = 0
+
+def release_calendar_click():
+    """The project/date picked on the calendar is done with: accept the same click again."""
+    st.session_state.calendar_last_click = None
+    # A fresh component instance starts without the old payload, which would otherwise replay
+    st.session_state.calendar_instance += 1
 
 if 'ignore_calendar_click' not in st.session_state:
     st.session_state.ignore_calendar_click = False
@@ -493,15 +562,12 @@ if 'clicked_date' not in st.session_state:
 if 'new_goal_input' not in st.session_state:
     st.session_state.new_goal_input = ""
 
-def atomic_save():
-    save_data(st.session_state.projects, st.session_state.deleted_projects)
-    if 'focus_sessions' in st.session_state:
-        save_focus_data(st.session_state.focus_sessions)
+def atomic_save(*collections, ids=None):
+    """Mark the given collections (and project `ids`, if known) as changed, then write only the dirty ones."""
+    store.commit(*collections, ids=ids)
 
-def calculate_completion(tasks):
-    if not tasks: return 0.0
-    completed = sum(1 for t in tasks if t['completed'])
-    return completed / len(tasks)
+def calculate_completion(project):
+    return project.completion
 
 def get_project_status(project):
     """
@@ -511,98 +577,82 @@ def get_project_status(project):
     2. Start > Today -> Not Started (Future)
     3. Start <= Today -> Active (In Progress)
     """
-    pct = calculate_completion(project['tasks'])
+    pct = calculate_completion(project)
     if pct >= 1.0:
         return "Completed", "#6E7280" # Gray
     
     today = datetime.now().date()
-    # Ensure start_date is date object
-    s_date = project['start_date'].date() if isinstance(project['start_date'], datetime) else project['start_date']
-    
-    if s_date > today:
+    if project.start_day > today:
         return "Not Started", "#EF553B" # Red/Orange (Future)
     else:
         return "Active", "#00CC96" # Green (Started/In Progress)
 
-# --- Day 2: Rhythm Score ---
-def calculate_rhythm_score(projects):
-    """
-    Calculate rhythm score (0-100) based on on-time completion rate.
-    On-time = project completed (100%) before or on end_date.
-    """
-    completed_projects = [p for p in projects if calculate_completion(p['tasks']) >= 1.0]
-    if not completed_projects:
-        return 100  # No completed projects = perfect rhythm (no failures)
-    
-    on_time_count = 0
-    for p in completed_projects:
-        end_d = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-        # Use completed_at as proxy for completion date if available
-        completed_d = p.get('completed_at')
-        if completed_d:
-            # Handle string, datetime, or date types
-            if isinstance(completed_d, str):
-                try:
-                    check_d = datetime.fromisoformat(completed_d).date()
-                except:
-                    check_d = datetime.now().date()
-            elif isinstance(completed_d, datetime):
-                check_d = completed_d.date()
-            else:
-                check_d = completed_d  # Already a date
-        else:
-            check_d = datetime.now().date()  # Fallback
-        
-        if check_d <= end_d:
-            on_time_count += 1
-    
-    return int((on_time_count / len(completed_projects)) * 100)
-
 # --- Global Resources (using paths defined at top) ---
 
 
-# --- Day 2: Time Debt ---
-def calculate_time_debt(projects):
-    """
-    Calculate total time debt/credit in days.
-    Debt = late completion (negative)
-    Credit = early completion (positive)
-    """
-    completed_projects = [p for p in projects if calculate_completion(p['tasks']) >= 1.0]
-    if not completed_projects:
-        return 0
+# --- Helper: Focus Timer Fragment ---
+# The countdown runs in the browser (assets/focus_clock); the fragment only reruns on START / STOP and
+# once when the clock reports that it reached zero, so an idle or counting tab costs no server reruns.
+_focus_clock = components.declare_component(
+    "focus_clock", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "focus_clock"))
+
+def _focus_end_ms():
+    return int(st.session_state.focus_end_time.timestamp() * 1000)
+
+def _finish_focus():
+    """Record the full session of a timer that ran out (once per START)."""
+    st.session_state.focus_mode_active = False
+    st.session_state.focus_done = True
     
-    total_delta = 0
-    for p in completed_projects:
-        start_d = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-        end_d = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-        planned_days = (end_d - start_d).days + 1
-        
-        # Use completed_at if available, else assume completed today
-        completed_d = p.get('completed_at')
-        if completed_d:
-            # Handle string, datetime, or date types
-            if isinstance(completed_d, str):
-                try:
-                    check_d = datetime.fromisoformat(completed_d).date()
-                except:
-                    check_d = datetime.now().date()
-            elif isinstance(completed_d, datetime):
-                check_d = completed_d.date()
-            else:
-                check_d = completed_d  # Already a date
-        else:
-            check_d = datetime.now().date()
-        
-        actual_days = (check_d - start_d).days + 1
-        delta = planned_days - actual_days  # Positive = early, Negative = late
-        total_delta += delta
+    # RECORD THE SESSION IMMEDIATELY
+    new_session = {
+        "date": datetime.now(),
+        "duration": st.session_state.focus_duration,
+        "project_id": st.session_state.get('selected_project_id')
+    }
+    store.add_focus_session(new_session)
+    # Optionally trigger a notification/toast
+    st.toast(f"✅ Focus Session ({st.session_state.focus_duration}m) Complete!", icon="🏆")
+
+def _on_focus_clock():
+    # The clock reports the end it counted down to; trust it over a slightly skewed server clock
+    if st.session_state.focus_mode_active and st.session_state.focus_clock == _focus_end_ms():
+        _finish_focus()
+        fragments.invalidate(store.revisions, "sb_focus")
+
+def _start_focus():
+    st.session_state.focus_mode_active = True
+    st.session_state.focus_end_time = datetime.now() + timedelta(minutes=st.session_state.focus_duration)
+
+def _stop_focus():
+    st.session_state.focus_mode_active = False
     
-    return total_delta
+    # RECORD PARTIAL SESSION IF > 1 MINUTE
+    end_time_actual = datetime.now()
+    # Calculate elapsed time based on original duration minus remaining
+    # But we don't store start time explicitly in session_state, we store end_time.
+    # Elapsed = Duration - (End_Time - Now)
+    time_left = st.session_state.focus_end_time - end_time_actual
+    time_left_min = time_left.total_seconds() / 60.0
+    elapsed_min = st.session_state.focus_duration - time_left_min
+    
+    # Lower threshold to 0.1 minutes (6 seconds) to act as "any significant activity"
+    if elapsed_min >= 0.1:
+        new_session = {
+             "date": end_time_actual,
+             "duration": max(1, int(elapsed_min)), # Store at least 1 minute if it's small but significant? Or store float? 
+             # Requirement is minutes integer usually. Let's round up to 1 if it's > 6 seconds.
+             "project_id": st.session_state.get('selected_project_id')
+        }
+        store.add_focus_session(new_session)
+        st.toast(f"✅ Focus Session ({max(1, int(elapsed_min))}m) Recorded!", icon="💾")
+    else:
+        st.toast("Focus session too short (< 6s) to record.", icon="⚠️")
+    fragments.invalidate(store.revisions, "sb_focus")
 
-# --- Helper: Focus Timer Fragment (Self-Contained Rerunning) ---
-@st.fragment(run_every=1)
+@st.fragment(key="sb_focus")
 def render_focus_timer():
+    fragments.track("sb_focus", store.revisions)
     # Ensure Session State
     if 'focus_mode_active' not in st.session_state: st.session_state.focus_mode_active = False
     if 'focus_end_time' not in st.session_state: st.session_state.focus_end_time = datetime.now()
@@ -614,115 +664,35 @@ def render_focus_timer():
     clock_color = "#FFFFFF"
     display_time = f"{remaining_min:02d}:00"
     
-    end_timestamp_iso = ""
+    end_ms = None
+    remaining_ms = 0
     
     if st.session_state.focus_mode_active:
         clock_status = "ACTIVE"
         clock_color = "#F9DC24"
         now = datetime.now()
-        if now < st.session_state.focus_end_time:
-             diff = st.session_state.focus_end_time - now
-             t_sec = int(diff.total_seconds())
-             mm = t_sec // 60
-             ss = t_sec % 60
-             display_time = f"{mm:02d}:{ss:02d}"
-             end_timestamp_iso = st.session_state.focus_end_time.isoformat()
+        if now < st.session_state.focus_end_time and st.session_state.get('focus_clock') != _focus_end_ms():
+             end_ms = _focus_end_ms()
+             remaining_ms = int((st.session_state.focus_end_time - now).total_seconds() * 1000)
         else:
-             # Timer finished naturally
-             st.session_state.focus_mode_active = False
-             
-             # RECORD THE SESSION IMMEDIATELY
-             new_session = {
-                 "date": datetime.now(),
-                 "duration": st.session_state.focus_duration,
-                 "project_id": st.session_state.get('selected_project_id')
-             }
-             if 'focus_sessions' not in st.session_state: st.session_state.focus_sessions = []
-             st.session_state.focus_sessions.append(new_session)
-             save_focus_data(st.session_state.focus_sessions)
-             
-             clock_status = "DONE"
-             display_time = "00:00"
-             # Optionally trigger a notification/toast
-             st.toast(f"✅ Focus Session ({st.session_state.focus_duration}m) Complete!", icon="🏆")
+             # Timer finished naturally (and _on_focus_clock didn't record it first)
+             _finish_focus()
+
+    if st.session_state.pop('focus_done', False):
+        clock_status = "DONE"
+        display_time = "00:00"
 
     with st.container(border=True):
         st.markdown('<div class="sidebar-module-title">FOCUS TIMER</div>', unsafe_allow_html=True)
         
-        # Unique ID for JS targeting
-        clock_id = f"timer_{uuid.uuid4().hex[:8]}"
-        
-        # Render Clock HTML
-        st.markdown(f'''
-        <div class="digital-clock-container">
-            <div class="digital-clock-label">{clock_status}</div>
-            <div id="{clock_id}" class="digital-clock-display" style="color:{clock_color}; text-shadow: 2px 2px 0px #000;">
-                {display_time}
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
-        
-        # INJECT JAVASCRIPT FOR COUNTDOWN (Only if Active)
-        if st.session_state.focus_mode_active and end_timestamp_iso:
-            st.markdown(f"""
-            <script>
-            (function() {{
-                const clock = document.getElementById('{clock_id}');
-                const endTime = new Date("{end_timestamp_iso}").getTime();
-                
-                function updateTimer() {{
-                    const now = new Date().getTime();
-                    const distance = endTime - now;
-                    
-                    if (distance < 0) {{
-                        clock.innerText = "00:00";
-                        clearInterval(interval);
-                        return;
-                    }}
-                    
-                    const minutes = Math.floor((distance % (1000 * 60 * 60)) / (1000 * 60));
-                    const seconds = Math.floor((distance % (1000 * 60)) / 1000);
-                    
-                    const mStr = minutes < 10 ? "0" + minutes : minutes;
-                    const sStr = seconds < 10 ? "0" + seconds : seconds;
-                    clock.innerText = mStr + ":" + sStr;
-                }}
-                
-                const interval = setInterval(updateTimer, 1000);
-            }})();
-            </script>
-            """, unsafe_allow_html=True)
+        # Client-side countdown; returns end_ms once it reaches zero (a session only ends once)
+        _focus_clock(label=clock_status, color=clock_color, display=display_time,
+                     end=end_ms, remaining_ms=remaining_ms, key="focus_clock", default=None,
+                     on_change=_on_focus_clock)
         
         # Controls
         if st.session_state.focus_mode_active:
-            if st.button("STOP", key="btn_stop_focus", type="primary", use_container_width=True):
-                st.session_state.focus_mode_active = False
-                
-                # RECORD PARTIAL SESSION IF > 1 MINUTE
-                end_time_actual = datetime.now()
-                # Calculate elapsed time based on original duration minus remaining
-                # But we don't store start time explicitly in session_state, we store end_time.
-                # Elapsed = Duration - (End_Time - Now)
-                time_left = st.session_state.focus_end_time - end_time_actual
-                time_left_min = time_left.total_seconds() / 60.0
-                elapsed_min = st.session_state.focus_duration - time_left_min
-                
-                # Lower threshold to 0.1 minutes (6 seconds) to act as "any significant activity"
-                if elapsed_min >= 0.1:
-                    new_session = {
-                         "date": end_time_actual,
-                         "duration": max(1, int(elapsed_min)), # Store at least 1 minute if it's small but significant? Or store float? 
-                         # Requirement is minutes integer usually. Let's round up to 1 if it's > 6 seconds.
-                         "project_id": st.session_state.get('selected_project_id')
-                    }
-                    if 'focus_sessions' not in st.session_state: st.session_state.focus_sessions = []
-                    st.session_state.focus_sessions.append(new_session)
-                    save_focus_data(st.session_state.focus_sessions)
-                    st.toast(f"✅ Focus Session ({max(1, int(elapsed_min))}m) Recorded!", icon="💾")
-                else:
-                    st.toast("Focus session too short (< 6s) to record.", icon="⚠️")
-                    
-                st.rerun()
+            st.button("STOP", key="btn_stop_focus", type="primary", use_container_width=True, on_click=_stop_focus)
         else:
             # DATE PICKER STABILITY FIX: move number_input out of fragment if possible? 
             # Actually, the issue is likely global rerun. st.fragment shouldn't trigger full rerun unless we call st.rerun().
@@ -732,11 +702,7 @@ def render_focus_timer():
             f_dur = st.number_input("Duration (min)", 5, 120, st.session_state.focus_duration, step=5, label_visibility="collapsed")
             st.session_state.focus_duration = f_dur
             
-            if st.button("START FOCUS", key="btn_start_focus", type="primary", use_container_width=True):
-                 st.session_state.focus_mode_active = True
-                 st.session_state.focus_end_time = datetime.now() + timedelta(minutes=st.session_state.focus_duration)
-                 st.rerun()
-                 st.rerun()
+            st.button("START FOCUS", key="btn_start_focus", type="primary", use_container_width=True, on_click=_start_focus)
 
 # --- DIALOGS MOVED TO TOP ---
 
@@ -767,17 +733,13 @@ def create_project(goal, start_date=None, end_date=None, tasks=None, tags=None):
     if not e_d: e_d = s_d + timedelta(days=7)
 
     new_id = str(uuid.uuid4())
-    new_proj = {
-        "id": new_id,
-        "goal": goal,
-        "tasks": final_tasks,
-        "start_date": s_d,
-        "end_date": e_d,
-        "tags": tags if tags is not None else extract_tags(goal)[0], # Use provided tags, else extract from goal
-        "created_at": datetime.now()
-    }
-    st.session_state.projects.append(new_proj)
-    atomic_save()
+    new_proj = Project(
+        new_id, goal, s_d, e_d,
+        tasks=[Task.from_dict(t) for t in final_tasks],
+        tags=tags if tags is not None else extract_tags(goal)[0], # Use provided tags, else extract from goal
+        created_at=datetime.now(),
+    )
+    store.add_project(new_proj)
     return new_id
 
 # --- Logic: Add Project Callback ---
@@ -806,11 +768,312 @@ def add_project_callback():
     create_project(txt, s_d, e_d, tags=sb_tags)
     
     # Clear inputs
+    had_clicked_date = st.session_state.clicked_date is not None
     st.session_state.new_goal_input = ""
     st.session_state.clicked_date = None
+    release_calendar_click()
     # Reset date picker by deleting the key (avoids conflict with default value)
     if "sb_date_range" in st.session_state:
         del st.session_state.sb_date_range
+    
+    if had_clicked_date:
+        st.rerun()  # the sidebar's Clear Date button goes away
+    fragments.invalidate(store.revisions, "sb_new_mission")
+
+# --- Sidebar Modules ---
+# Each module is a keyed fragment (see fragments.py): its own widgets rerun only the module, and a
+# store edit anywhere reruns just the modules that read the changed collections.
+
+@st.fragment(key="sb_metrics")
+def render_sidebar_metrics():
+    fragments.track("sb_metrics", store.revisions, "projects")
+    # --- 2. BANK PASSBOOK ---
+    # One cached computation for the TIME BANK and PROJECT DASHBOARD modules
+    metrics = store.sidebar_metrics()
+    rhythm = metrics["rhythm"]
+    debt = metrics["debt"]
+
+    # Dynamic Encouragement Logic
+    if debt > 0:
+        d_color = "#2E7D32"; d_label = f"+{debt} DAYS"; d_icon = "CREDIT"
+        enc_text = "EXCELLENT PACE!"
+        enc_color = "#2E7D32" # Green
+    elif debt < -5:
+        d_color = "#C62828"; d_label = f"{debt} DAYS"; d_icon = "DEBT"
+        enc_text = "WARNING: CATCH UP!"
+        enc_color = "#C62828" # Red
+    elif debt < 0:
+        d_color = "#C62828"; d_label = f"{debt} DAYS"; d_icon = "DEBT"
+        enc_text = "PUSH HARDER!"
+        enc_color = "#EF6C00" # Orange
+    else:
+        d_color = "#5D4037"; d_label = "BALANCED"; d_icon = "TIME DEBT"
+        enc_text = "BALANCED FLOW"
+        enc_color = "#5D4037" # Brown
+
+    # Rhythm color
+    if rhythm >= 80: r_color = "#2E7D32"
+    elif rhythm >= 50: r_color = "#EF6C00"
+    else: r_color = "#C62828"
+
+    st.markdown(f'''
+    <div class="passbook-container">
+        <div class="passbook-inner-page">
+            <div class="passbook-header">TIME BANK</div>
+            <div class="passbook-row" title="🎯 RHYTHM SCORE (Reliability): The percentage of your projects that were completed ON TIME. Aim for 100%.">
+                <span class="passbook-label" style="border-bottom: 1px dotted #F9DC24; cursor: help;">RHYTHM SCORE</span>
+                <span class="passbook-large-val">{rhythm}</span>
+                <span style="font-size:12px; color:{r_color}; font-weight:bold;">PTS</span>
+            </div>
+            <div class="passbook-row" title="⏳ TIME CREDIT/DEBT (Efficiency): Total days saved (+) or lost (-) compared to your planned schedules.">
+                <span class="passbook-label" style="border-bottom: 1px dotted #F9DC24; cursor: help;">{d_icon}</span>
+                <span class="passbook-large-val">{debt}</span>
+                <span style="font-size:12px; color:{d_color}; font-weight:bold;">DAYS</span>
+            </div>
+            <div class="passbook-footer" style="color:{enc_color};">
+                // {enc_text} //
+            </div>
+        </div>
+    </div>
+    ''', unsafe_allow_html=True)
+
+    # --- 3. PROJECT STATS ---
+    cnt_total = metrics["total"]
+    cnt_completed = metrics["done"]
+    cnt_active = metrics["active"]
+    cnt_future = metrics["planned"]
+    cnt_delayed = metrics["delayed"]
+
+    # --- 3. PROJECT STATS ---
+    with st.container(border=True):
+        st.markdown('<div class="sidebar-module-title">PROJECT DASHBOARD</div>', unsafe_allow_html=True)
+        # 2x2 Grid Layout
+        st.markdown(f'''
+        <div class="stat-grid">
+            <div class="stat-box">
+                <div class="stat-num" style="color:#B45309;">{cnt_active}</div>
+                <div class="stat-label">ACTIVE</div>
+            </div>
+            <div class="stat-box">
+                <div class="stat-num" style="color:#1D4ED8;">{cnt_future}</div>
+                <div class="stat-label">PLANNED</div>
+            </div>
+            <div class="stat-box">
+                <div class="stat-num" style="color:#B91C1C;">{cnt_delayed}</div>
+                <div class="stat-label">DELAYED</div>
+            </div>
+            <div class="stat-box">
+                <div class="stat-num" style="color:#4B5563;">{cnt_completed}</div>
+                <div class="stat-label">DONE</div>
+            </div>
+        </div>
+        ''', unsafe_allow_html=True)
+
+# --- 5. NEW PROJECT ---
+def on_sidebar_date_change():
+    st.session_state.selected_project_id = None
+
+@st.fragment(key="sb_new_mission")
+def render_new_mission():
+    fragments.track("sb_new_mission", store.revisions, "tags")
+    with st.container(border=True):
+        st.markdown('<div class="sidebar-module-title">NEW MISSION</div>', unsafe_allow_html=True)
+
+        st.caption("Select Dates")
+        st.date_input(
+            "Select Dates", value=[], key="sb_date_range",
+            format="MM/DD/YYYY", label_visibility="collapsed", on_change=on_sidebar_date_change
+        )
+
+        st.caption("Define Goal")
+        st.text_input(
+            "Goal", key="new_goal_input", placeholder="e.g. Run Marathon", label_visibility="collapsed"
+        )
+
+        st.caption("Assign Tags")
+        sel_tags = st.multiselect(
+            "Select Tags",
+            options=store.tags,
+            default=[],
+            key="new_project_tags_selection",
+            label_visibility="collapsed",
+        )
+
+        st.button("✨ Create Project", type="primary", use_container_width=True, on_click=add_project_callback)
+
+# --- 6. SETTINGS / TAGS ---
+def _add_tag():
+    new_tag_txt = st.session_state.get("sb_new_tag")
+    if new_tag_txt and new_tag_txt not in store.tags:
+        store.add_tag(new_tag_txt)
+        fragments.invalidate(store.revisions)
+
+def _rename_tag(i, old):
+    new_val = st.session_state[f"edit_tag_{i}"]
+    if new_val != old and new_val and new_val not in store.tags:
+        # Also updates all projects with this tag
+        store.rename_tag(old, new_val)
+        fragments.invalidate(store.revisions)
+
+def _delete_tag(name):
+    store.delete_tag(name)
+    fragments.invalidate(store.revisions)
+
+@st.fragment(key="sb_settings")
+def render_settings():
+    fragments.track("sb_settings", store.revisions, "tags")
+    with st.container(border=True):
+         st.markdown('<div class="sidebar-module-title">SYSTEM SETTINGS</div>', unsafe_allow_html=True)
+
+         # Flattened Tag Management
+         c1, c2 = st.columns([0.7, 0.3])
+         c1.text_input("New Tag", key="sb_new_tag", placeholder="New Tag Name", label_visibility="collapsed")
+         c2.button("Add", use_container_width=True, on_click=_add_tag)
+
+         st.markdown("---")
+         st.caption("Manage Tags (Scrollable):")
+
+         # Scrollable Container for Tags
+         with st.container(height=200):
+             # COMPACT CSS for this section only
+             st.markdown("""
+                 <style>
+                 /* Compact Text Input */
+                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] div[data-baseweb="input"] {
+                     height: 32px !important;
+                     min-height: 32px !important;
+                     padding: 0px 8px !important;
+                 }
+                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] input {
+                     height: 32px !important;
+                     min-height: 32px !important;
+                     font-size: 16px !important;
+                     padding: 0px !important;
+                 }
+                 /* Compact Delete Button */
+                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] button {
+                     height: 32px !important;
+                     min-height: 32px !important;
+                     padding: 0px !important;
+                     font-size: 14px !important;
+                     line-height: 1 !important;
+                 }
+                 /* Reduce Row Spacing */
+                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] {
+                     gap: 0.5rem !important; /* Smaller gap between columns */
+                     margin-bottom: -10px !important; /* Bring rows closer */
+                 }
+                 /* Center Bullet */
+                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] div[data-testid="stMarkdownContainer"] p {
+                     margin-bottom: 0px !important;
+                     line-height: 32px !important; /* Vertically center bullet */
+                 }
+                 </style>
+             """, unsafe_allow_html=True)
+
+             # List Layout (Bullet + Editable Text + Delete X)
+             for i, t in enumerate(store.tags):
+                 c_bull, c_val, c_del = st.columns([0.1, 0.7, 0.2])
+
+                 with c_bull:
+                     st.markdown("<div style='text-align:center; font-size: 20px; line-height: 30px;'>•</div>", unsafe_allow_html=True)
+
+                 # Editable Tag Name
+                 c_val.text_input("Edit", value=t, key=f"edit_tag_{i}", label_visibility="collapsed", on_change=_rename_tag, args=(i, t))
+
+                 # Delete Button (Small X)
+                 c_del.button("✖", key=f"del_tag_{i}", on_click=_delete_tag, args=(t,))
+
+         # Write accounting for the most recent save (dirty collections only)
+         if store.last_save:
+             st.caption(f"Last save: {store.last_save['files']} file(s) · {store.last_save['bytes']:,} bytes")
+         mc = store.metrics_cache
+         st.caption(f"Metrics cache: {mc.hits} hit(s) · {mc.misses} miss(es)")
+
+# --- 6. RECYCLE BIN (Sidebar Bottom) ---
+def _clean_bin():
+    store.clear_bin()
+    fragments.invalidate(store.revisions)
+
+@st.fragment(key="sb_bin")
+def render_bin_controls():
+    fragments.track("sb_bin", store.revisions)
+    # Custom Recycle Bin Icon — use global path
+    b64_string = get_image_base64(RES_BIN_PATH)
+
+    # Sidebar Layout: Icon (Left) | Buttons (Right)
+    c_bin_icon, c_bin_btn = st.columns([0.3, 0.7])
+
+    with c_bin_icon:
+        st.markdown(f'''
+        <div style="display: flex; justify-content: center; align-items: center; height: 100%;">
+            <img src="data:image/png;base64,{b64_string}" width="60" style="object-fit: contain;">
+        </div>
+        ''', unsafe_allow_html=True)
+
+    with c_bin_btn:
+        st.markdown('<div style="height: 5px;"></div>', unsafe_allow_html=True)
+        # Nested columns for side-by-side buttons
+        btn_c1, btn_c2 = st.columns([0.5, 0.5])
+        if btn_c1.button("OPEN BIN", key="btn_open_recycle_bin", use_container_width=True):
+            st.session_state.show_bin = True
+            st.rerun()
+        btn_c2.button("CLEAN ALL", key="btn_sidebar_clean_bin", use_container_width=True, type="secondary", on_click=_clean_bin)
+
+# --- Backup ---
+# The export itself is streamed to a file (store.backup_file), but Streamlit 1.66 hands every download,
+# file objects included, to its MediaFileManager as one bytes blob, so the finished file is read whole.
+def _backup_bytes():
+    with open(store.backup_file(), "rb") as f:
+        return f.read()
+
+def _backup_gz_bytes():
+    with open(store.backup_file(compress=True), "rb") as f:
+        return f.read()
+
+def _import_backup():
+    f = st.session_state.get("sb_restore_file")
+    if f is None:
+        return
+    try:
+        f.seek(0)
+        st.session_state.import_report = store.import_backup(f)
+    except ValueError as e:
+        st.session_state.import_report = {"error": str(e)}
+        return
+    fragments.invalidate(store.revisions, "sb_backup")
+
+@st.fragment(key="sb_backup")
+def render_backup():
+    fragments.track("sb_backup", store.revisions)
+    # FULL BACKUP: written only when a button is clicked, then reused until the store changes
+    st.download_button("💾 Backup Data", _backup_bytes, "pacer.json", "text/plain", use_container_width=True)
+    st.download_button("🗜️ Backup (.gz)", _backup_gz_bytes, "pacer.json.gz", "application/gzip", use_container_width=True)
+
+    # RESTORE: merge a backup into the current data (see PacerStore.import_backup)
+    st.file_uploader("Restore Backup", type=["json", "gz"], key="sb_restore_file", label_visibility="collapsed")
+    st.button("📥 Import Backup", use_container_width=True, on_click=_import_backup,
+              disabled=st.session_state.get("sb_restore_file") is None)
+    report = st.session_state.get("import_report")
+    if report is None:
+        return
+    if "error" in report:
+        st.error(f"Import failed: {report['error']}")
+        return
+    added, updated = report["added"], report["updated"]
+    st.success(
+        f"Imported: {added['projects']} new / {updated['projects']} updated project(s), "
+        f"{added['deleted'] + updated['deleted']} binned, {added['focus']} focus session(s), {added['tags']} tag(s)"
+    )
+    if report["conflicts"]:
+        with st.expander(f"⚠️ {len(report['conflicts'])} conflict(s)"):
+            for c in report["conflicts"]:
+                winner = "backup version kept" if c["kept"] == "backup" else "current version kept (newer or same age)"
+                st.caption(f"{c['collection']} · {c['id']}: {winner}")
+    if report["invalid"]:
+        with st.expander(f"⚠️ {len(report['invalid'])} invalid record(s) skipped"):
+            for r in report["invalid"]:
+                st.caption(f"{r['section']}[{r['index']}]: {r['error']}")
 
 # Defaults
 if 'view_mode' not in st.session_state: st.session_state.view_mode = "Calendar"
@@ -999,268 +1262,39 @@ with st.sidebar:
     st.markdown("---")
     
     # --- 1. SEARCH ---
-    search_query = st.text_input("Search", placeholder="🔍 Filter...", label_visibility="collapsed")
-    
-    # --- 2. BANK PASSBOOK ---
-    rhythm = calculate_rhythm_score(st.session_state.projects)
-    debt = calculate_time_debt(st.session_state.projects)
-    
-    # Dynamic Encouragement Logic
-    if debt > 0:
-        d_color = "#2E7D32"; d_label = f"+{debt} DAYS"; d_icon = "CREDIT"
-        enc_text = "EXCELLENT PACE!"
-        enc_color = "#2E7D32" # Green
-    elif debt < -5:
-        d_color = "#C62828"; d_label = f"{debt} DAYS"; d_icon = "DEBT"
-        enc_text = "WARNING: CATCH UP!"
-        enc_color = "#C62828" # Red
-    elif debt < 0:
-        d_color = "#C62828"; d_label = f"{debt} DAYS"; d_icon = "DEBT"
-        enc_text = "PUSH HARDER!"
-        enc_color = "#EF6C00" # Orange
-    else:
-        d_color = "#5D4037"; d_label = "BALANCED"; d_icon = "TIME DEBT"
-        enc_text = "BALANCED FLOW"
-        enc_color = "#5D4037" # Brown
+    st.text_input("Search", key="search_query", placeholder="🔍 Filter...", label_visibility="collapsed")
 
-    # Rhythm color
-    if rhythm >= 80: r_color = "#2E7D32" 
-    elif rhythm >= 50: r_color = "#EF6C00" 
-    else: r_color = "#C62828"
-
-    st.markdown(f'''
-    <div class="passbook-container">
-        <div class="passbook-inner-page">
-            <div class="passbook-header">TIME BANK</div>
-            <div class="passbook-row" title="🎯 RHYTHM SCORE (Reliability): The percentage of your projects that were completed ON TIME. Aim for 100%.">
-                <span class="passbook-label" style="border-bottom: 1px dotted #F9DC24; cursor: help;">RHYTHM SCORE</span>
-                <span class="passbook-large-val">{rhythm}</span>
-                <span style="font-size:12px; color:{r_color}; font-weight:bold;">PTS</span>
-            </div>
-            <div class="passbook-row" title="⏳ TIME CREDIT/DEBT (Efficiency): Total days saved (+) or lost (-) compared to your planned schedules.">
-                <span class="passbook-label" style="border-bottom: 1px dotted #F9DC24; cursor: help;">{d_icon}</span>
-                <span class="passbook-large-val">{debt}</span>
-                <span style="font-size:12px; color:{d_color}; font-weight:bold;">DAYS</span>
-            </div>
-            <div class="passbook-footer" style="color:{enc_color};">
-                // {enc_text} //
-            </div>
-        </div>
-    </div>
-    ''', unsafe_allow_html=True)
-    
-    # --- 3. PROJECT STATS ---
-    cnt_total = len(st.session_state.projects)
-    cnt_completed = 0
-    cnt_active = 0
-    cnt_future = 0
-    cnt_delayed = 0
-    
-    today = datetime.now().date()
-    for p in st.session_state.projects:
-        pct = calculate_completion(p['tasks'])
-        if pct >= 1.0:
-            cnt_completed += 1
-            continue     
-        start_d = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-        end_d = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-        remaining_days = (end_d - today).days + 1
-        
-        if today < start_d: cnt_future += 1
-        elif remaining_days <= 0: cnt_delayed += 1
-        else: cnt_active += 1
-
-    # --- 3. PROJECT STATS ---
-    with st.container(border=True):
-        st.markdown('<div class="sidebar-module-title">PROJECT DASHBOARD</div>', unsafe_allow_html=True)
-        # 2x2 Grid Layout
-        st.markdown(f'''
-        <div class="stat-grid">
-            <div class="stat-box">
-                <div class="stat-num" style="color:#B45309;">{cnt_active}</div>
-                <div class="stat-label">ACTIVE</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-num" style="color:#1D4ED8;">{cnt_future}</div>
-                <div class="stat-label">PLANNED</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-num" style="color:#B91C1C;">{cnt_delayed}</div>
-                <div class="stat-label">DELAYED</div>
-            </div>
-            <div class="stat-box">
-                <div class="stat-num" style="color:#4B5563;">{cnt_completed}</div>
-                <div class="stat-label">DONE</div>
-            </div>
-        </div>
-        ''', unsafe_allow_html=True)
+    # --- 2. BANK PASSBOOK / 3. PROJECT STATS ---
+    render_sidebar_metrics()
 
     # --- 4. FOCUS TIMER ---
     # Rendered using st.fragment for non-blocking updates
     render_focus_timer()
 
     # --- 5. NEW PROJECT ---
-    # REVERTED FRAGMENT: Direct rendering to prevent error loop / duplicate widget ID
-    def on_sidebar_date_change():
-        st.session_state.selected_project_id = None
-
-    with st.container(border=True):
-        st.markdown('<div class="sidebar-module-title">NEW MISSION</div>', unsafe_allow_html=True)
-        
-        st.caption("Select Dates")
-        st.date_input(
-            "Select Dates", value=[], key="sb_date_range", 
-            format="MM/DD/YYYY", label_visibility="collapsed", on_change=on_sidebar_date_change
-        )
-        
-        st.caption("Define Goal")
-        st.text_input(
-            "Goal", key="new_goal_input", placeholder="e.g. Run Marathon", label_visibility="collapsed"
-        )
-        
-        st.caption("Assign Tags")
-        sel_tags = st.multiselect(
-            "Select Tags",
-            options=st.session_state.tags,
-            default=[],
-            key="new_project_tags_selection",
-            label_visibility="collapsed",
-        )
-        
-        st.button("✨ Create Project", type="primary", use_container_width=True, on_click=add_project_callback)
+    render_new_mission()
 
     # --- 6. SETTINGS / TAGS ---
-    with st.container(border=True):
-         st.markdown('<div class="sidebar-module-title">SYSTEM SETTINGS</div>', unsafe_allow_html=True)
-         
-         # Flattened Tag Management
-         c1, c2 = st.columns([0.7, 0.3])
-         new_tag_txt = c1.text_input("New Tag", placeholder="New Tag Name", label_visibility="collapsed")
-         if c2.button("Add", use_container_width=True):
-             if new_tag_txt and new_tag_txt not in st.session_state.tags:
-                 st.session_state.tags.append(new_tag_txt)
-                 save_tags(st.session_state.tags)
-                 st.rerun()
-         
-         st.markdown("---")
-         st.caption("Manage Tags (Scrollable):")
-         
-         # Scrollable Container for Tags
-         with st.container(height=200):
-             # COMPACT CSS for this section only
-             st.markdown("""
-                 <style>
-                 /* Compact Text Input */
-                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] div[data-baseweb="input"] {
-                     height: 32px !important;
-                     min-height: 32px !important;
-                     padding: 0px 8px !important;
-                 }
-                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] input {
-                     height: 32px !important;
-                     min-height: 32px !important;
-                     font-size: 16px !important;
-                     padding: 0px !important;
-                 }
-                 /* Compact Delete Button */
-                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] button {
-                     height: 32px !important;
-                     min-height: 32px !important;
-                     padding: 0px !important;
-                     font-size: 14px !important;
-                     line-height: 1 !important;
-                 }
-                 /* Reduce Row Spacing */
-                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] {
-                     gap: 0.5rem !important; /* Smaller gap between columns */
-                     margin-bottom: -10px !important; /* Bring rows closer */
-                 }
-                 /* Center Bullet */
-                 div[data-testid="stVerticalBlock"] div[data-testid="stHorizontalBlock"] div[data-testid="stMarkdownContainer"] p {
-                     margin-bottom: 0px !important;
-                     line-height: 32px !important; /* Vertically center bullet */
-                 }
-                 </style>
-             """, unsafe_allow_html=True)
+    render_settings()
 
-             # List Layout (Bullet + Editable Text + Delete X)
-             for i, t in enumerate(st.session_state.tags):
-                 c_bull, c_val, c_del = st.columns([0.1, 0.7, 0.2])
-                 
-                 with c_bull:
-                     st.markdown("<div style='text-align:center; font-size: 20px; line-height: 30px;'>•</div>", unsafe_allow_html=True)
-
-                 # Editable Tag Name
-                 new_val = c_val.text_input("Edit", value=t, key=f"edit_tag_{i}", label_visibility="collapsed")
-                 if new_val != t:
-                     if new_val and new_val not in st.session_state.tags:
-                         st.session_state.tags[i] = new_val
-                         # Update all projects with this tag
-                         for p in st.session_state.projects:
-                             if 'tags' in p and t in p['tags']:
-                                 p['tags'] = [new_val if x==t else x for x in p['tags']]
-                         
-                         save_tags(st.session_state.tags)
-                         atomic_save()
-                         st.rerun()
-                 
-                 # Delete Button (Small X)
-                 if c_del.button("✖", key=f"del_tag_{i}"):
-                     st.session_state.tags.pop(i)
-                     save_tags(st.session_state.tags)
-                     st.rerun()
-    
     if st.session_state.clicked_date:
         if st.button("Clear Date"):
             st.session_state.clicked_date = None
-            st.rerun() 
+            release_calendar_click()
+            st.rerun()
+
 
 
-            
     # --- 6. RECYCLE BIN (Sidebar Bottom) ---
     st.markdown("---")
-    
-    # Custom Recycle Bin Icon — use global path
-    b64_string = get_image_base64(RES_BIN_PATH)
 
 # --- REMOVED DIALOG DEFINITIONS FROM SIDEBAR ---
 
-    # Sidebar Layout: Icon (Left) | Buttons (Right)
-    c_bin_icon, c_bin_btn = st.columns([0.3, 0.7])
-    
-    with c_bin_icon:
-        st.markdown(f'''
-        <div style="display: flex; justify-content: center; align-items: center; height: 100%;">
-            <img src="data:image/png;base64,{b64_string}" width="60" style="object-fit: contain;">
-        </div>
-        ''', unsafe_allow_html=True)
-        
-    with c_bin_btn:
-        st.markdown('<div style="height: 5px;"></div>', unsafe_allow_html=True)
-        # Nested columns for side-by-side buttons
-        btn_c1, btn_c2 = st.columns([0.5, 0.5])
-        if btn_c1.button("OPEN BIN", key="btn_open_recycle_bin", use_container_width=True):
-            st.session_state.show_bin = True
-            st.rerun()
-        if btn_c2.button("CLEAN ALL", key="btn_sidebar_clean_bin", use_container_width=True, type="secondary"):
-            st.session_state.deleted_projects = []
-            atomic_save()
-            st.rerun()
-    
+    render_bin_controls()
+
     # Backup
     st.markdown("---")
-    
-    # PREPARE FULL BACKUP DATA
-    backup_data = {
-        "version": "1.0",
-        "timestamp": datetime.now().isoformat(),
-        "projects": st.session_state.projects,
-        "deleted_projects": st.session_state.get('deleted_projects', []),
-        "focus_sessions": st.session_state.get('focus_sessions', []),
-        "tags": st.session_state.tags
-    }
-    d_json = json.dumps(backup_data, default=str, indent=2)
-    
+
     # Force styling for Backup Button to match and be centered
     st.markdown("""
     <style>
@@ -1290,140 +1324,96 @@ with st.sidebar:
     }
     </style>
     """, unsafe_allow_html=True)
-    
-    st.download_button("💾 Backup Data", d_json, "pacer.json", "text/plain", use_container_width=True)
+
+    render_backup()
 
 # --- Logic: Review Dashboard (Restored from review.py) ---
 # render_review_dashboard is imported from review.py
 
-# --- Main Layout ---
-# Apply Search Filter
-filtered_projects = st.session_state.projects
-if search_query:
-    q = search_query.lower()
-    filtered_projects = [
-        p for p in st.session_state.projects 
-        if q in p['goal'].lower() 
-        or any(q in t.lower() for t in p.get('tags', []))
-    ]
-
-# Initialize Calendar State
-if 'calendar_date' not in st.session_state:
-    st.session_state.calendar_date = datetime.now()
-
-# Main Content Area (Full Width)
-st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-
-
-
-
-
-view_mode = st.session_state.view_mode
-
-# 1. CALENDAR VIEW
-if view_mode == "Calendar":
-    
-    # Function to handle date navigation
-    def val_navigate(direction):
-        st.session_state.selected_project_id = None # Clear selection
-        if 'calendar_version' not in st.session_state:
-            st.session_state.calendar_version = 0
-        st.session_state.calendar_version += 1 # Force new key to prevent ghost clicks
-        
-        if direction == 'back':
-            st.session_state.calendar_date = st.session_state.calendar_date - relativedelta(months=1)
-        elif direction == 'forward':
-            st.session_state.calendar_date = st.session_state.calendar_date + relativedelta(months=1)
-        elif direction == 'today':
-            st.session_state.calendar_date = datetime.now()
-    
-    # Dynamic Title
-    current_month_str = st.session_state.calendar_date.strftime("%B %Y")
-    
-    # Custom CSS for Calendar Navigation (High Contrast)
-    st.markdown("""
-    <style>
-    /* Specific styling for the Prev/Next buttons */
-    /* Target buttons within columns directly above the calendar */
-    div[data-testid="stHorizontalBlock"] button {
-        background-color: #F9DC24 !important; /* Yellow Background */
-        color: #002FA7 !important; /* Blue Text */
-        border: 2px solid #002FA7 !important;
-        box-shadow: 2px 2px 0px #000000 !important;
-        font-family: 'VT323', monospace !important;
-        font-size: 24px !important;
-        line-height: 1 !important;
-        padding: 0px !important;
-        min-height: 48px !important; /* Match Title Height */
+# --- Calendar Events ---
+# Tag icon mapping for calendar event titles
+TAG_ICONS = {
+    "Work": "💼", "Personal": "🏠", "Urgent": "🚨", "Health": "💪",
+    "Social": "👥", "Learning": "📚", "Travel": "✈️", "Tavel": "✈️",
+}
+
+# FullCalendar overrides (pixel art grid)
+CALENDAR_CSS = """
+.fc-header-toolbar { display: none !important; }
+.fc-daygrid-day-top { flex-direction: row; }
+.fc-daygrid-day-number { 
+    font-family: 'VT323', monospace; 
+    font-size: 20px; 
+    color: #002FA7; 
+    padding: 4px;
+    text-decoration: none !important;
+}
+.fc-col-header-cell-cushion { 
+    font-family: 'VT323', monospace; 
+    font-size: 24px; 
+    font-weight: bold; 
+    color: #002FA7; 
+    text-transform: uppercase;
+    padding-bottom: 8px;
+}
+.fc-theme-standard td, .fc-theme-standard th {
+    border: 3px solid #002FA7 !important; /* Thick Grid Lines */
+}
+.fc-daygrid-day-frame {
+    border: none !important; /* Avoid double borders */
+}
+.fc .fc-daygrid-day.fc-day-today {
+    background-color: #F9DC24 !important; /* Bright Yellow Highlight */
+    background-image: linear-gradient(45deg, #F9DC24 25%, #FFF176 25%, #FFF176 50%, #F9DC24 50%, #F9DC24 75%, #FFF176 75%, #FFF176 100%);
+    background-size: 10px 10px;
+}
+.fc-daygrid-event {
+    border-width: 2px !important;
+    border-style: solid !important;
+    box-shadow: 2px 2px 0px 0px rgba(0,0,0,0.3) !important;
+    border-radius: 0px !important;
+    padding: 2px 4px !important;
+    font-family: 'VT323', monospace !important;
+    font-size: 16px !important;
+}
+.fc-scrollgrid {
+    border: 4px solid #002FA7 !important; /* Outer Border */
+}
+@media (prefers-color-scheme: dark) {
+    .fc-daygrid-day {
+        background-color: #E2E8F0 !important; /* Light gray for days in dark mode */
     }
-    div[data-testid="stHorizontalBlock"] button:hover {
-        background-color: #FFFFFF !important;
-        transform: translate(2px, 2px) !important;
-        box-shadow: none !important;
+    .fc-col-header-cell {
+        background-color: #E2E8F0 !important;
     }
-    </style>
-    """, unsafe_allow_html=True)
+}
+"""
 
-    # --- Pixel Art Calendar Header (Standalone) ---
-    c_prev, c_title, c_next = st.columns([0.15, 0.7, 0.15])
-    
-    with c_prev:
-        if st.button("◀", key="nav_back", help="Previous Month", use_container_width=True):
-            val_navigate('back')
-            st.rerun()
-            
-    with c_title:
-        st.markdown(f'''
-        <div style="
-            text-align: center; 
-            font-family: 'VT323', monospace; 
-            font-size: 36px; 
-            font-weight: bold; 
-            background-color: #002FA7; 
-            color: #F9DC24; 
-            text-transform: uppercase;
-            letter-spacing: 2px;
-            line-height: 48px;
-            /* Border and Shadow removed */
-        ">
-            {current_month_str}
-        </div>
-        ''', unsafe_allow_html=True)
-        
-    with c_next:
-        if st.button("▶", key="nav_fwd", help="Next Month", use_container_width=True):
-            val_navigate('forward')
-            st.rerun()
+@st.cache_resource
+def get_calendar_cache():
+    """Event lists keyed by (month, search query, projects revision, today), shared by every session."""
+    return MetricsCache(size=32)
 
-    # Spacer
-    st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-        
+def build_calendar_events(projects, today):
+    """FullCalendar event dicts for `projects`, colored like the PROJECT DASHBOARD categories."""
     events = []
-    today = datetime.now().date()
-    
-    # Tag icon mapping for calendar event titles
-    TAG_ICONS = {
-        "Work": "💼", "Personal": "🏠", "Urgent": "🚨", "Health": "💪",
-        "Social": "👥", "Learning": "📚", "Travel": "✈️", "Tavel": "✈️",
-    }
-
-    for p in filtered_projects:
+    for p in projects:
         # --- Color Logic: Match PROJECT DASHBOARD categories ---
-        status = p.get('status', 'Not Started')
-        vis_end = (p['end_date'] + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0) \
-                  if isinstance(p['end_date'], datetime) else p['end_date'] + timedelta(days=1)
-        
+        extra = p.extra or {}
+        status = extra.get('status', 'Not Started')
+        vis_end = p.end_day + timedelta(days=1)
+    
         # Calculate metrics for color
-        start_dw = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-        end_dw = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-        pct_exec = calculate_completion(p['tasks'])
+        start_dw = p.start_day
+        end_dw = p.end_day
+        pct_exec = calculate_completion(p)
         remaining_days = (end_dw - today).days + 1
-        
+    
         is_overdue = remaining_days <= 0 and pct_exec < 1.0
         is_urgent = remaining_days <= 3 and remaining_days > 0 and pct_exec < 1.0
         is_completed = pct_exec >= 1.0
         is_not_started = today < start_dw
-        
+    
         # Colors aligned with PROJECT DASHBOARD sidebar
         # DONE (gray) / DELAYED (red) / PLANNED (blue) / ACTIVE (yellow)
         if is_completed:
@@ -1450,79 +1440,116 @@ if view_mode == "Calendar":
 
         # Build tag icon prefix from first tag
         tag_icon = ""
-        p_tags = p.get('tags', [])
+        p_tags = p.tags
         if p_tags:
             tag_icon = TAG_ICONS.get(p_tags[0], "🏷️") + " "
 
-        title = f"{status_prefix}{tag_icon}{p['goal']} ({int(pct_exec*100)}%)"
+        title = f"{status_prefix}{tag_icon}{p.goal} ({int(pct_exec*100)}%)"
 
         evt = {
+            "id": p.id,
             "title": title,
-            "start": p['start_date'].strftime("%Y-%m-%d"),
+            "start": p.start_day.strftime("%Y-%m-%d"),
             "end": vis_end.strftime("%Y-%m-%d"),
             "backgroundColor": bg_color,
             "borderColor": border_color,
             "textColor": text_color,
             "extendedProps": {
-                "projectId": p.get('id', ''),
+                "projectId": p.id,
                 "status": status,
-                "description": p.get('description', '')
+                "description": extra.get('description', '')
             }
         }
         events.append(evt)
+    return events
+
+# --- Search Filter ---
+def filter_projects(query):
+    """Live projects matching the sidebar search (all of them for an empty query)."""
+    if not query:
+        return store.projects
+    # Ranked full-text hits (goal, checkpoints, reward, journal), then projects matched only by tag
+    filtered_projects = store.search_projects(query)
+    tag_only = store.tag_index.matching(query) - {p.id for p in filtered_projects}
+    filtered_projects += [p for p in map(store.projects.get, tag_only) if p is not None]
+    return filtered_projects
+
+def load_review_data():
+    """What the review modules show, read afresh on each (fragment) run."""
+    query = st.session_state.get('search_query', "")
+    # The date index covers all live projects, so it is only usable when search isn't narrowing them
+    return review_data(filter_projects(query), store.focus_rollups,
+                       date_index=None if query else store.date_index, frame=store.frame(),
+                       statuses=store.project_statuses(), revisions=store.revisions)
+
+# Function to handle date navigation
+def val_navigate(direction):
+    st.session_state.selected_project_id = None # Clear selection
+    st.session_state.calendar_last_click = None # The next month gets a fresh component
+    
+    if direction == 'back':
+        st.session_state.calendar_date = st.session_state.calendar_date - relativedelta(months=1)
+    elif direction == 'forward':
+        st.session_state.calendar_date = st.session_state.calendar_date + relativedelta(months=1)
+    elif direction == 'today':
+        st.session_state.calendar_date = datetime.now()
+
+@st.fragment(key="calendar")
+def render_calendar():
+    fragments.track("calendar", store.revisions, "projects")
+    search_query = st.session_state.get('search_query', "")
+    
+    # Dynamic Title
+    current_month_str = st.session_state.calendar_date.strftime("%B %Y")
 
-    # Calendar Rendering
-    pixel_art_css = """
-    .fc-header-toolbar { display: none !important; }
-    .fc-daygrid-day-top { flex-direction: row; }
-    .fc-daygrid-day-number { 
-        font-family: 'VT323', monospace; 
-        font-size: 20px; 
-        color: #002FA7; 
-        padding: 4px;
-        text-decoration: none !important;
-    }
-    .fc-col-header-cell-cushion { 
-        font-family: 'VT323', monospace; 
-        font-size: 24px; 
-        font-weight: bold; 
-        color: #002FA7; 
-        text-transform: uppercase;
-        padding-bottom: 8px;
-    }
-    .fc-theme-standard td, .fc-theme-standard th {
-        border: 3px solid #002FA7 !important; /* Thick Grid Lines */
-    }
-    .fc-daygrid-day-frame {
-        border: none !important; /* Avoid double borders */
-    }
-    .fc .fc-daygrid-day.fc-day-today {
-        background-color: #F9DC24 !important; /* Bright Yellow Highlight */
-        background-image: linear-gradient(45deg, #F9DC24 25%, #FFF176 25%, #FFF176 50%, #F9DC24 50%, #F9DC24 75%, #FFF176 75%, #FFF176 100%);
-        background-size: 10px 10px;
-    }
-    .fc-daygrid-event {
-        border-width: 2px !important;
-        border-style: solid !important;
-        box-shadow: 2px 2px 0px 0px rgba(0,0,0,0.3) !important;
-        border-radius: 0px !important;
-        padding: 2px 4px !important;
-        font-family: 'VT323', monospace !important;
-        font-size: 16px !important;
-    }
-    .fc-scrollgrid {
-        border: 4px solid #002FA7 !important; /* Outer Border */
-    }
-    @media (prefers-color-scheme: dark) {
-        .fc-daygrid-day {
-            background-color: #E2E8F0 !important; /* Light gray for days in dark mode */
-        }
-        .fc-col-header-cell {
-            background-color: #E2E8F0 !important;
-        }
-    }
-    """
+    # --- Pixel Art Calendar Header (Standalone) ---
+    c_prev, c_title, c_next = st.columns([0.15, 0.7, 0.15])
     
+    with c_prev:
+        st.button("◀", key="nav_back", help="Previous Month", use_container_width=True, on_click=val_navigate, args=('back',))
+            
+    with c_title:
+        st.markdown(f'''
+        <div style="
+            text-align: center; 
+            font-family: 'VT323', monospace; 
+            font-size: 36px; 
+            font-weight: bold; 
+            background-color: #002FA7; 
+            color: #F9DC24; 
+            text-transform: uppercase;
+            letter-spacing: 2px;
+            line-height: 48px;
+            /* Border and Shadow removed */
+        ">
+            {current_month_str}
+        </div>
+        ''', unsafe_allow_html=True)
+        
+    with c_next:
+        st.button("▶", key="nav_fwd", help="Next Month", use_container_width=True, on_click=val_navigate, args=('forward',))
+
+    # Spacer
+    st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+        
+    today = datetime.now().date()
+    
+    # Only build events for what the month grid can show (it spills up to two weeks past the month),
+    # and reuse them until the projects, the search or the day change
+    month_first = st.session_state.calendar_date.date().replace(day=1)
+    grid_start = month_first - timedelta(days=7)
+    grid_end = month_first + relativedelta(months=1) + timedelta(days=14)
+
+    def month_events():
+        if search_query:
+            visible_projects = [p for p in filter_projects(search_query) if p.start_day <= grid_end and p.end_day >= grid_start]
+        else:
+            visible_projects = store.projects_between(grid_start, grid_end)
+        return build_calendar_events(visible_projects, today)
+
+    events = get_calendar_cache().get((month_first, search_query, store.revisions["projects"], today), month_events)
+
+    # Calendar Rendering
     init_date = st.session_state.calendar_date.strftime("%Y-%m-%d")
     
     opts = {
@@ -1536,27 +1563,76 @@ if view_mode == "Calendar":
     }
     
     calendar_callbacks = ["eventClick", "dateClick"]
-    cal = calendar(events=events, options=opts, callbacks=calendar_callbacks, key=f"cal_{st.session_state.calendar_version}_{init_date}", custom_css=pixel_art_css)
+    # Clicks don't remount the component: only month navigation and release_calendar_click() do
+    cal_key = f"cal_{month_first:%Y-%m}_{st.session_state.calendar_instance}"
+    cal = calendar(events=events, options=opts, callbacks=calendar_callbacks, key=cal_key, custom_css=CALENDAR_CSS)
     
     # Interaction Logic
-    if cal:
+    # Opening a project or picking a date reruns the whole app: the dialogs and the sidebar read them
+    # Act on a payload only the first time it is seen (see calendar_last_click)
+    if cal and cal != st.session_state.calendar_last_click:
+        st.session_state.calendar_last_click = cal
         if cal.get("eventClick"):
              event_data = cal["eventClick"].get("event", {})
              extended_props = event_data.get("extendedProps", {})
              cid = extended_props.get("projectId")
              if cid:
                  st.session_state.selected_project_id = cid
-                 st.session_state.calendar_version += 1
                  st.rerun()
         if cal.get("dateClick"):
             dstr = cal["dateClick"]["date"]
             try:
                 val = datetime.strptime(dstr, "%Y-%m-%d")
-                if st.session_state.clicked_date != val:
-                    st.session_state.clicked_date = val
-                    st.session_state.selected_project_id = None
-                    st.rerun()
-            except: pass
+            except (TypeError, ValueError):
+                val = None
+            # st.rerun() works by raising, so it stays outside the try
+            if val is not None and st.session_state.clicked_date != val:
+                st.session_state.clicked_date = val
+                st.session_state.selected_project_id = None
+                st.rerun()
+
+# --- Main Layout ---
+# Initialize Calendar State
+if 'calendar_date' not in st.session_state:
+    st.session_state.calendar_date = datetime.now()
+
+# Main Content Area (Full Width)
+st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+
+
+
+
+
+view_mode = st.session_state.view_mode
+
+# 1. CALENDAR VIEW
+if view_mode == "Calendar":
+    
+    # Custom CSS for Calendar Navigation (High Contrast)
+    st.markdown("""
+    <style>
+    /* Specific styling for the Prev/Next buttons */
+    /* Target buttons within columns directly above the calendar */
+    div[data-testid="stHorizontalBlock"] button {
+        background-color: #F9DC24 !important; /* Yellow Background */
+        color: #002FA7 !important; /* Blue Text */
+        border: 2px solid #002FA7 !important;
+        box-shadow: 2px 2px 0px #000000 !important;
+        font-family: 'VT323', monospace !important;
+        font-size: 24px !important;
+        line-height: 1 !important;
+        padding: 0px !important;
+        min-height: 48px !important; /* Match Title Height */
+    }
+    div[data-testid="stHorizontalBlock"] button:hover {
+        background-color: #FFFFFF !important;
+        transform: translate(2px, 2px) !important;
+        box-shadow: none !important;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+    render_calendar()
 
 # 3. REVIEW DASHBOARD (Replaces List)
 elif view_mode == "Review":
@@ -1576,7 +1652,7 @@ elif view_mode == "Review":
     </style>
     """, unsafe_allow_html=True)
     
-    render_review_dashboard(filtered_projects)
+    render_review_dashboard(load_review_data)
 
 # --- 7. MODAL DISPATCHER (Mutually Exclusive) ---
 if st.session_state.show_bin:
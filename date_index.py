@@ -0,0 +1,130 @@
+# Date Index
+# Interval index over each project's [start_day, end_day], so "which projects overlap [a, b]"
+# doesn't test every project. It is a treap (randomized balanced BST) keyed by (start_day, id)
+# whose nodes also carry the latest end_day in their subtree: a subtree is skipped as soon as it
+# ends before `a`, and everything right of a node that starts after `b` is skipped too.
+# Insert/remove are O(log n) expected; a query costs O(log n + k) for calendar-like data (it
+# degrades towards O(k log n) only when many long intervals nest).
+
+import random
+
+
+class _Node:
+    __slots__ = ("key", "end", "project", "prio", "left", "right", "max_end")
+
+    def __init__(self, key, end, project):
+        self.key = key          # (start_day, id)
+        self.end = end
+        self.project = project
+        self.prio = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+
+    def update(self):
+        m = self.end
+        if self.left is not None and self.left.max_end > m: m = self.left.max_end
+        if self.right is not None and self.right.max_end > m: m = self.right.max_end
+        self.max_end = m
+
+
+def _rotate_right(node):
+    left = node.left
+    node.left, left.right = left.right, node
+    node.update()
+    left.update()
+    return left
+
+
+def _rotate_left(node):
+    right = node.right
+    node.right, right.left = right.left, node
+    node.update()
+    right.update()
+    return right
+
+
+def _insert(node, new):
+    if node is None:
+        return new
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+        if node.left.prio > node.prio:
+            node = _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.prio > node.prio:
+            node = _rotate_left(node)
+    node.update()
+    return node
+
+
+def _delete(node, key):
+    if node is None:
+        return None
+    if key < node.key:
+        node.left = _delete(node.left, key)
+    elif key > node.key:
+        node.right = _delete(node.right, key)
+    else:
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        # Rotate the higher-priority child up and keep sinking the node until it is a leaf
+        if node.left.prio > node.right.prio:
+            node = _rotate_right(node)
+            node.right = _delete(node.right, key)
+        else:
+            node = _rotate_left(node)
+            node.left = _delete(node.left, key)
+    node.update()
+    return node
+
+
+class IntervalIndex:
+    """Live projects indexed by their date span. Re-index a project with update() after editing its dates."""
+
+    def __init__(self, projects=()):
+        self._root = None
+        self._keys = {}  # project id -> key it is indexed under
+        for p in projects:
+            self.add(p)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, project):
+        if project.id in self._keys:
+            self.remove(project.id)
+        key = (project.start_day, project.id)
+        self._root = _insert(self._root, _Node(key, project.end_day, project))
+        self._keys[project.id] = key
+
+    def remove(self, project_id):
+        key = self._keys.pop(project_id, None)
+        if key is not None:
+            self._root = _delete(self._root, key)
+
+    def update(self, project):
+        """Re-index after start_date/end_date changed (same as add for a known project)."""
+        self.add(project)
+
+    def overlapping(self, start, end):
+        """Projects with start_day <= end and end_day >= start, ordered by start_day."""
+        out = []
+        stack, node = [], self._root
+        # In-order walk with pruning
+        while stack or node is not None:
+            while node is not None and node.max_end >= start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                break
+            node = stack.pop()
+            if node.key[0] > end:
+                break  # this node and everything after it starts too late
+            if node.end >= start:
+                out.append(node.project)
+            node = node.right
+        return out
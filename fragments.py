@@ -0,0 +1,50 @@
+# Fragment Invalidation
+# The sidebar modules, the calendar and the review modules each render as a keyed st.fragment, so a
+# widget inside one reruns only that unit instead of the whole script. Every unit calls track() as it
+# renders, recording which store collections it reads and their revisions at that moment. A widget
+# callback that changes store data then calls invalidate(), which reruns exactly the units whose
+# collections have moved on since they rendered (plus any named explicitly); a unit that reads none of
+# the changed collections keeps what it is showing.
+# Keyed reruns (st.rerun("<key>")) are only allowed from widget callbacks; when a rerun can't be
+# targeted (e.g. a unit's key isn't registered with Streamlit yet) it falls back to a full-app rerun.
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+_REGISTRY = "rendered_fragments"  # session_state key: fragment key -> {collection: revision}
+
+
+def reset():
+    """Forget the previous layout; called at the top of every full-app run."""
+    st.session_state[_REGISTRY] = {}
+
+
+def track(key, revisions, *collections):
+    """Record that fragment `key` is rendering from `collections` as of `revisions` (store.revisions)."""
+    st.session_state.setdefault(_REGISTRY, {})[key] = {c: revisions[c] for c in collections}
+
+
+def stale(revisions):
+    """Keys of the rendered fragments whose collections changed since they last rendered."""
+    return [key for key, seen in st.session_state.get(_REGISTRY, {}).items()
+            if any(revisions[c] != rev for c, rev in seen.items())]
+
+
+def rerun(*keys):
+    """
+    From a widget callback: rerun the named fragments (those rendered in this layout).
+    Returns normally when none of them is rendered, leaving the interaction's default rerun.
+    """
+    rendered = st.session_state.get(_REGISTRY, {})
+    targets = [k for k in dict.fromkeys(keys) if k in rendered]
+    if not targets:
+        return
+    try:
+        st.rerun(targets)
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def invalidate(revisions, *keys):
+    """From a widget callback, after a store change: rerun the stale fragments and those in `keys`."""
+    rerun(*stale(revisions), *keys)
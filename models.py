@@ -0,0 +1,276 @@
+# Pacer Models
+# Compact records for projects and their checkpoints. Dates are normalized once, when a record is
+# built or a date field is assigned (ISO strings / dates -> datetime), and the calendar day of each
+# is cached alongside, so calculators never re-check types per render.
+# to_dict() / from_dict() round-trip the existing JSON schema; unknown keys are kept in `extra`.
+# from_record() is the loader's fast path for records already in the current on-disk schema.
+
+from datetime import datetime, date
+
+PROJECT_KEYS = ("id", "goal", "tasks", "start_date", "end_date", "tags", "created_at", "completed_at", "reward", "deleted_at")
+TASK_KEYS = ("id", "task", "completed")
+_PROJECT_KEY_SET = frozenset(PROJECT_KEYS)
+_TASK_KEY_SET = frozenset(TASK_KEYS)
+
+
+def to_datetime(value):
+    """datetime, date or ISO string -> datetime. Unparseable values become None."""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            try:
+                return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                return None
+    return None
+
+
+def _day(value):
+    return value.date() if value is not None else None
+
+
+class Task:
+    __slots__ = ("id", "task", "completed", "extra")
+
+    def __init__(self, task, completed=False, id=None, extra=None):
+        self.id = id
+        self.task = task
+        self.completed = completed
+        self.extra = extra or None  # most tasks have no extra keys; don't pay for an empty dict
+
+    @classmethod
+    def from_dict(cls, d):
+        extra = {k: v for k, v in d.items() if k not in TASK_KEYS}
+        return cls(d.get('task'), bool(d.get('completed', False)), d.get('id'), extra)
+
+    @classmethod
+    def from_record(cls, d):
+        """from_dict() for a record written by to_dict() (current on-disk schema): `completed` is a bool."""
+        if d.keys() <= _TASK_KEY_SET:
+            return cls(d.get('task'), d['completed'], d.get('id'))
+        return cls.from_dict(d)
+
+    def to_dict(self):
+        d = {}
+        if self.id is not None: d['id'] = self.id
+        if self.task is not None: d['task'] = self.task
+        d['completed'] = self.completed
+        if self.extra: d.update(self.extra)
+        return d
+
+    @property
+    def label(self):
+        """Display name; very old stores used `name` instead of `task`."""
+        if self.task is not None:
+            return self.task
+        return (self.extra or {}).get('name', 'Unnamed')
+
+
+class Project:
+    __slots__ = (
+        "id", "goal", "tags", "reward", "created_at", "extra",
+        "_tasks", "_start_date", "_end_date", "_completed_at", "_deleted_at",
+        "start_day", "end_day", "completed_day",
+        "done_count", "total_count",
+    )
+
+    def __init__(self, id, goal, start_date, end_date, tasks=None, tags=None, reward=None,
+                 created_at=None, completed_at=None, deleted_at=None, extra=None):
+        self.id = id
+        self.goal = goal
+        self.tasks = tasks if tasks is not None else []
+        self.tags = tags if tags is not None else []
+        self.reward = reward
+        self.created_at = to_datetime(created_at)
+        self.extra = extra or None
+        self.start_date = start_date
+        self.end_date = end_date
+        self.completed_at = completed_at
+        self.deleted_at = deleted_at
+
+    # Tasks: done_count / total_count are kept in step by the task methods below, so completion
+    # and status checks are O(1). Edit tasks through add_task / remove_task / set_task_completed;
+    # assigning `tasks` recounts.
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, value):
+        self._tasks = value
+        self.recount()
+
+    def add_task(self, task):
+        self._tasks.append(task)
+        self.total_count += 1
+        if task.completed:
+            self.done_count += 1
+
+    def remove_task(self, index):
+        task = self._tasks.pop(index)
+        self.total_count -= 1
+        if task.completed:
+            self.done_count -= 1
+        return task
+
+    def set_task_completed(self, task, completed):
+        if task.completed != completed:
+            task.completed = completed
+            self.done_count += 1 if completed else -1
+
+    def recount(self):
+        """Rebuild the counters from the task list. Returns True if they had drifted."""
+        done = sum(1 for t in self._tasks if t.completed)
+        total = len(self._tasks)
+        drifted = (getattr(self, 'done_count', done), getattr(self, 'total_count', total)) != (done, total)
+        self.done_count, self.total_count = done, total
+        return drifted
+
+    @property
+    def all_done(self):
+        return self.total_count > 0 and self.done_count == self.total_count
+
+    # Date fields: assigning any of them refreshes the cached day
+
+    @property
+    def start_date(self):
+        return self._start_date
+
+    @start_date.setter
+    def start_date(self, value):
+        self._start_date = to_datetime(value)
+        if self._start_date is None:
+            raise ValueError(f"Invalid start_date for project {self.id}: {value!r}")
+        self.start_day = self._start_date.date()
+
+    @property
+    def end_date(self):
+        return self._end_date
+
+    @end_date.setter
+    def end_date(self, value):
+        self._end_date = to_datetime(value)
+        if self._end_date is None:
+            raise ValueError(f"Invalid end_date for project {self.id}: {value!r}")
+        self.end_day = self._end_date.date()
+
+    @property
+    def completed_at(self):
+        return self._completed_at
+
+    @completed_at.setter
+    def completed_at(self, value):
+        self._completed_at = to_datetime(value)
+        self.completed_day = _day(self._completed_at)
+
+    @property
+    def deleted_at(self):
+        return self._deleted_at
+
+    @deleted_at.setter
+    def deleted_at(self, value):
+        self._deleted_at = to_datetime(value)
+
+    @property
+    def completion(self):
+        """Share of completed tasks (0.0 for a project without tasks)."""
+        if not self.total_count: return 0.0
+        return self.done_count / self.total_count
+
+    @classmethod
+    def from_dict(cls, d):
+        extra = {k: v for k, v in d.items() if k not in PROJECT_KEYS}
+        return cls(
+            str(d.get('id')), d.get('goal', ''), d.get('start_date'), d.get('end_date'),
+            tasks=[Task.from_dict(t) for t in d.get('tasks', [])],
+            tags=list(d.get('tags', [])), reward=d.get('reward'),
+            created_at=d.get('created_at'), completed_at=d.get('completed_at'),
+            deleted_at=d.get('deleted_at'), extra=extra,
+        )
+
+    @classmethod
+    def from_record(cls, d):
+        """
+        from_dict() for a record in the current on-disk schema (see SCHEMA_VERSION in persistence.py),
+        i.e. one written from to_dict(): dates are ISO strings or absent, so each is parsed with a single
+        fromisoformat() and no type checks.
+        """
+        iso = datetime.fromisoformat
+        p = cls.__new__(cls)
+        p.id = d['id']
+        p.goal = d.get('goal', '')
+        p.tags = d.get('tags', [])
+        p.reward = d.get('reward')
+        p.extra = None if d.keys() <= _PROJECT_KEY_SET else {k: v for k, v in d.items() if k not in _PROJECT_KEY_SET}
+        p._start_date = iso(d['start_date'])
+        p.start_day = p._start_date.date()
+        p._end_date = iso(d['end_date'])
+        p.end_day = p._end_date.date()
+        value = d.get('created_at')
+        p.created_at = iso(value) if value is not None else None
+        value = d.get('completed_at')
+        p._completed_at = iso(value) if value is not None else None
+        p.completed_day = _day(p._completed_at)
+        value = d.get('deleted_at')
+        p._deleted_at = iso(value) if value is not None else None
+        p.tasks = [Task.from_record(t) for t in d.get('tasks', ())]
+        return p
+
+    def to_dict(self):
+        """Plain dict in the stored schema (dates stay datetime; the JSON writers serialize them)."""
+        d = {
+            "id": self.id,
+            "goal": self.goal,
+            "tasks": [t.to_dict() for t in self.tasks],
+            "start_date": self._start_date,
+            "end_date": self._end_date,
+            "tags": self.tags,
+        }
+        if self.created_at is not None: d['created_at'] = self.created_at
+        if self._completed_at is not None: d['completed_at'] = self._completed_at
+        if self.reward is not None: d['reward'] = self.reward
+        if self._deleted_at is not None: d['deleted_at'] = self._deleted_at
+        if self.extra: d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Project(id={self.id!r}, goal={self.goal!r}, {self.start_day} -> {self.end_day}, tasks={len(self.tasks)})"
+
+
+class ProjectIndex:
+    """
+    Projects keyed by id, in insertion order (a dict keeps both), so lookup, add and remove are O(1).
+    Iterating yields a snapshot, so a session can loop over it while another session mutates it.
+    """
+    __slots__ = ("_by_id",)
+
+    def __init__(self, projects=()):
+        self._by_id = {p.id: p for p in projects}
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, project_id):
+        return project_id in self._by_id
+
+    def get(self, project_id):
+        return self._by_id.get(project_id)
+
+    def add(self, project):
+        """Append (or replace in place, if the id is already present)."""
+        self._by_id[project.id] = project
+
+    def pop(self, project_id):
+        return self._by_id.pop(project_id, None)
+
+    def clear(self):
+        self._by_id.clear()
@@ -1,113 +1,751 @@
+import io
 import os
 import json
+import time
+import gzip
+import shutil
+import tempfile
+import textwrap
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from models import Project, Task, to_datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, only in-process coordination
+    fcntl = None
 
 DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_store.json")
 
 def datetime_serializer(obj):
     if isinstance(obj, datetime):
         return obj.isoformat()
+    if isinstance(obj, (Project, Task)):
+        return obj.to_dict()
     raise TypeError(f"Type {type(obj)} not serializable")
 
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return [], []
+# --- Crash-Safe Writes ---
+# Files are never opened with "w" in place: content goes to a temp file in the same directory,
+# is fsynced and then renamed over the original, so a crash or a concurrent writer leaves either
+# the old or the new version. The previous versions are kept as <file>.1 (newest) ... <file>.N.
+BACKUP_GENERATIONS = int(os.environ.get("PACER_BACKUP_GENERATIONS", 3))
+
+def _rotate_generations(path):
+    if BACKUP_GENERATIONS <= 0 or not os.path.exists(path):
+        return
+    for i in range(BACKUP_GENERATIONS - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
     try:
-        with open(DATA_FILE, "r") as f:
-            data_dict = json.load(f)
-            # Support legacy format (list of projects) or new format (dict with projects and deleted)
-            if isinstance(data_dict, list):
-                projects = data_dict
-                deleted = []
-            else:
-                projects = data_dict.get('projects', [])
-                deleted = data_dict.get('deleted', [])
-
-            for p in projects + deleted:
-                if 'start_date' in p and isinstance(p['start_date'], str):
-                    p['start_date'] = datetime.fromisoformat(p['start_date'])
-                if 'end_date' in p and isinstance(p['end_date'], str):
-                    p['end_date'] = datetime.fromisoformat(p['end_date'])
-                if 'created_at' in p and isinstance(p['created_at'], str):
-                    p['created_at'] = datetime.fromisoformat(p['created_at'])
-                if 'deleted_at' in p and isinstance(p['deleted_at'], str):
-                    p['deleted_at'] = datetime.fromisoformat(p['deleted_at'])
-            return projects, deleted
-    except (json.JSONDecodeError, ValueError):
-        return [], []
-
-def save_data(projects, deleted=None):
+        # Hard link: the current file becomes generation 1 without copying it
+        os.link(path, f"{path}.1")
+    except OSError:
+        shutil.copyfile(path, f"{path}.1")
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(path), os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows, where directories can't be opened
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write(path, text, keep_generations=True):
+    """Durably replace `path` with `text` (temp file + fsync + rename). Returns bytes written."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+            written = f.tell()
+        if keep_generations:
+            _rotate_generations(path)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    _fsync_dir(path)
+    return written
+
+def load_json(path, default):
+    """
+    Parse `path`, falling back to the newest backup generation that still parses.
+    `default` is returned when the file doesn't exist or no generation is readable.
+    """
+    if not os.path.exists(path):
+        return default
+    for candidate in [path] + [f"{path}.{i}" for i in range(1, BACKUP_GENERATIONS + 1)]:
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, ValueError, OSError):
+            print(f"Unreadable data file, trying older generation: {candidate}")
+            continue
+        if candidate != path:
+            print(f"Recovered {os.path.basename(path)} from {candidate}")
+        return data
+    return default
+
+# --- Schema Versions ---
+# Every file records the schema it was written in: a "schema" key in pacer_store.json, pacer_tags.json,
+# pacer_journal.json and the rollups file, a {"schema": n} header line in pacer_focus.ndjson, and a
+# "schema" field on each mutation-log record. Files from before versioning count as version 1.
+# Loaders only parse the current version. An older file is upgraded once, step by step through
+# MIGRATIONS, and written back (the old file stays behind as backup generation .1).
+# Version 2: every date is an ISO string from datetime.isoformat() (or null when the original value
+# was unreadable, kept as "unparsed_date"), so a load costs one fromisoformat() per date.
+SCHEMA_VERSION = 2
+MIGRATIONS = {}  # (file kind, version) -> function upgrading that kind's data from version to version + 1
+
+def migration(kind, version):
+    """Register the decorated function as the `kind` migration from `version` to `version` + 1."""
+    def register(fn):
+        MIGRATIONS[(kind, version)] = fn
+        return fn
+    return register
+
+def schema_of(data):
+    return data.get("schema", 1) if isinstance(data, dict) else 1
+
+def upgrade(kind, data):
+    """`data` (the parsed content of a `kind` file) migrated to SCHEMA_VERSION."""
+    version = schema_of(data)
+    if version > SCHEMA_VERSION:
+        # Never load (and later overwrite) data we don't understand
+        raise RuntimeError(f"{kind} data has schema {version}; this version of Pacer reads up to {SCHEMA_VERSION}")
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[(kind, version)](data)
+        version += 1
+        data["schema"] = version
+    return data
+
+def load_versioned(path, kind, default, rewrite=None):
+    """
+    load_json() for a `kind` file, in the current schema (`default` if there is no readable file).
+    An older file is migrated and, if `rewrite` is given, written back once with rewrite(data).
+    """
+    data = load_json(path, None)
+    if data is None:
+        return default
+    outdated = schema_of(data) < SCHEMA_VERSION
+    data = upgrade(kind, data)
+    if outdated and rewrite is not None:
+        rewrite(data)
+        print(f"Upgraded {os.path.basename(path)} to schema {SCHEMA_VERSION}")
+    return data
+
+def _iso_or_none(value, entry):
+    """Version 2 date value for `value`; an unreadable one is kept in entry["unparsed_date"]."""
+    when = to_datetime(value)
+    if when is None and value is not None:
+        entry["unparsed_date"] = value
+    return when.isoformat() if when is not None else None
+
+# --- Cross-Process Coordination ---
+# Several workers (or processes) may share one data directory. Every write, and every check of what is
+# on disk, happens under an exclusive advisory lock on LOCK_FILE. REVISION_FILE holds a counter that each
+# successful save bumps, so a store can tell that someone else wrote since it last read or saved.
+LOCK_FILE = DATA_FILE + ".lock"
+REVISION_FILE = DATA_FILE + ".rev"
+
+@contextmanager
+def store_lock():
+    """Exclusive lock across processes; threads of one process also exclude each other (one fd each)."""
+    with open(LOCK_FILE, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def read_revision():
+    try:
+        with open(REVISION_FILE, "r") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def write_revision(revision):
+    atomic_write(REVISION_FILE, str(revision), keep_generations=False)
+
+# Append-only mutation log: each save appends one NDJSON record holding only the projects that
+# changed, and a background compactor folds the log back into DATA_FILE once it grows too big or too old.
+LOG_FILE = DATA_FILE + ".log"
+LOG_COMPACT_BYTES = int(os.environ.get("PACER_LOG_COMPACT_BYTES", 1024 * 1024))
+LOG_COMPACT_SECONDS = int(os.environ.get("PACER_LOG_COMPACT_SECONDS", 600))
+
+_store_lock = threading.RLock()
+# Encoded form of every project as last persisted (snapshot + log), keyed by collection then id
+_persisted = {"projects": {}, "deleted": {}}
+_log_started = None
+_compactor = None
+
+def _encode(p):
+    return json.dumps(p, default=datetime_serializer)
+
+def _replay_log(path, state):
+    """
+    Apply the records of a mutation log to `state` in order. Torn lines from a crash are skipped.
+    Returns True if any record predates SCHEMA_VERSION (its projects are upgraded on the way in).
+    """
+    global _log_started
+    outdated = False
+    if not os.path.exists(path):
+        return outdated
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if _log_started is None:
+                _log_started = record.get("ts", time.time())
+            version = schema_of(record)
+            outdated = outdated or version < SCHEMA_VERSION
+            for op in record.get("ops", []):
+                coll = state[op["coll"]]
+                if op["op"] == "put":
+                    data = op["data"]
+                    if version < SCHEMA_VERSION:
+                        data = upgrade("store", {"schema": version, "projects": [data]})["projects"][0]
+                    coll[op["id"]] = data
+                else:
+                    coll.pop(op["id"], None)
+    return outdated
+
+def _write_snapshot(projects_json, deleted_json):
+    return atomic_write(DATA_FILE, '{"schema": %d, "projects": [%s], "deleted": [%s]}' % (
+        SCHEMA_VERSION, ", ".join(projects_json), ", ".join(deleted_json)))
+
+@migration("store", 1)
+def _store_v2(data):
+    # The oldest files are a bare list of live projects
+    if isinstance(data, list):
+        data = {"projects": data}
+    # Round-trip through the model: dates become ISO strings, checkpoint flags bools
+    return {coll: [json.loads(_encode(Project.from_dict(p))) for p in data.get(coll, [])] for coll in ("projects", "deleted")}
+
+def _read_store(snapshot):
+    """
+    `snapshot` plus the replayed log, as plain JSON dicts in the current schema (dates still ISO
+    strings), and whether any of it was stored in an older schema.
+    """
+    global _log_started
+    state = {"projects": {}, "deleted": {}}
+    # Exactly this file, not load_json(): falling back to another generation is _load_store()'s call,
+    # and it has to know when that happened so the snapshot gets replaced
+    data_dict = None
+    if os.path.exists(snapshot):
+        try:
+            with open(snapshot, "r") as f:
+                data_dict = json.load(f)
+        except (ValueError, OSError) as e:
+            raise ValueError(f"{os.path.basename(snapshot)} is unreadable: {e}") from None
+    outdated = False
+    if data_dict is not None:
+        outdated = schema_of(data_dict) < SCHEMA_VERSION
+        data_dict = upgrade("store", data_dict)
+        for coll in state:
+            for p in data_dict.get(coll, []):
+                state[coll][str(p.get('id'))] = p
+
+    # Replay a log left behind by an interrupted compaction first, then the live log
+    _log_started = None
+    outdated = _replay_log(LOG_FILE + ".compacting", state) or outdated
+    outdated = _replay_log(LOG_FILE, state) or outdated
+    return list(state["projects"].values()), list(state["deleted"].values()), outdated
+
+def _rewrite_snapshot(projects, deleted, reason):
+    """Fold everything into a fresh current-schema snapshot and drop the logs. Call with store_lock() held."""
+    global _log_started
+    _write_snapshot([json.dumps(p) for p in projects], [json.dumps(p) for p in deleted])
+    for stale in (LOG_FILE + ".compacting", LOG_FILE):
+        if os.path.exists(stale): os.remove(stale)
+    _log_started = None
+    print(f"{reason}: rewrote {os.path.basename(DATA_FILE)} (schema {SCHEMA_VERSION})")
+
+def load_raw_store(upgrade_file=True):
+    """
+    Snapshot plus replayed log, as plain JSON dicts in the current schema (dates still ISO strings).
+    An outdated snapshot or log is folded into a current snapshot on disk unless `upgrade_file` is False.
+    Call with store_lock() held when upgrading.
+    """
+    projects, deleted, outdated = _read_store(DATA_FILE)
+    if outdated and upgrade_file:
+        _rewrite_snapshot(projects, deleted, "Schema upgrade")
+    return projects, deleted
+
+def _load_store():
+    """
+    (raw projects, raw deleted, projects, deleted, rewrite) from the newest snapshot generation whose
+    records all load; `rewrite` says why the snapshot should be rewritten (None: it shouldn't).
+    Raises RuntimeError when no generation loads.
+    """
+    errors = []
+    for snapshot in [DATA_FILE] + [f"{DATA_FILE}.{i}" for i in range(1, BACKUP_GENERATIONS + 1)]:
+        if snapshot != DATA_FILE and not os.path.exists(snapshot):
+            continue
+        try:
+            raw_projects, raw_deleted, outdated = _read_store(snapshot)
+            # Records are in the current schema: dates are parsed once here, without type sniffing
+            projects = [Project.from_record(p) for p in raw_projects]
+            deleted = [Project.from_record(p) for p in raw_deleted]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            errors.append(f"{os.path.basename(snapshot)}: {e!r}")
+            continue
+        if snapshot != DATA_FILE:
+            rewrite = f"Recovered from {os.path.basename(snapshot)} after {errors[0]}"
+        else:
+            rewrite = "Schema upgrade" if outdated else None
+        return raw_projects, raw_deleted, projects, deleted, rewrite
+    raise RuntimeError("No readable project store: " + "; ".join(errors))
+
+def load_data():
+    """
+    Live and binned projects. A snapshot that can't be parsed, or holds a record that can't be loaded,
+    falls back to the newest backup generation that loads completely, which then replaces the snapshot
+    (the bad file is kept as generation .1).
+    Raises RuntimeError if no generation loads: an unreadable store is never mistaken for an empty one.
+    """
+    with _store_lock:
+        raw_projects, raw_deleted, projects, deleted, rewrite = _load_store()
+        if rewrite:
+            _rewrite_snapshot(raw_projects, raw_deleted, rewrite)
+
+        # A current record encodes exactly as _encode() of the project built from it
+        _persisted["projects"] = {p["id"]: json.dumps(p) for p in raw_projects}
+        _persisted["deleted"] = {p["id"]: json.dumps(p) for p in raw_deleted}
+        return projects, deleted
+
+def save_data(projects, deleted=None, ids=None):
+    """
+    Persist the store. Only projects whose content changed since the last load/save are written,
+    as one appended log record; the full snapshot is rewritten by compact_log() in the background.
+    `ids`: the only projects that can have changed (added, edited, moved or removed) since then, so
+    just those are encoded and compared; None compares every project.
+    Returns the number of bytes written (0 when nothing changed).
+    """
+    global _log_started
     if deleted is None: deleted = []
-    with open(DATA_FILE, "w") as f:
-        json.dump({"projects": projects, "deleted": deleted}, f, default=datetime_serializer, indent=4)
+    with _store_lock:
+        if not os.path.exists(DATA_FILE):
+            # First save (or snapshot removed by hand): start over from a full snapshot
+            current = {
+                "projects": {p.id: _encode(p) for p in projects},
+                "deleted": {p.id: _encode(p) for p in deleted},
+            }
+            for stale in (LOG_FILE, LOG_FILE + ".compacting"):
+                if os.path.exists(stale): os.remove(stale)
+            written = _write_snapshot(current["projects"].values(), current["deleted"].values())
+            _persisted.update(current)
+            return written
+
+        if ids is None:
+            current = {
+                "projects": {p.id: _encode(p) for p in projects},
+                "deleted": {p.id: _encode(p) for p in deleted},
+            }
+            gone = {coll: [pid for pid in _persisted[coll] if pid not in current[coll]] for coll in current}
+        else:
+            ids = set(ids)
+            current = {
+                "projects": {p.id: _encode(p) for p in projects if p.id in ids},
+                "deleted": {p.id: _encode(p) for p in deleted if p.id in ids},
+            }
+            gone = {coll: [pid for pid in ids if pid in _persisted[coll] and pid not in current[coll]] for coll in current}
+
+        ops = []
+        for coll, encoded in current.items():
+            known = _persisted[coll]
+            for pid, enc in encoded.items():
+                if known.get(pid) != enc:
+                    ops.append('{"op": "put", "coll": "%s", "id": %s, "data": %s}' % (coll, json.dumps(pid), enc))
+            for pid in gone[coll]:
+                ops.append('{"op": "del", "coll": "%s", "id": %s}' % (coll, json.dumps(pid)))
+        if not ops:
+            return 0
+
+        now = time.time()
+        record = '{"ts": %s, "schema": %d, "ops": [%s]}\n' % (now, SCHEMA_VERSION, ", ".join(ops))
+        with open(LOG_FILE, "a") as f:
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        for coll, encoded in current.items():
+            known = _persisted[coll]
+            known.update(encoded)
+            for pid in gone[coll]:
+                del known[pid]
+        if _log_started is None:
+            _log_started = now
+        _maybe_compact()
+        return len(record)
+
+def _maybe_compact():
+    global _compactor
+    if _compactor is not None and _compactor.is_alive():
+        return
+    too_big = os.path.getsize(LOG_FILE) >= LOG_COMPACT_BYTES
+    too_old = _log_started is not None and time.time() - _log_started >= LOG_COMPACT_SECONDS
+    if too_big or too_old:
+        _compactor = threading.Thread(target=compact_log, name="pacer-log-compactor", daemon=True)
+        _compactor.start()
+
+def compact_log():
+    """
+    Fold the mutation log into a fresh DATA_FILE snapshot.
+    The snapshot is rebuilt from what is on disk rather than from this process's view, since other
+    workers may have appended to the log too; the whole fold runs under store_lock() so no save can
+    interleave. The log is rotated aside first and only removed once the snapshot is durable.
+    """
+    global _log_started
+    pending = LOG_FILE + ".compacting"
+    with store_lock(), _store_lock:
+        if not os.path.exists(LOG_FILE):
+            return
+        if os.path.exists(pending):
+            # A previous compaction died before finishing: keep its records and fold both
+            with open(LOG_FILE, "r") as src, open(pending, "a") as dst:
+                dst.write(src.read())
+            os.remove(LOG_FILE)
+        else:
+            os.replace(LOG_FILE, pending)
+        # Same recovery as load_data(); raises (leaving the pending log for the next try) if nothing loads
+        projects, deleted = _load_store()[:2]
+        _write_snapshot([_encode(p) for p in projects], [_encode(p) for p in deleted])
+        os.remove(pending)
+        _log_started = None
 
 # --- Journal Persistence ---
 JOURNAL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_journal.json")
 
+@migration("journal", 1)
+def _journal_v2(data):
+    for entry in data:
+        entry['date'] = _iso_or_none(entry.get('date'), entry)
+    return {"entries": data}
+
 def load_journal():
-    if not os.path.exists(JOURNAL_FILE):
-        return []
-    try:
-        with open(JOURNAL_FILE, "r") as f:
-            data = json.load(f)
-            # Ensure dates are parsed
-            for entry in data:
-                if 'date' in entry and isinstance(entry['date'], str):
-                    try:
-                        # Try full datetime first, then date
-                        entry['date'] = datetime.fromisoformat(entry['date'])
-                    except:
-                        pass
-            # Sort by date descending
-            data.sort(key=lambda x: x['date'] if isinstance(x['date'], datetime) else datetime.min, reverse=True)
-            return data
-    except (json.JSONDecodeError, ValueError):
-        return []
+    data = load_versioned(JOURNAL_FILE, "journal", {"entries": []}, lambda d: save_journal(d["entries"]))["entries"]
+    parse = datetime.fromisoformat
+    for entry in data:
+        value = entry.get('date')
+        if value is not None:
+            entry['date'] = parse(value)
+    # Sort by date descending
+    data.sort(key=lambda x: x.get('date') or datetime.min, reverse=True)
+    return data
 
 def save_journal(entries):
-    with open(JOURNAL_FILE, "w") as f:
-        json.dump(entries, f, default=datetime_serializer, indent=4)
+    return atomic_write(JOURNAL_FILE, json.dumps({"schema": SCHEMA_VERSION, "entries": entries}, default=datetime_serializer, indent=4))
 
 # --- Focus Timer Persistence ---
+# Sessions live in an append-only NDJSON log, one session per line, in the order they were recorded:
+# saving a new session appends one line instead of rewriting the history. The log is only rewritten
+# when the in-memory list no longer extends what is on disk (e.g. after a merge reordered it), or on load
+# when a torn last line from a crash has to be dropped or the log (or a legacy pacer_focus.json, which is
+# left in place) is from an older schema.
 FOCUS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_focus.json")
+FOCUS_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_focus.ndjson")
 
-def load_focus_data():
-    if not os.path.exists(FOCUS_FILE):
-        return []
+# What the log holds as of the last load/save: session count and the encoded last session.
+# count None = the log has to be (re)written in full on the next save.
+_focus_log = {"count": None, "tail": None}
+
+@migration("focus", 1)
+def _focus_v2(data):
+    for entry in data["sessions"]:
+        entry["date"] = _iso_or_none(entry.get("date"), entry)
+    return data
+
+def _focus_header():
+    return '{"schema": %d}\n' % SCHEMA_VERSION
+
+def read_focus_log():
+    """
+    Sessions in the current schema (dates still ISO strings) from the focus log, or from an older log /
+    the legacy JSON file migrated in memory, and whether the log needs a rewrite.
+    """
+    if not os.path.exists(FOCUS_LOG_FILE):
+        data = load_json(FOCUS_FILE, [])
+        data.sort(key=lambda s: str(s.get("date", "")))  # legacy file: one-off sort
+        return upgrade("focus", {"sessions": data})["sessions"], True
+    with open(FOCUS_LOG_FILE, "r") as f:
+        lines = f.read().split("\n")
+    # Text after the last newline is a half-written line from a crash: kept if it parses, and
+    # dropped from the file by the rewrite either way
+    needs_rewrite = lines[-1] != ""
+    if not needs_rewrite:
+        lines.pop()
+    version = 1
+    if lines and lines[0].startswith('{"schema"'):
+        version = json.loads(lines.pop(0))["schema"]
     try:
-        with open(FOCUS_FILE, "r") as f:
-            data = json.load(f)
-            for entry in data:
-                if 'date' in entry and isinstance(entry['date'], str):
-                    try:
-                        entry['date'] = datetime.fromisoformat(entry['date'])
-                    except:
-                        # Fallback for other formats
-                        try:
-                            entry['date'] = datetime.strptime(entry['date'], "%Y-%m-%d %H:%M:%S")
-                        except: pass
-            # Sort by date
-            data.sort(key=lambda x: x['date'] if isinstance(x['date'], datetime) else datetime.min)
-            return data
-    except (json.JSONDecodeError, ValueError):
-        return []
+        # One parse for the whole log instead of one per line
+        sessions = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        sessions = []
+        for line in lines:
+            try:
+                sessions.append(json.loads(line))
+            except ValueError:
+                needs_rewrite = True  # torn line; skipped
+    needs_rewrite = needs_rewrite or version < SCHEMA_VERSION
+    return upgrade("focus", {"schema": version, "sessions": sessions})["sessions"], needs_rewrite
+
+def _write_focus_log(sessions):
+    return atomic_write(FOCUS_LOG_FILE, _focus_header() + "".join(_encode(s) + "\n" for s in sessions), keep_generations=False)
+
+def load_focus_data():
+    """Sessions in recording order, streamed from the log (no sort). An outdated or torn log is rewritten."""
+    with _store_lock:
+        sessions, needs_rewrite = read_focus_log()
+        if needs_rewrite and (sessions or os.path.exists(FOCUS_LOG_FILE)):
+            _write_focus_log(sessions)
+        parse = datetime.fromisoformat
+        for s in sessions:
+            value = s.get("date")
+            if value is not None:
+                s["date"] = parse(value)
+        # No log yet: the first save writes it in full, header included
+        _focus_log["count"] = len(sessions) if os.path.exists(FOCUS_LOG_FILE) else None
+        _focus_log["tail"] = _encode(sessions[-1]) if sessions else None
+        return sessions
 
 def save_focus_data(sessions):
-    with open(FOCUS_FILE, "w") as f:
-        json.dump(sessions, f, default=datetime_serializer, indent=4)
+    """Append the sessions recorded since the last load/save; returns the bytes written."""
+    with _store_lock:
+        count = _focus_log["count"]
+        extends_log = (
+            count is not None and len(sessions) >= count
+            and (_encode(sessions[count - 1]) if count else None) == _focus_log["tail"]
+        )
+        if extends_log:
+            new = sessions[count:]
+            if not new:
+                return 0
+            text = "".join(_encode(s) + "\n" for s in new)
+            with open(FOCUS_LOG_FILE, "a") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            written = len(text)
+        else:
+            written = _write_focus_log(sessions)
+        _focus_log["count"] = len(sessions)
+        _focus_log["tail"] = _encode(sessions[-1]) if sessions else None
+        return written
+
+# Day/month/project rollups of the sessions (focus_rollups.py). Derived data: no backup generations,
+# and a missing or stale file is simply rebuilt from the sessions.
+FOCUS_ROLLUPS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_focus_rollups.json")
+
+def load_focus_rollups():
+    data = load_json(FOCUS_ROLLUPS_FILE, None)
+    # Derived data is rebuilt rather than migrated
+    return data if schema_of(data) == SCHEMA_VERSION else None
+
+def save_focus_rollups(rollups):
+    return atomic_write(FOCUS_ROLLUPS_FILE, json.dumps({"schema": SCHEMA_VERSION, **rollups}), keep_generations=False)
 
 # --- Tag Persistence ---
 TAGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_tags.json")
+DEFAULT_TAGS = ["Work", "Personal", "Urgent", "Health", "Social", "Learning"]
+
+@migration("tags", 1)
+def _tags_v2(data):
+    return {"tags": data}
 
 def load_tags():
-    if not os.path.exists(TAGS_FILE):
-        return ["Work", "Personal", "Urgent", "Health", "Social", "Learning"] # Defaults
-    try:
-        with open(TAGS_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return ["Work", "Personal", "Urgent", "Health", "Social", "Learning"]
+    return load_versioned(TAGS_FILE, "tags", {"tags": list(DEFAULT_TAGS)}, lambda d: save_tags(d["tags"]))["tags"]
 
 def save_tags(tags):
-    with open(TAGS_FILE, "w") as f:
-        json.dump(tags, f, indent=4)
+    return atomic_write(TAGS_FILE, json.dumps({"schema": SCHEMA_VERSION, "tags": tags}, indent=4))
+
+# --- Backup Export ---
+# The sidebar's "Backup Data" download (pacer.json, optionally gzipped). The file is written one record
+# at a time instead of building the whole document as one dict and one string first; the bytes are the
+# same as json.dumps(backup, indent=2, default=str) would produce.
+BACKUP_VERSION = "1.0"
+
+def _write_array(out, name, records, last=False):
+    out.write(f'  "{name}": ')
+    first = True
+    for rec in records:
+        out.write("[\n" if first else ",\n")
+        out.write(textwrap.indent(json.dumps(rec, indent=2, default=str), "    "))
+        first = False
+    out.write("[]" if first else "\n  ]")
+    out.write("\n" if last else ",\n")
+
+def write_backup(out, projects, deleted, focus_sessions, tags, timestamp=None):
+    """Write a full backup document to the text stream `out`; projects are serialized one at a time."""
+    timestamp = timestamp or datetime.now()
+    out.write("{\n")
+    out.write(f'  "version": {json.dumps(BACKUP_VERSION)},\n')
+    out.write(f'  "timestamp": {json.dumps(timestamp.isoformat())},\n')
+    _write_array(out, "projects", (p.to_dict() for p in projects))
+    _write_array(out, "deleted_projects", (p.to_dict() for p in deleted))
+    _write_array(out, "focus_sessions", focus_sessions)
+    _write_array(out, "tags", tags, last=True)
+    out.write("}")
+
+def export_backup(path, projects, deleted, focus_sessions, tags, compress=False):
+    """Write a backup to `path` (gzip-compressed if `compress`) via a temp file + rename. Returns its size."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            if compress:
+                # mtime=0: the same data always compresses to the same bytes
+                with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz, \
+                        io.TextIOWrapper(gz, encoding="utf-8") as out:
+                    write_backup(out, projects, deleted, focus_sessions, tags)
+            else:
+                with io.TextIOWrapper(raw, encoding="utf-8") as out:
+                    write_backup(out, projects, deleted, focus_sessions, tags)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    return os.path.getsize(path)
+
+# --- Backup Import ---
+# Backups can be far larger than anything worth holding as one parsed document, so they are read as a
+# stream: the top-level object is walked key by key and each array (projects, deleted_projects,
+# focus_sessions, tags) is yielded one element at a time, decoding from a small rolling buffer.
+# gzip-compressed backups (pacer.json.gz) are detected by their magic bytes.
+BACKUP_SECTIONS = ("projects", "deleted_projects", "focus_sessions", "tags")
+_CHUNK = 1 << 16
+# Largest single record (in characters) the reader will buffer; a malformed document fails here
+# instead of being read into memory to the end
+MAX_BACKUP_RECORD = int(os.environ.get("PACER_BACKUP_MAX_RECORD", 64 * 1024 * 1024))
+
+class _StreamDecoder:
+    """JSON tokens from a text stream, holding only the undecoded tail of what has been read."""
+
+    def __init__(self, text):
+        self.text = text
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        pending = len(self.buf) - self.pos
+        if pending > MAX_BACKUP_RECORD:
+            raise ValueError(f"Malformed backup: a record is larger than {MAX_BACKUP_RECORD:,} characters")
+        # Read at least as much as is already pending, so a very large record takes O(log n) retries
+        chunk = self.text.read(min(max(_CHUNK, pending), MAX_BACKUP_RECORD))
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def peek(self):
+        """Next non-whitespace character ("" at the end of the stream)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed backup: expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value, reading more of the stream until it fits in the buffer."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"Malformed backup: {e.msg}") from None
+                self._fill()
+                continue
+            if end == len(self.buf) and not self.eof:
+                self._fill()  # a number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+
+def open_backup(f):
+    """
+    Text stream over a backup file object opened in binary mode (plain or gzip-compressed).
+    Closing the stream closes `f`: detach() it to hand `f` back open.
+    """
+    head = f.read(2)
+    f.seek(0)
+    if head == b"\x1f\x8b":
+        f = gzip.GzipFile(fileobj=f, mode="rb")
+    return io.TextIOWrapper(f, encoding="utf-8")
+
+def iter_backup(f):
+    """
+    Stream the backup in the binary file object `f` as (key, value) pairs: one pair per element of the
+    BACKUP_SECTIONS arrays, and one per other top-level key (e.g. ("version", "1.0")).
+    Raises ValueError as soon as the document stops being a well-formed backup (including truncated
+    or corrupt gzip data). `f` is left open.
+    """
+    text = open_backup(f)
+    try:
+        yield from _iter_backup(_StreamDecoder(text))
+    except (OSError, EOFError, UnicodeDecodeError) as e:
+        # gzip.BadGzipFile is an OSError; a truncated .gz ends in EOFError
+        raise ValueError(f"Unreadable backup: {e}") from None
+    except RecursionError:
+        raise ValueError("Malformed backup: values nested too deeply") from None
+    finally:
+        text.detach()
+
+def _iter_backup(reader):
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Malformed backup: expected a key")
+        reader.expect(":")
+        if key in BACKUP_SECTIONS:
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.peek() == "]":
+                        reader.pos += 1
+                        break
+                    reader.expect(",")
+        else:
+            yield key, reader.value()
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
+
+# --- Storage Engine Selection ---
+# PACER_STORAGE=sqlite swaps the JSON files above for a single WAL-mode database
+# (sqlite_store.py) behind the same functions. Existing JSON stores are imported on first use.
+STORAGE_BACKEND = os.environ.get("PACER_STORAGE", "json").lower()
+
+if STORAGE_BACKEND == "sqlite":
+    from sqlite_store import (
+        read_revision, write_revision,
+        load_data, save_data, load_journal, save_journal,
+        load_focus_data, save_focus_data, load_focus_rollups, save_focus_rollups,
+        load_tags, save_tags,
+    )
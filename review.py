@@ -6,7 +6,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 from persistence import save_data, load_journal, save_journal, load_focus_data
 from ai_suggestions import analyze_patterns, generate_suggestions
+from focus_rollups import FocusRollups
+from analytics import ProjectFrame, period_stats, project_status, project_statuses
+import fragments
 import uuid
+from collections import Counter
+from typing import NamedTuple
 import textwrap
 
 # FIX: Light Mode Compatible Buttons for Review Dashboard
@@ -73,14 +78,124 @@ def view_project_list_dialog(title, p_infos):
                 st.rerun()
 
 
-def render_review_dashboard(projects):
+class ReviewData(NamedTuple):
+    """What the review modules read; build it with review_data()."""
+    projects: list
+    focus_rollups: FocusRollups
+    date_index: object       # the store's IntervalIndex, or None
+    frame: ProjectFrame
+    statuses: dict           # project id -> analytics.ProjectStatus
+    today: object            # date
+    revisions: dict = None   # the store's revisions, for fragment invalidation (see fragments.py)
+
+    def status_of(self, p):
+        s = self.statuses.get(p.id)
+        return s if s is not None else project_status(p, self.today)
+
+    def overlapping(self, start, end):
+        """Projects with start <= end and end >= start (inclusive on both sides)."""
+        if self.date_index is not None:
+            return self.date_index.overlapping(start, end)
+        return [p for p in self.projects if p.start_day <= end and p.end_day >= start]
+
+
+def review_data(projects, focus_rollups=None, date_index=None, frame=None, statuses=None, revisions=None):
+    """
+    `focus_rollups` (the store's FocusRollups) feeds the Pomodoro chart; without it they are built
+    from the sessions on disk.
+    `date_index` (the store's IntervalIndex) answers the period overlap queries; pass it only when
+    `projects` is the full live list. Without it (e.g. a search-filtered subset) they scan `projects`.
+    `frame` (the store's analytics ProjectFrame) backs the KPI numbers; one is built from
+    `projects` when it isn't given.
+    `statuses` maps project id -> analytics.ProjectStatus (the store's cached records); every module
+    reads a project's status from it instead of classifying the project again.
+    `revisions` (the store's revisions) lets the modules re-render when the collections they show change.
+    """
+    today = datetime.now().date()
+    if focus_rollups is None:
+        focus_rollups = FocusRollups.from_sessions(load_focus_data())
+    if frame is None:
+        frame = ProjectFrame.from_projects(projects)
+    if statuses is None:
+        statuses = project_statuses(projects, today)
+    return ReviewData(projects, focus_rollups, date_index, frame, statuses, today, revisions)
+
+
+def _track(key, data, *collections):
+    if data.revisions is not None:
+        fragments.track(key, data.revisions, *collections)
+
+
+# --- Time Period ---
+# Picked in the KPI module; the drill-down and status modules list the same period's projects.
+PERIODS = ["Last 7 Days", "This Month", "This Year", "Custom Range"]
+PERIOD_MODULES = ("review_kpis", "review_drilldown", "review_status")
+
+
+def _period_changed():
+    fragments.rerun(*PERIOD_MODULES)
+
+
+def _period_projects(data, today):
+    """(period, projects in the selected period, projects in the period before it)."""
+    overlapping = data.overlapping
+    period = st.session_state.get("review_period", PERIODS[0])
+    custom_dates = (st.session_state.get("review_custom_dates") or []) if period == "Custom Range" else []
+
+    start_filter = None
+    end_filter = datetime.max.date()
+    prev_start_filter = None
+    prev_end_filter = None
+    prev_inclusive = False
+
+    if period == "Custom Range":
+        prev_inclusive = True
+        if len(custom_dates) == 2:
+            start_filter, end_filter = custom_dates[0], custom_dates[1]
+            duration = end_filter - start_filter
+            prev_end_filter = start_filter - timedelta(days=1)
+            prev_start_filter = prev_end_filter - duration
+        elif len(custom_dates) == 1:
+            start_filter = end_filter = custom_dates[0]
+        else:
+            start_filter = end_filter = today
+    elif period == "Last 7 Days":
+        start_filter = today - timedelta(days=7)
+        prev_start_filter = start_filter - timedelta(days=7)
+        prev_end_filter = start_filter
+    elif period == "This Month":
+        start_filter = today.replace(day=1)
+        first = today.replace(day=1)
+        prev_end_filter = first
+        prev_month = first - timedelta(days=1)
+        prev_start_filter = prev_month.replace(day=1)
+    elif period == "This Year":
+        start_filter = today.replace(month=1, day=1)
+        prev_end_filter = start_filter
+        prev_start_filter = start_filter.replace(year=start_filter.year-1)
+
+    # Use Overlap Logic: Project Start <= Filter End AND Project End >= Filter Start
+    current_projects = overlapping(start_filter, end_filter)
+    prev_projects = []
+    if prev_start_filter and prev_end_filter:
+        # Previous period (also overlap); the preset periods exclude their end day
+        prev_last = prev_end_filter if prev_inclusive else prev_end_filter - timedelta(days=1)
+        prev_projects = overlapping(prev_start_filter, prev_last)
+
+    return period, current_projects, prev_projects
+
+
+def render_review_dashboard(load):
+    """
+    `load()` returns the ReviewData to show (see review_data). Each module is a keyed fragment that
+    calls it again when it reruns on its own, so it always renders from current data.
+    """
     # Redirect pending details to the master selected_project_id
     if st.session_state.get('pending_detail_id'):
         st.session_state.selected_project_id = st.session_state.pending_detail_id
         st.session_state.pending_detail_id = None
         st.rerun()
 
-    today = datetime.now().date()
     # FIX: Light Mode Compatible Buttons & CARD STYLE
     st.markdown("""
     <style>
@@ -285,18 +400,23 @@ def render_review_dashboard(projects):
     </div>
     ''', unsafe_allow_html=True)
     
-    if not projects:
+    if not load().projects:
         st.info("No projects to review yet.")
         return
 
-    today = datetime.now().date()
-    
-    # --- Handle Pending Detail ---
-    # Unified dispatcher in app.py handles selected_project_id
-    if 'pending_detail_id' in st.session_state and st.session_state.pending_detail_id:
-        st.session_state.selected_project_id = st.session_state.pending_detail_id
-        st.session_state.pending_detail_id = None
-        st.rerun()
+    _density_module(load)
+    _kpi_module(load)
+    _drilldown_module(load)
+    _status_module(load)
+
+
+# --- Review Modules ---
+
+@st.fragment(key="review_density")
+def _density_module(load):
+    data = load()
+    _track("review_density", data, "projects", "focus")
+    today, status_of, overlapping = data.today, data.status_of, data.overlapping
 
     # --- MODULE 1: YEARLY DENSITY ---
     with st.container(border=True):
@@ -304,16 +424,11 @@ def render_review_dashboard(projects):
         
         start_year = today.replace(month=1, day=1)
         end_year = today.replace(month=12, day=31)
-        year_projects = []
-        for p in projects:
-            s = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-            e = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-            if s <= end_year and e >= start_year:
-                year_projects.append(p)
+        year_projects = overlapping(start_year, end_year)
 
         month_counts = {m: 0 for m in range(1, 13)}
         for p in year_projects:
-            s = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
+            s = p.start_day
             # Only count in the Start Month to avoid duplicate counting across months
             if s.year == today.year:
                 month_counts[s.month] += 1
@@ -366,25 +481,16 @@ def render_review_dashboard(projects):
             m = clicked_month
             if m == 12: ms, me = datetime(today.year, m, 1).date(), datetime(today.year, m, 31).date()
             else: ms, me = datetime(today.year, m, 1).date(), (datetime(today.year, m+1, 1) - timedelta(days=1)).date()
-            matches = []
-            for p in year_projects:
-                s = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-                e = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                if s <= me and e >= ms:
-                    matches.append(p)
+            matches = overlapping(ms, me)
             p_infos = []
             for p in matches:
-                comp = sum(1 for t in p['tasks'] if t['completed']) / len(p['tasks']) if p['tasks'] else 0
-                p_stat = "Active"
-                e_date = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                if comp >= 1.0: p_stat = "Completed"
-                elif today > e_date: p_stat = "Late"
+                p_stat = status_of(p).label
                 p_infos.append({
-                    "Goal": p['goal'],
-                    "Start": p['start_date'].strftime("%Y-%m-%d"),
-                    "Deadline": p['end_date'].strftime("%Y-%m-%d"),
+                    "Goal": p.goal,
+                    "Start": p.start_day.strftime("%Y-%m-%d"),
+                    "Deadline": p.end_day.strftime("%Y-%m-%d"),
                     "Status": p_stat,
-                    "_id": p.get('id')
+                    "_id": p.id
                 })
             view_project_list_dialog(f"{datetime(today.year, m, 1).strftime('%B')}", p_infos)
 
@@ -393,20 +499,8 @@ def render_review_dashboard(projects):
         st.markdown("---")
         st.markdown('<div class="rhythm-sub-header">Pomodoro Focus Time Statistics (Minutes):</div>', unsafe_allow_html=True)
         
-        # FOCUS STATS: Pull from session state first
-        focus_data = st.session_state.get('focus_sessions', load_focus_data())
-        focus_month_counts = {m: 0 for m in range(1, 13)}
-        
-        for sess in focus_data:
-            s_date = sess.get('date')
-            if s_date:
-                if isinstance(s_date, str):
-                    try:
-                        s_date = datetime.fromisoformat(s_date)
-                    except: continue
-                if s_date.year == today.year:
-                    m = s_date.month
-                    focus_month_counts[m] += sess.get('duration', 0)
+        # FOCUS STATS: Monthly buckets from the store's rollups (or the sessions on disk, see review_data)
+        focus_month_counts = data.focus_rollups.month_minutes(today.year)
         
         # Focus Bar Chart
         df_focus = pd.DataFrame([{"Month": datetime(today.year, m, 1).strftime("%b"), "Minutes": c} for m, c in focus_month_counts.items()])
@@ -439,6 +533,12 @@ def render_review_dashboard(projects):
         st.plotly_chart(fig_focus, use_container_width=True, key="chart_focus_year")
 
 
+@st.fragment(key="review_kpis")
+def _kpi_module(load):
+    data = load()
+    _track("review_kpis", data, "projects")
+    today, projects = data.today, data.projects
+
     # --- MODULE 2: KEY PERFORMANCE INDICATORS ---
     with st.container(border=True):
         st.markdown('<div class="review-card-header">📊 KPIs & Rhythm</div>', unsafe_allow_html=True)
@@ -448,103 +548,19 @@ def render_review_dashboard(projects):
         f_col1, f_col2 = st.columns([0.75, 0.25]) 
         with f_col1:
             st.markdown('<div class="rhythm-sub-header">Time Period</div>', unsafe_allow_html=True)
-            period = st.radio("Time Period", ["Last 7 Days", "This Month", "This Year", "Custom Range"], horizontal=True, label_visibility="collapsed")
+            period = st.radio("Time Period", PERIODS, horizontal=True, label_visibility="collapsed",
+                              key="review_period", on_change=_period_changed)
         with f_col2:
-            custom_dates = []
             if period == "Custom Range":
-                custom_dates = st.date_input("Select Date Range", value=[], help="Pick start and end dates")
-
-        start_filter = None
-        end_filter = datetime.max.date()
-        prev_start_filter = None
-        prev_end_filter = None
-        prev_inclusive = False
-
-        if period == "Custom Range":
-            prev_inclusive = True
-            if len(custom_dates) == 2:
-                start_filter, end_filter = custom_dates[0], custom_dates[1]
-                duration = end_filter - start_filter
-                prev_end_filter = start_filter - timedelta(days=1)
-                prev_start_filter = prev_end_filter - duration
-            elif len(custom_dates) == 1:
-                start_filter = end_filter = custom_dates[0]
-            else:
-                start_filter = end_filter = today
-        elif period == "Last 7 Days":
-            start_filter = today - timedelta(days=7)
-            prev_start_filter = start_filter - timedelta(days=7)
-            prev_end_filter = start_filter
-        elif period == "This Month":
-            start_filter = today.replace(day=1)
-            first = today.replace(day=1)
-            prev_end_filter = first
-            prev_month = first - timedelta(days=1)
-            prev_start_filter = prev_month.replace(day=1)
-        elif period == "This Year":
-            start_filter = today.replace(month=1, day=1)
-            prev_end_filter = start_filter
-            prev_start_filter = start_filter.replace(year=start_filter.year-1)
-
-        current_projects = []
-        prev_projects = []
-
-        for p in projects:
-            s_val = p.get('start_date')
-            if isinstance(s_val, str):
-                try: s_date = datetime.fromisoformat(s_val).date()
-                except: s_date = datetime.max.date()
-            elif isinstance(s_val, datetime):
-                s_date = s_val.date()
-            else:
-                s_date = s_val
-
-            e_val = p.get('end_date')
-            if isinstance(e_val, str):
-                try: e_date = datetime.fromisoformat(e_val).date()
-                except: e_date = datetime.max.date()
-            elif isinstance(e_val, datetime):
-                e_date = e_val.date()
-            else:
-                e_date = e_val
-            
-            # Use Overlap Logic: Project Start <= Filter End AND Project End >= Filter Start
-            if s_date <= end_filter and e_date >= start_filter:
-                current_projects.append(p)
-                
-            if prev_start_filter and prev_end_filter:
-                # Comparison logic for previous period (also overlap)
-                if prev_inclusive:
-                    if s_date <= prev_end_filter and e_date >= prev_start_filter: prev_projects.append(p)
-                else:
-                    if s_date < prev_end_filter and e_date >= prev_start_filter: prev_projects.append(p)
+                st.date_input("Select Date Range", value=[], help="Pick start and end dates",
+                              key="review_custom_dates", on_change=_period_changed)
 
+        period, current_projects, prev_projects = _period_projects(data, today)
         filtered = current_projects
 
         # --- Calculate Stats ---
         def calc_stats(projs):
-            if not projs: return 0, 0, 0, 0, 0, 0
-            cnt = len(projs)
-            avg_prog = sum(sum(1 for t in p['tasks'] if t['completed'])/len(p['tasks']) if p['tasks'] else 0 for p in projs) / cnt
-            on_time_cnt, early_cnt, late_cnt, total_delay = 0, 0, 0, 0
-            for p in projs:
-                comp = sum(1 for t in p['tasks'] if t['completed'])/len(p['tasks']) if p['tasks'] else 0
-                e_date = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                if comp >= 1.0:
-                    c_at = p.get('completed_at')
-                    is_early = False
-                    if c_at:
-                        try:
-                            c_dt = datetime.fromisoformat(str(c_at)) if isinstance(c_at, str) else c_at
-                            if c_dt.date() < e_date: is_early = True
-                        except: pass
-                    if is_early: early_cnt += 1
-                    else: on_time_cnt += 1
-                else:
-                    if today > e_date:
-                        late_cnt += 1
-                        total_delay += (today - e_date).days
-            return cnt, avg_prog, (early_cnt/cnt if cnt else 0), (on_time_cnt/cnt if cnt else 0), (late_cnt/cnt if cnt else 0), (total_delay/late_cnt if late_cnt else 0)
+            return period_stats(data.frame, data.frame.rows(projs), today)
 
         curr_cnt, curr_prog, curr_early, curr_ot, curr_lr, curr_del = calc_stats(current_projects)
         prev_cnt, prev_prog, prev_early, prev_ot, prev_lr, prev_del = calc_stats(prev_projects)
@@ -627,7 +643,7 @@ def render_review_dashboard(projects):
         </div>
         """, unsafe_allow_html=True)
             
-        patterns = analyze_patterns(projects)
+        patterns = analyze_patterns(projects, data.frame)
         suggestions = generate_suggestions(patterns)
         
         if not suggestions:
@@ -652,6 +668,13 @@ def render_review_dashboard(projects):
                     """, unsafe_allow_html=True)
 
 
+@st.fragment(key="review_drilldown")
+def _drilldown_module(load):
+    data = load()
+    _track("review_drilldown", data, "projects")
+    today, projects, status_of = data.today, data.projects, data.status_of
+    _, filtered, _ = _period_projects(data, today)
+
     # --- MODULE 3: PROJECT LIST ---
     with st.container(border=True):
         st.markdown('<div class="review-card-header">📋 Project Drill-down</div>', unsafe_allow_html=True)
@@ -662,14 +685,11 @@ def render_review_dashboard(projects):
             if filtered:
                 # Iterate and display projects
                 for i, p in enumerate(filtered):
-                    comp = sum(1 for t in p['tasks'] if t['completed']) / len(p['tasks']) if p['tasks'] else 0
-                    p_status = "Active"
-                    e_date = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                    if comp >= 1.0: p_status = "Completed"
-                    elif today > e_date: p_status = "Late"
+                    p_status = status_of(p).label
+                    e_date = p.end_day
                     
-                    mood = p.get('completion_mood', '')
-                    title_display = f"{mood} {p['goal']}" if mood else p['goal']
+                    mood = (p.extra or {}).get('completion_mood', '')
+                    title_display = f"{mood} {p.goal}" if mood else p.goal
                     
                     # Status Color Logic
                     status_color = "#3B82F6" # Active Blue
@@ -678,8 +698,8 @@ def render_review_dashboard(projects):
                     
                     # Tags Rendering
                     tags_html = ""
-                    if p.get('tags'):
-                        for t in p['tags']:
+                    if p.tags:
+                        for t in p.tags:
                             tags_html += f'<span style="background: #EBF8FF; color: #3182CE; padding: 2px 6px; border-radius: 4px; font-size: 0.8em; margin-right: 4px;">#{t}</span>'
 
                     col1, col2 = st.columns([0.85, 0.15])
@@ -701,8 +721,8 @@ def render_review_dashboard(projects):
                     with col2:
                         # Reverting to simple top alignment for button (user preferred previous style)
                         st.write(" ") # Tiny spacer
-                        if st.button("View", key=f"drill_view_{p.get('id', i)}", use_container_width=True):
-                            st.session_state.selected_project_id = p.get('id')
+                        if st.button("View", key=f"drill_view_{p.id}", use_container_width=True):
+                            st.session_state.selected_project_id = p.id
                             st.rerun()
             else:
                 st.info("No projects match the filter.")
@@ -712,16 +732,16 @@ def render_review_dashboard(projects):
             # VERSION MARKER (Vertical Redesign) - Removed caption
             
             # TIME MACHINE: Always show all projects from the current year for a complete timeline
-            tm_projects = [p for p in projects if p['start_date'].year == today.year]
+            tm_projects = [p for p in projects if p.start_day.year == today.year]
             if tm_projects:
                 # REDESIGNED TIME MACHINE: Unique Dates & Stacked Projects
-                sorted_projs = sorted(tm_projects, key=lambda x: x['start_date'])
+                sorted_projs = sorted(tm_projects, key=lambda x: x.start_date)
                 
                 # Group by date
                 from collections import defaultdict
                 date_groups = defaultdict(list)
                 for p in sorted_projs:
-                    d_str = p['start_date'].strftime("%Y-%m-%d")
+                    d_str = p.start_day.strftime("%Y-%m-%d")
                     date_groups[d_str].append(p)
                 
                 sorted_dates = sorted(date_groups.keys())
@@ -740,11 +760,7 @@ def render_review_dashboard(projects):
                     
                     # Projects on this day (Stacked)
                     for j, p in enumerate(projs_on_day):
-                        comp = sum(1 for t in p['tasks'] if t['completed']) / len(p['tasks']) if p['tasks'] else 0
-                        st_cls = "active"
-                        e_date = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                        if comp >= 1.0: st_cls = "completed"
-                        elif today > e_date: st_cls = "late"
+                        st_cls = status_of(p).label.lower()
                         
                         # Stack offset
                         stack_h = j * 45 # Increased for full text
@@ -752,7 +768,7 @@ def render_review_dashboard(projects):
                         
                         p_html = f'''
                         <div class="tm-v51-goal-right {st_cls}" style="top: {current_top - 10 + stack_h}px; left: {110 + stack_l}px; z-index: {100-j};">
-                            <span class="tm-v51-goal">{p["goal"]}</span>
+                            <span class="tm-v51-goal">{p.goal}</span>
                         </div>
                         '''
                         nodes_list.append(p_html)
@@ -861,30 +877,21 @@ def render_review_dashboard(projects):
             else:
                 st.info("No projects to map in Time Machine.")
 
+
+@st.fragment(key="review_status")
+def _status_module(load):
+    data = load()
+    _track("review_status", data, "projects")
+    status_of = data.status_of
+    period, filtered, _ = _period_projects(data, data.today)
+
     # --- MODULE 4: CHARTS (Full Width Status Bar) ---
     with st.container(border=True):
         st.markdown('<div class="review-card-header">📉 Status Breakdown</div>', unsafe_allow_html=True)
             
         if filtered:
-            early, on_time, late, active = 0, 0, 0, 0
-            status_map = {}
-            for p in filtered:
-                comp_val = sum(1 for t in p['tasks'] if t['completed'])/len(p['tasks']) if p['tasks'] else 0
-                p_stat = "Active"
-                if comp_val >= 1.0:
-                    c_at = p.get('completed_at')
-                    is_e = False
-                    if c_at:
-                        try:
-                            c_dt = datetime.fromisoformat(str(c_at)) if isinstance(c_at, str) else c_at
-                            if c_dt.date() < (p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']): is_e = True
-                        except: pass
-                    if is_e: p_stat = "Early"; early+=1
-                    else: p_stat = "On Time"; on_time+=1
-                elif today > (p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']):
-                    p_stat = "Late"; late+=1
-                else: active +=1
-                status_map[p.get('id')] = p_stat
+            counts = Counter(status_of(p).status for p in filtered)
+            early, on_time, late, active = counts["Early"], counts["On Time"], counts["Late"], counts["Active"]
 
             # Custom Horizontal Pixel Bar
             total = early + on_time + late + active
@@ -918,27 +925,23 @@ def render_review_dashboard(projects):
             report_data = []
             completed_count = 0
             for p in filtered:
-                total_tasks = len(p['tasks'])
-                done_tasks = sum(1 for t in p['tasks'] if t['completed'])
-                completion = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0
-                p_stat_rep = status_map.get(p.get('id'), "Active")
-                if completion >= 100: completed_count += 1
+                rec = status_of(p)
+                p_stat_rep = rec.status
+                if rec.done: completed_count += 1
                 
-                s_date = p['start_date'].date() if isinstance(p['start_date'], datetime) else p['start_date']
-                e_date = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
+                s_date = p.start_day
+                e_date = p.end_day
                 
                 # Time Status
                 if p_stat_rep == "Late":
-                    days_diff = (today - e_date).days
-                    time_status = f"Overdue {days_diff}d"
-                elif p_stat_rep in ["Early", "On Time"]:
+                    time_status = f"Overdue {rec.delay_days}d"
+                elif rec.done:
                     time_status = "Done"
                 else:
-                    days_diff = (e_date - today).days
-                    time_status = f"{days_diff}d left"
+                    time_status = f"{rec.days_left}d left"
                 
                 report_data.append({
-                    "Goal": p['goal'],
+                    "Goal": p.goal,
                     "Start Date": s_date.strftime("%Y-%m-%d"),
                     "Deadline": e_date.strftime("%Y-%m-%d"),
                     "Status": p_stat_rep,
@@ -960,4 +963,4 @@ def render_review_dashboard(projects):
             
             st.download_button("Download Data (CSV for Excel)", csv, f"report_{period.lower().replace(' ','_')}.csv", "text/csv", key="dl_report", use_container_width=True)
         else:
-            st.info("No data.")
\ No newline at end of file
+            st.info("No data.")
@@ -28,7 +28,7 @@ def render_review_dashboard(projects):
     st.divider()
     st.markdown("### 🗂 Active Missions")
     
-    active = [p for p in projects if calculate_completion(p['tasks']) < 1.0]
+    active = [p for p in projects if calculate_completion(p) < 1.0]
     if not active:
         st.info("No active missions. Good job!")
     
@@ -38,27 +38,26 @@ def render_review_dashboard(projects):
             # Use container with border (Passbook Style due to CSS)
             with st.container(border=True):
                 # Header
-                st.markdown(f'<div class="passbook-header" style="font-size:0.8em;">{p["goal"]}</div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="passbook-header" style="font-size:0.8em;">{p.goal}</div>', unsafe_allow_html=True)
                 
                 # Stats
-                tasks_total = len(p['tasks'])
-                tasks_done = sum(1 for t in p['tasks'] if t['completed'])
-                pct = calculate_completion(p['tasks'])
+                tasks_total = p.total_count
+                tasks_done = p.done_count
+                pct = calculate_completion(p)
                 
                 st.caption(f"Progress: {tasks_done}/{tasks_total}")
                 st.progress(pct)
                 
                 # Deadline
-                end_d = p['end_date'].date() if isinstance(p['end_date'], datetime) else p['end_date']
-                days = (end_d - datetime.now().date()).days
+                days = (p.end_day - datetime.now().date()).days
                 
                 if days < 0:
                     st.markdown(f"<span style='color:red; font-weight:bold;'>Overdue by {abs(days)} days</span>", unsafe_allow_html=True)
                 else:
                     st.caption(f"Due in {days} days")
                 
-                if st.button("Open", key=f"rev_open_{p['id']}", use_container_width=True):
-                    st.session_state.selected_project_id = p['id']
+                if st.button("Open", key=f"rev_open_{p.id}", use_container_width=True):
+                    st.session_state.selected_project_id = p.id
                     st.session_state.view_mode = "Calendar" # Switch to main view to show dialog
                     st.rerun()
 
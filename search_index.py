@@ -0,0 +1,162 @@
+# Search Index
+# Incremental inverted index over project goals, checkpoints and rewards plus journal entries, so the
+# sidebar search doesn't scan every project on each rerun and can also find task and journal text.
+# Tokens: lowercase English words / numbers, and Chinese (CJK) text as overlapping character bigrams
+# (a lone CJK character stays a unigram). Every query token matches as a prefix, so "pro" finds
+# "project" and "学" finds "学习"; a document must match all query tokens. Hits are ranked by
+# field-weighted term frequency times idf.
+# Documents are updated one at a time (index_project / remove_project / index_journal), never rebuilt
+# wholesale on an edit; the store calls these from its mutations (see store.py).
+
+import re
+import math
+import bisect
+from collections import Counter
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+# Runs of CJK characters, or runs of other letters/digits (accented Latin included)
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W_{_CJK}]+")
+_CJK_RUN = re.compile(rf"[{_CJK}]")
+
+# A hit in the goal counts more than one in a checkpoint, reward or journal entry
+FIELD_WEIGHTS = {"goal": 3.0, "task": 1.0, "reward": 1.0, "journal": 1.0}
+
+
+def tokenize(text):
+    """Lowercased words, and bigrams of CJK runs."""
+    if not text:
+        return []
+    out = []
+    for run in _TOKEN_RE.findall(str(text).lower()):
+        if len(run) == 1 or not _CJK_RUN.match(run):
+            out.append(run)
+        else:
+            out.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return out
+
+
+def _project_fields(project):
+    yield "goal", project.goal
+    for t in project.tasks:
+        yield "task", t.label
+    yield "reward", project.reward
+
+
+class SearchIndex:
+    """Ranked prefix search over live projects and journal entries; results are project ids."""
+
+    def __init__(self, projects=(), journal=()):
+        # term -> {project id: weight}; a project's weight sums its own text and its journal entries,
+        # so scoring a term is one pass over its postings
+        self._postings = {}
+        self._docs = {}      # doc -> (project id its hits count for, Counter(term -> weight))
+        self._terms = []     # sorted terms, for prefix lookups
+        for p in projects:
+            self.index_project(p)
+        for entry in journal:
+            self.index_journal(entry)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # --- Updates ---
+
+    def _put(self, doc, owner, weights):
+        self._drop(doc)
+        for term, w in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[owner] = postings.get(owner, 0.0) + w
+        self._docs[doc] = (owner, weights)
+
+    def _drop(self, doc):
+        owner, weights = self._docs.pop(doc, (None, {}))
+        for term, w in weights.items():
+            postings = self._postings[term]
+            left = postings[owner] - w
+            if left > 0:
+                postings[owner] = left
+                continue
+            del postings[owner]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def index_project(self, project):
+        """(Re-)index a project's goal, checkpoints and reward."""
+        weights = Counter()
+        for field, text in _project_fields(project):
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+        self._put(("p", project.id), project.id, weights)
+
+    def remove_project(self, project_id):
+        self._drop(("p", project_id))
+
+    @staticmethod
+    def _journal_doc(entry):
+        return ("j", entry.get('id') or entry.get('date') or entry.get('content'))
+
+    def index_journal(self, entry):
+        """Index a journal entry; its hits count for the entry's project_id."""
+        weights = Counter()
+        for term in tokenize(entry.get('content')):
+            weights[term] += FIELD_WEIGHTS["journal"]
+        self._put(self._journal_doc(entry), entry.get('project_id'), weights)
+
+    def remove_journal(self, entry):
+        self._drop(self._journal_doc(entry))
+
+    def reset_projects(self, projects):
+        """Replace every project document (after the projects were reloaded from disk)."""
+        for doc in [d for d in self._docs if d[0] == "p"]:
+            self._drop(doc)
+        for p in projects:
+            self.index_project(p)
+
+    def reset_journal(self, journal):
+        """Replace every journal document (after the journal was reloaded from disk)."""
+        for doc in [d for d in self._docs if d[0] == "j"]:
+            self._drop(doc)
+        for entry in journal:
+            self.index_journal(entry)
+
+    # --- Queries ---
+
+    def _expand(self, prefix):
+        """Indexed terms starting with `prefix`."""
+        i = bisect.bisect_left(self._terms, prefix)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def search(self, query, limit=None):
+        """Project ids matching every token of `query`, best first."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        n_docs = len(self._docs) or 1
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + n_docs / len(postings))
+                if not token_scores:
+                    token_scores = {o: w * idf for o, w in postings.items()}
+                    continue
+                for o, w in postings.items():
+                    token_scores[o] = token_scores.get(o, 0.0) + w * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {o: s + token_scores[o] for o, s in scores.items() if o in token_scores}
+            if not scores:
+                return []
+        scores.pop(None, None)  # journal entries without a project
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return ranked[:limit] if limit else ranked
@@ -0,0 +1,457 @@
+# SQLite Storage Engine
+# Drop-in replacement for the JSON files in persistence.py (enable with PACER_STORAGE=sqlite).
+# The public functions mirror persistence.py; each save diffs against the rows last
+# read/written and only touches the rows that actually changed.
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from models import Project, to_datetime
+
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pacer_store.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    goal TEXT NOT NULL DEFAULT '',
+    start_date TEXT,
+    end_date TEXT,
+    created_at TEXT,
+    completed_at TEXT,
+    reward TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS deleted_projects (
+    id TEXT PRIMARY KEY,
+    goal TEXT NOT NULL DEFAULT '',
+    start_date TEXT,
+    end_date TEXT,
+    created_at TEXT,
+    completed_at TEXT,
+    reward TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    extra TEXT NOT NULL DEFAULT '{}',
+    deleted_at TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    project_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT,
+    task TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (project_id, position)
+);
+CREATE TABLE IF NOT EXISTS focus_sessions (
+    position INTEGER PRIMARY KEY,
+    date TEXT,
+    duration INTEGER,
+    project_id TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS tags (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS journal (
+    id TEXT PRIMARY KEY,
+    date TEXT,
+    content TEXT,
+    project_name TEXT,
+    project_id TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PROJECT_COLUMNS = ("id", "goal", "start_date", "end_date", "created_at", "completed_at", "reward", "tags", "extra")
+DELETED_COLUMNS = PROJECT_COLUMNS + ("deleted_at",)
+TASK_COLUMNS = ("project_id", "position", "id", "task", "completed", "extra")
+FOCUS_COLUMNS = ("position", "date", "duration", "project_id", "extra")
+JOURNAL_COLUMNS = ("id", "date", "content", "project_name", "project_id", "extra")
+
+# Keys stored in dedicated columns; anything else round-trips through the `extra` JSON blob
+_PROJECT_KEYS = {"id", "goal", "tasks", "start_date", "end_date", "created_at", "completed_at", "deleted_at", "reward", "tags"}
+_TASK_KEYS = {"id", "task", "completed"}
+_FOCUS_KEYS = {"date", "duration", "project_id"}
+_JOURNAL_KEYS = {"id", "date", "content", "project_name", "project_id"}
+
+_conn = None
+_lock = threading.RLock()
+# Last known content of every row, keyed by table then primary key. Saves diff against this.
+_rows = {"projects": {}, "deleted_projects": {}, "tasks": {}, "focus_sessions": {}, "tags": {}, "journal": {}}
+
+
+def _iso(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None:
+        return None
+    return str(value)
+
+
+def _dump_extra(d, known):
+    extra = {k: v for k, v in d.items() if k not in known}
+    return json.dumps(extra, default=_iso, sort_keys=True) if extra else "{}"
+
+
+def _parse_dt(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+
+
+# --- Schema Version ---
+# The database records its schema in PRAGMA user_version, numbered like persistence.SCHEMA_VERSION.
+# A database created before versioning reads 0 and counts as version 1. An older database is upgraded
+# in place, one step of DB_MIGRATIONS per version, inside a single transaction.
+DATE_COLUMNS = {
+    "projects": ("start_date", "end_date", "created_at", "completed_at"),
+    "deleted_projects": ("start_date", "end_date", "created_at", "completed_at", "deleted_at"),
+    "focus_sessions": ("date",),
+    "journal": ("date",),
+}
+
+
+def _db_v2(conn):
+    # Version 2: every date column holds datetime.isoformat() text. Version 1 stored str() of
+    # whatever the JSON files held; unreadable values are left as they are (read back as strings).
+    for table, columns in DATE_COLUMNS.items():
+        for column in columns:
+            rows = conn.execute(f"SELECT rowid, {column} FROM {table} WHERE {column} IS NOT NULL").fetchall()
+            updates = []
+            for rowid, value in rows:
+                when = to_datetime(value)
+                if when is not None and when.isoformat() != value:
+                    updates.append((when.isoformat(), rowid))
+            conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", updates)
+
+
+DB_MIGRATIONS = {1: _db_v2}  # version -> function upgrading the database from version to version + 1
+
+
+def _check_schema(conn, is_new):
+    import persistence
+
+    if is_new:
+        conn.execute(f"PRAGMA user_version = {persistence.SCHEMA_VERSION}")
+        return
+    version = conn.execute("PRAGMA user_version").fetchone()[0] or 1
+    if version > persistence.SCHEMA_VERSION:
+        # Never load (and later overwrite) data we don't understand
+        raise RuntimeError(f"{DB_FILE} has schema {version}; this version of Pacer reads up to {persistence.SCHEMA_VERSION}")
+    if version == persistence.SCHEMA_VERSION:
+        return
+    with conn:
+        while version < persistence.SCHEMA_VERSION:
+            DB_MIGRATIONS[version](conn)
+            version += 1
+        conn.execute(f"PRAGMA user_version = {version}")
+    print(f"Upgraded {os.path.basename(DB_FILE)} to schema {version}")
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        is_new = not os.path.exists(DB_FILE)
+        conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        try:
+            _check_schema(conn, is_new)
+        except BaseException:
+            conn.close()
+            raise
+        _conn = conn
+        if is_new:
+            migrate_from_json()
+    return _conn
+
+
+# --- Row Builders ---
+def _project_row(p, deleted=False):
+    row = (
+        str(p.get("id")),
+        p.get("goal", ""),
+        _iso(p.get("start_date")),
+        _iso(p.get("end_date")),
+        _iso(p.get("created_at")),
+        _iso(p.get("completed_at")),
+        p.get("reward"),
+        json.dumps(p.get("tags", []), ensure_ascii=False),
+        _dump_extra(p, _PROJECT_KEYS),
+    )
+    if deleted:
+        row += (_iso(p.get("deleted_at")),)
+    return row
+
+
+def _task_rows(p):
+    pid = str(p.get("id"))
+    return [
+        (pid, i, t.get("id"), t.get("task"), 1 if t.get("completed") else 0, _dump_extra(t, _TASK_KEYS))
+        for i, t in enumerate(p.get("tasks", []))
+    ]
+
+
+def _focus_row(i, s):
+    return (i, _iso(s.get("date")), s.get("duration"), s.get("project_id"), _dump_extra(s, _FOCUS_KEYS))
+
+
+def _journal_row(i, e):
+    return (str(e.get("id", i)), _iso(e.get("date")), e.get("content"), e.get("project_name"), e.get("project_id"), _dump_extra(e, _JOURNAL_KEYS))
+
+
+def _sync(conn, table, columns, rows, key_len=1, scope=None):
+    """
+    Write only the difference between `rows` and the last known content of `table`.
+    `scope`: project ids; `rows` then holds only the rows of those projects (first key column), and
+    rows of other projects are left as they are. Returns the approximate payload size in bytes of the
+    rows inserted, updated or deleted.
+    """
+    known = _rows[table]
+    current = {row[:key_len]: row for row in rows}
+    changed = [row for key, row in current.items() if known.get(key) != row]
+    if scope is None:
+        removed = [key for key in known if key not in current]
+    else:
+        removed = [key for key in known if key[0] in scope and key not in current]
+
+    keys = columns[:key_len]
+    if changed:
+        updates = ", ".join(f"{c}=excluded.{c}" for c in columns[key_len:])
+        # UPSERT (not INSERT OR REPLACE) keeps the rowid, which is what preserves list order
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates}",
+            changed,
+        )
+    if removed:
+        where = " AND ".join(f"{k}=?" for k in keys)
+        conn.executemany(f"DELETE FROM {table} WHERE {where}", removed)
+
+    if scope is None:
+        _rows[table] = current
+    else:
+        for key in removed:
+            del known[key]
+        known.update(current)
+    return sum(_row_bytes(row) for row in changed) + sum(_row_bytes(key) for key in removed)
+
+
+def _row_bytes(row):
+    return sum(len(v.encode()) if isinstance(v, str) else 8 for v in row if v is not None)
+
+
+# --- Project Persistence ---
+def _load_project(row, columns, tasks_by_project):
+    p = {}
+    for col, val in zip(columns, row):
+        if col == "tags":
+            p["tags"] = json.loads(val)
+        elif col == "extra":
+            p.update(json.loads(val))
+        elif val is not None:
+            p[col] = val
+    p["tasks"] = tasks_by_project.get(p["id"], [])
+    return Project.from_dict(p)
+
+
+def load_data():
+    with _lock:
+        conn = _connect()
+        tasks_by_project = {}
+        task_rows = conn.execute(f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks ORDER BY project_id, position").fetchall()
+        for row in task_rows:
+            pid, _, tid, name, completed, extra = row
+            t = {"task": name, "completed": bool(completed)}
+            if tid is not None:
+                t = {"id": tid, **t}
+            t.update(json.loads(extra))
+            tasks_by_project.setdefault(pid, []).append(t)
+
+        proj_rows = conn.execute(f"SELECT {', '.join(PROJECT_COLUMNS)} FROM projects ORDER BY rowid").fetchall()
+        del_rows = conn.execute(f"SELECT {', '.join(DELETED_COLUMNS)} FROM deleted_projects ORDER BY rowid").fetchall()
+
+        _rows["tasks"] = {row[:2]: row for row in task_rows}
+        _rows["projects"] = {row[:1]: row for row in proj_rows}
+        _rows["deleted_projects"] = {row[:1]: row for row in del_rows}
+
+        projects = [_load_project(r, PROJECT_COLUMNS, tasks_by_project) for r in proj_rows]
+        deleted = [_load_project(r, DELETED_COLUMNS, tasks_by_project) for r in del_rows]
+        return projects, deleted
+
+
+def save_data(projects, deleted=None, ids=None):
+    """
+    Same contract as persistence.save_data: with `ids`, only the rows of those projects are rebuilt
+    and diffed (an id in neither list has its rows deleted); None diffs every project.
+    """
+    if deleted is None: deleted = []
+    scope = None
+    if ids is not None:
+        scope = set(ids)
+        projects = [p for p in projects if p.id in scope]
+        deleted = [p for p in deleted if p.id in scope]
+    # Row builders work on the stored schema
+    projects = [p.to_dict() for p in projects]
+    deleted = [p.to_dict() for p in deleted]
+    with _lock:
+        conn = _connect()
+        task_rows = []
+        for p in projects + deleted:
+            task_rows.extend(_task_rows(p))
+        with conn:
+            return (
+                _sync(conn, "projects", PROJECT_COLUMNS, [_project_row(p) for p in projects], scope=scope)
+                + _sync(conn, "deleted_projects", DELETED_COLUMNS, [_project_row(p, deleted=True) for p in deleted], scope=scope)
+                + _sync(conn, "tasks", TASK_COLUMNS, task_rows, key_len=2, scope=scope)
+            )
+
+
+# --- Journal Persistence ---
+def load_journal():
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(f"SELECT {', '.join(JOURNAL_COLUMNS)} FROM journal ORDER BY date DESC").fetchall()
+        _rows["journal"] = {row[:1]: row for row in rows}
+        entries = []
+        for row in rows:
+            e = {col: val for col, val in zip(JOURNAL_COLUMNS[:-1], row[:-1])}
+            e.update(json.loads(row[-1]))
+            e["date"] = _parse_dt(e["date"])
+            entries.append(e)
+        return entries
+
+
+def save_journal(entries):
+    with _lock:
+        conn = _connect()
+        with conn:
+            return _sync(conn, "journal", JOURNAL_COLUMNS, [_journal_row(i, e) for i, e in enumerate(entries)])
+
+
+# --- Focus Timer Persistence ---
+def load_focus_data():
+    with _lock:
+        conn = _connect()
+        rows = conn.execute(f"SELECT {', '.join(FOCUS_COLUMNS)} FROM focus_sessions ORDER BY position").fetchall()
+        _rows["focus_sessions"] = {row[:1]: row for row in rows}
+        sessions = []
+        for _, d, duration, project_id, extra in rows:
+            s = {"date": d, "duration": duration, "project_id": project_id}
+            s.update(json.loads(extra))
+            if isinstance(d, str):
+                try:
+                    s["date"] = datetime.fromisoformat(d)
+                except ValueError:
+                    try:
+                        s["date"] = datetime.strptime(d, "%Y-%m-%d %H:%M:%S")
+                    except ValueError: pass
+            sessions.append(s)
+        return sessions
+
+
+def save_focus_data(sessions):
+    with _lock:
+        conn = _connect()
+        with conn:
+            return _sync(conn, "focus_sessions", FOCUS_COLUMNS, [_focus_row(i, s) for i, s in enumerate(sessions)])
+
+
+def load_focus_rollups():
+    with _lock:
+        row = _connect().execute("SELECT value FROM meta WHERE key = 'focus_rollups'").fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def save_focus_rollups(rollups):
+    text = json.dumps(rollups)
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('focus_rollups', ?)", (text,))
+    return len(text)
+
+
+# --- Tag Persistence ---
+def load_tags():
+    with _lock:
+        conn = _connect()
+        rows = conn.execute("SELECT position, name FROM tags ORDER BY position").fetchall()
+        _rows["tags"] = {row[:1]: row for row in rows}
+        return [name for _, name in rows]
+
+
+def save_tags(tags):
+    with _lock:
+        conn = _connect()
+        with conn:
+            return _sync(conn, "tags", ("position", "name"), list(enumerate(tags)))
+
+
+# --- Store Revision ---
+# Bumped by every save of the shared store; see persistence.store_lock() for the write protocol.
+def read_revision():
+    with _lock:
+        row = _connect().execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return int(row[0]) if row else 0
+
+
+def write_revision(revision):
+    with _lock:
+        conn = _connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('revision', ?)", (str(revision),))
+
+
+# --- One-Shot JSON Migration ---
+def migrate_from_json():
+    """
+    Import the existing JSON stores (pacer_store.json plus its mutation log, the focus log, tags, journal)
+    into the database.
+    Runs automatically the first time the database file is created; the JSON files are left untouched.
+    Returns a dict of imported row counts per collection.
+    """
+    import persistence
+
+    # Read through the JSON engine's schema migrations, without rewriting the files. An unreadable
+    # store raises rather than being imported as an empty one.
+    projects, deleted = persistence.load_raw_store(upgrade_file=False)
+    focus, _ = persistence.read_focus_log()
+    tags = persistence.load_versioned(persistence.TAGS_FILE, "tags", {"tags": persistence.DEFAULT_TAGS})["tags"]
+    journal = persistence.load_versioned(persistence.JOURNAL_FILE, "journal", {"entries": []})["entries"]
+
+    with _lock:
+        conn = _connect()
+        with conn:
+            for table in _rows:
+                conn.execute(f"DELETE FROM {table}")
+                _rows[table] = {}
+            task_rows = []
+            for p in projects + deleted:
+                task_rows.extend(_task_rows(p))
+            _sync(conn, "projects", PROJECT_COLUMNS, [_project_row(p) for p in projects])
+            _sync(conn, "deleted_projects", DELETED_COLUMNS, [_project_row(p, deleted=True) for p in deleted])
+            _sync(conn, "tasks", TASK_COLUMNS, task_rows, key_len=2)
+            _sync(conn, "focus_sessions", FOCUS_COLUMNS, [_focus_row(i, s) for i, s in enumerate(focus)])
+            _sync(conn, "tags", ("position", "name"), list(enumerate(tags)))
+            _sync(conn, "journal", JOURNAL_COLUMNS, [_journal_row(i, e) for i, e in enumerate(journal)])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_at', ?)", (datetime.now().isoformat(),))
+    return {
+        "projects": len(projects), "deleted": len(deleted), "focus_sessions": len(focus),
+        "tags": len(tags), "journal": len(journal),
+    }
+
+
+if __name__ == "__main__":
+    # Manual re-import: python sqlite_store.py
+    print(migrate_from_json())
@@ -0,0 +1,735 @@
+# Pacer Store
+# Holds every persisted collection in memory and tracks which ones changed.
+# Mutations call touch(); save() only writes the collections whose revision moved since the last save.
+# One store is shared by every session of the process (see get_store() in app.py): sessions read it
+# directly and compare store.revision with the revision they last rendered to notice other sessions' writes.
+
+import os
+import json
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+from datetime import datetime, date
+from itertools import chain
+from models import Project, ProjectIndex, to_datetime
+from date_index import IntervalIndex
+from tag_index import TagIndex
+from search_index import SearchIndex
+from focus_rollups import FocusRollups
+from analytics import ProjectFrame, MetricsCache, dashboard_metrics, project_statuses
+from persistence import (
+    load_data, save_data, load_focus_data, save_focus_data, load_focus_rollups, save_focus_rollups,
+    load_tags, save_tags, load_journal, save_journal,
+    store_lock, read_revision, write_revision, datetime_serializer, export_backup, iter_backup,
+)
+
+COLLECTIONS = ("projects", "deleted", "focus", "tags", "journal")
+# Store attribute holding each collection
+ATTRS = {"projects": "projects", "deleted": "deleted", "focus": "focus_sessions", "tags": "tags", "journal": "journal"}
+
+# Write-behind window: save() requests within this many ms are coalesced into one flush.
+# PACER_WRITE_BEHIND_MS=0 writes synchronously on every save().
+WRITE_BEHIND_MS = int(os.environ.get("PACER_WRITE_BEHIND_MS", 250))
+# How long close() waits at exit for an in-flight background flush to land.
+CLOSE_TIMEOUT = 10.0
+
+
+class WriteBehindSaver:
+    """
+    One background thread per process that turns a burst of save requests into a single flush.
+    Stores with pending changes are held until written, so an edit is persisted even if the
+    session that made it goes away; close() runs at interpreter exit and flushes whatever is left.
+    """
+    def __init__(self, window_ms):
+        self.window = window_ms / 1000.0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="pacer-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def schedule(self, store):
+        if self._closed:
+            store.flush()
+            return
+        with self._lock:
+            self._pending.add(store)
+        self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        return pending
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait()
+            time.sleep(self.window)  # let the rest of the burst (e.g. keystrokes) arrive
+            self._wake.clear()
+            for store in self._take():
+                try:
+                    store.flush()
+                except Exception as e:
+                    # Most likely a collection mutated mid-encode; retry on the next window
+                    print(f"Write-behind flush failed: {e}")
+                    self.schedule(store)
+
+    def flush_all(self):
+        for store in self._take():
+            store.flush()
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        self._closed = True
+        self._wake.set()
+        # The thread may already hold a taken store mid-flush, invisible to flush_all(); wait for
+        # it to finish that write (and drain the last window) before flushing the remainder here.
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"Write-behind thread still flushing after {timeout}s at shutdown")
+        self.flush_all()
+
+
+_saver = None
+_saver_lock = threading.Lock()
+
+def _write_behind():
+    global _saver
+    with _saver_lock:
+        if _saver is None:
+            _saver = WriteBehindSaver(WRITE_BEHIND_MS)
+        return _saver
+
+
+def fingerprint(item):
+    return json.dumps(item, sort_keys=True, default=datetime_serializer)
+
+def _by_id(item):
+    return item.id
+
+# How items are matched up when merging with another worker's save: projects by id,
+# everything else (focus sessions, tag names, journal entries) by content.
+MERGE_KEYS = {"projects": _by_id, "deleted": _by_id, "focus": fingerprint, "tags": fingerprint, "journal": fingerprint}
+
+
+def merge3(base, ours, theirs, key):
+    """
+    Three-way merge of one collection.
+    `base` maps key -> fingerprint as of the last sync with disk; `ours` and `theirs` are item lists.
+    An item changed on one side only takes that side's version; changed differently on both sides is
+    a conflict, and the version on disk wins. Returns (merged, conflicting_keys).
+    """
+    ours_by_key = {key(x): x for x in ours}
+    theirs_by_key = {key(x): x for x in theirs}
+    merged, conflicts = [], []
+    # Disk order first, then items only we have, in our order
+    order = list(theirs_by_key) + [k for k in ours_by_key if k not in theirs_by_key]
+    for k in order:
+        o, t = ours_by_key.get(k), theirs_by_key.get(k)
+        o_fp = fingerprint(o) if o is not None else None
+        t_fp = fingerprint(t) if t is not None else None
+        if o_fp == base.get(k):
+            item = t
+        elif t_fp == base.get(k) or o_fp == t_fp:
+            item = o
+        else:
+            conflicts.append(k)
+            item = t
+        if item is not None:
+            merged.append(item)
+    return merged, conflicts
+
+
+# --- Backup Import ---
+# Records read from a backup are checked one at a time as they stream in (see PacerStore.import_backup);
+# a bad record is skipped and reported, the rest of the backup still imports.
+BACKUP_MAJOR = "1."
+# Record section in the backup -> store collection
+BACKUP_COLLECTIONS = {"projects": "projects", "deleted_projects": "deleted", "focus_sessions": "focus", "tags": "tags"}
+
+def _backup_project(d):
+    """Project from a backup record; raises ValueError if the record isn't usable."""
+    if not isinstance(d, dict) or not isinstance(d.get("id"), str) or not d["id"]:
+        raise ValueError("project without an id")
+    if not isinstance(d.get("goal", ""), str):
+        raise ValueError("goal is not text")
+    if to_datetime(d.get("start_date")) is None or to_datetime(d.get("end_date")) is None:
+        raise ValueError("missing or unreadable start/end date")
+    tasks, tags = d.get("tasks", []), d.get("tags", [])
+    if not isinstance(tasks, list) or not all(isinstance(t, dict) for t in tasks):
+        raise ValueError("tasks is not a list of checkpoints")
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        raise ValueError("tags is not a list of names")
+    return Project.from_dict(d)
+
+def _backup_session(d):
+    """Focus session from a backup record (date parsed); raises ValueError if the record isn't usable."""
+    if not isinstance(d, dict):
+        raise ValueError("session is not an object")
+    when = to_datetime(d.get("date"))
+    if when is None:
+        raise ValueError("missing or unreadable date")
+    if isinstance(d.get("duration"), bool) or not isinstance(d.get("duration"), (int, float)):
+        raise ValueError("duration is not a number")
+    return dict(d, date=when)
+
+def _stamp(project):
+    """Last-writer-wins timestamp: the latest of the project's created/completed/deleted times."""
+    return max((t for t in (project.created_at, project.completed_at, project.deleted_at) if t is not None),
+               default=datetime.min)
+
+
+class PacerStore:
+    def __init__(self, projects, deleted, focus_sessions, tags, journal, disk_revision=0, focus_rollups=None):
+        # Live and binned projects, each indexed by id
+        self.projects = ProjectIndex(projects)
+        self.deleted = ProjectIndex(deleted)
+        # Date-span index over the live projects (see projects_between)
+        self.date_index = IntervalIndex(self.projects)
+        # Tag -> project ids over the live projects (see projects_tagged, rename_tag)
+        self.tag_index = TagIndex(self.projects)
+        self.focus_sessions = focus_sessions
+        # Focus minutes by day/month/project; the persisted copy is used only if it covers every session
+        if focus_rollups is not None and focus_rollups.get("sessions") == len(focus_sessions):
+            self.focus_rollups = FocusRollups.from_dict(focus_rollups)
+        else:
+            self.focus_rollups = FocusRollups.from_sessions(focus_sessions)
+        self.tags = tags
+        self.journal = journal
+        # Full-text index over live projects' text and the journal (see search_projects)
+        self.search_index = SearchIndex(self.projects, self.journal)
+        # Columnar copy of the projects for the KPI panels, synced lazily (see frame())
+        self._frame = ProjectFrame()
+        # Ids of the projects changed since the frame last synced; None = unknown, resync every row
+        self._frame_dirty = None
+        # Ids of the projects changed since the last save; None = unknown, diff every project
+        self._save_dirty = None
+        # Sidebar metrics, recomputed only when the store revision or the date changes
+        self.metrics_cache = MetricsCache()
+        # Per-project status records, recomputed only when the projects or the date change
+        self.status_cache = MetricsCache()
+        # Exported backup files by (revision, compressed), written on first download (see backup_file)
+        self.backup_cache = MetricsCache(size=2)
+        self._backup_dir = None
+
+        # Revision counter per collection, and the revisions that are known to be on disk
+        self.revisions = {c: 0 for c in COLLECTIONS}
+        self._saved_revisions = dict(self.revisions)
+
+        # Shared revision in the data directory as of our last read/write, and the fingerprints of
+        # what was on disk then: the common ancestor when another worker has saved in the meantime
+        self.disk_revision = disk_revision
+        self._base = {c: self._fingerprints(c, self._items(c)) for c in COLLECTIONS}
+        # Local edits that lost against a concurrent save from another worker: [{"at", "collection", "keys"}]
+        self.conflicts = []
+
+        # Guards structural changes (add/remove) to the shared collections across session threads
+        self.lock = threading.RLock()
+        # Serializes flushes from the write-behind thread, atexit and direct callers
+        self._flush_lock = threading.RLock()
+
+        # Save accounting: what the last save wrote, and running totals since load
+        self.last_save = None
+        self.save_totals = {"saves": 0, "skipped": 0, "files": 0, "bytes": 0}
+
+    @classmethod
+    def load(cls):
+        with store_lock():
+            projects, deleted = load_data()
+            store = cls(projects, deleted, load_focus_data(), load_tags(), load_journal(), read_revision(),
+                        load_focus_rollups())
+        store._save_dirty = set()  # exactly what is on disk: only later edits need saving
+        store.verify_counters()
+        return store
+
+    def verify_counters(self):
+        """Rebuild every project's done/total task counters; returns how many had drifted."""
+        with self.lock:
+            drifted = sum(1 for p in chain(self.projects, self.deleted) if p.recount())
+        if drifted:
+            print(f"Task counters rebuilt for {drifted} project(s)")
+        return drifted
+
+    def _items(self, collection):
+        return getattr(self, ATTRS[collection])
+
+    def _set_items(self, collection, items):
+        if collection in ("projects", "deleted"):
+            items = ProjectIndex(items)
+        setattr(self, ATTRS[collection], items)
+        if collection == "projects":
+            self.date_index = IntervalIndex(items)
+            self.tag_index = TagIndex(items)
+            self.search_index.reset_projects(items)
+        elif collection == "journal":
+            self.search_index.reset_journal(items)
+        elif collection == "focus":
+            self.focus_rollups = FocusRollups.from_sessions(items)
+
+    @staticmethod
+    def _fingerprints(collection, items):
+        key = MERGE_KEYS[collection]
+        return {key(x): fingerprint(x) for x in items}
+
+    @property
+    def revision(self):
+        """Store-wide revision; changes whenever any collection is touched."""
+        return sum(self.revisions.values())
+    def touch(self, *collections, ids=None):
+        """
+        Mark collections as modified so the next save() writes them.
+        `ids`: the projects changed, when known, so the KPI frame only rewrites their rows and the
+        next save only encodes and diffs those projects.
+        """
+        with self.lock:
+            for c in collections:
+                self.revisions[c] += 1
+            if "projects" in collections or "deleted" in collections:
+                if ids is None or self._frame_dirty is None:
+                    self._frame_dirty = None
+                else:
+                    self._frame_dirty.update(ids)
+                if ids is None or self._save_dirty is None:
+                    self._save_dirty = None
+                else:
+                    self._save_dirty.update(ids)
+
+    def commit(self, *collections, ids=None):
+        """touch() + save(): the usual end of a mutation."""
+        self.touch(*collections, ids=ids)
+        return self.save()
+
+    # --- Mutations ---
+    # Anything that adds or removes items goes through here so concurrent sessions can't lose an update.
+    # In-place edits of a single project's fields mutate it and call commit("projects", ids=[id]), or
+    # commit_project() when searchable text (goal, checkpoints, reward) changed.
+    # save() is called after releasing self.lock: a flush takes store_lock() before self.lock.
+
+    def get_project(self, project_id):
+        return self.projects.get(str(project_id))
+
+    def projects_between(self, start, end):
+        """Live projects whose [start_day, end_day] overlaps the dates [start, end]."""
+        return self.date_index.overlapping(start, end)
+
+    def projects_tagged(self, tag):
+        """Live projects carrying `tag` (unordered)."""
+        ids = self.tag_index.ids(tag)
+        return [p for p in map(self.projects.get, ids) if p is not None]
+
+    def frame(self):
+        """The analytics ProjectFrame, brought up to date with the current projects."""
+        with self.lock:
+            dirty, self._frame_dirty = self._frame_dirty, set()
+            return self._frame.sync(self, dirty)
+
+    def sidebar_metrics(self):
+        """TIME BANK and PROJECT DASHBOARD numbers for the live projects (see analytics.dashboard_metrics)."""
+        today = date.today()
+        def compute():
+            frame = self.frame()
+            return dashboard_metrics(frame, frame.rows(), today)
+        with self.lock:
+            return self.metrics_cache.get((self.revision, today), compute)
+
+    def project_statuses(self):
+        """project id -> analytics.ProjectStatus for every live project, as of today."""
+        today = date.today()
+        with self.lock:
+            return self.status_cache.get((self.revisions["projects"], today), lambda: project_statuses(self.projects, today))
+
+    def backup_file(self, compress=False):
+        """
+        Path of a full backup (pacer.json, or gzipped if `compress`) of the store as it is now.
+        Written on the first request for a revision and reused until the store changes.
+        """
+        def export():
+            if self._backup_dir is None:
+                self._backup_dir = tempfile.mkdtemp(prefix="pacer-backup-")
+                atexit.register(shutil.rmtree, self._backup_dir, True)
+            with self.lock:
+                snapshot = (list(self.projects), list(self.deleted), list(self.focus_sessions), list(self.tags))
+            name = f"pacer-{revision}.json" + (".gz" if compress else "")
+            path = os.path.join(self._backup_dir, name)
+            export_backup(path, *snapshot, compress=compress)
+            # Exports of older revisions are never served again
+            for old in os.listdir(self._backup_dir):
+                if old != name and old.endswith(".json.gz") == compress and not old.endswith(".tmp"):
+                    try:
+                        os.remove(os.path.join(self._backup_dir, old))
+                    except FileNotFoundError:
+                        pass  # removed by a concurrent export
+            return path
+        revision = self.revision
+        return self.backup_cache.get((revision, compress), export)
+
+    def search_projects(self, query, limit=None):
+        """Live projects whose goal, checkpoints, reward or journal entries match `query`, best first."""
+        with self.lock:
+            ids = self.search_index.search(query, limit)
+        return [p for p in map(self.projects.get, ids) if p is not None]
+
+    def add_project(self, project):
+        with self.lock:
+            self.projects.add(project)
+            self.date_index.add(project)
+            self.tag_index.add(project)
+            self.search_index.index_project(project)
+            self.touch("projects", ids=[project.id])
+        self.save()
+
+    def bin_project(self, project_id, deleted_at):
+        """Move a live project to the recycle bin."""
+        with self.lock:
+            proj = self.projects.pop(str(project_id))
+            if proj is None:
+                return
+            self.date_index.remove(proj.id)
+            self.tag_index.remove(proj.id)
+            self.search_index.remove_project(proj.id)
+            proj.deleted_at = deleted_at
+            self.deleted.add(proj)
+            self.touch("projects", "deleted", ids=[proj.id])
+        self.save()
+
+    def restore_project(self, project_id):
+        with self.lock:
+            proj = self.deleted.pop(str(project_id))
+            if proj is None:
+                return
+            proj.deleted_at = None
+            self.projects.add(proj)
+            self.date_index.add(proj)
+            self.tag_index.add(proj)
+            self.search_index.index_project(proj)
+            self.touch("projects", "deleted", ids=[proj.id])
+        self.save()
+
+    def purge_project(self, project_id):
+        """Permanently delete a binned project."""
+        with self.lock:
+            if self.deleted.pop(str(project_id)) is None:
+                return
+            self.touch("deleted", ids=[str(project_id)])
+        self.save()
+
+    def set_project_dates(self, project, start_date=None, end_date=None):
+        """Change a project's start and/or end date and re-index it."""
+        with self.lock:
+            if start_date is not None: project.start_date = start_date
+            if end_date is not None: project.end_date = end_date
+            if project.id in self.projects:
+                self.date_index.update(project)
+            self.touch("projects", ids=[project.id])
+        self.save()
+
+    def commit_project(self, project):
+        """Commit an in-place edit of a project's goal, checkpoints or reward, re-indexing its text."""
+        with self.lock:
+            if project.id in self.projects:
+                self.search_index.index_project(project)
+            self.touch("projects", ids=[project.id])
+        self.save()
+
+    def set_project_tags(self, project, tags):
+        """Replace a project's tags and re-index it."""
+        with self.lock:
+            project.tags = list(tags)
+            if project.id in self.projects:
+                self.tag_index.update(project)
+            self.touch("projects", ids=[project.id])
+        self.save()
+
+    def clear_bin(self):
+        with self.lock:
+            ids = [p.id for p in self.deleted]
+            self.deleted.clear()
+            self.touch("deleted", ids=ids)
+        self.save()
+
+    def add_focus_session(self, session):
+        with self.lock:
+            self.focus_sessions.append(session)
+            self.focus_rollups.add(session)
+            self.touch("focus")
+        self.save()
+
+    def add_tag(self, name):
+        with self.lock:
+            if name and name not in self.tags:
+                self.tags.append(name)
+                self.touch("tags")
+        self.save()
+
+    def rename_tag(self, old, new):
+        """Rename a tag and every use of it on live projects; one save covers tags and projects."""
+        with self.lock:
+            if not new or new in self.tags or old not in self.tags:
+                return
+            self.tags[self.tags.index(old)] = new
+            self.touch("tags")
+            self._retag(old, lambda tags: [new if x == old else x for x in tags])
+        self.save()
+
+    def delete_tag(self, name):
+        """Remove a tag from the tag list and from the live projects using it."""
+        with self.lock:
+            if name not in self.tags:
+                return
+            self.tags.remove(name)
+            self.touch("tags")
+            self._retag(name, lambda tags: [x for x in tags if x != name])
+        self.save()
+
+    def _retag(self, tag, edit):
+        """Apply `edit` to the tag list of each live project tagged `tag` (looked up in the index)."""
+        projects = self.projects_tagged(tag)
+        for p in projects:
+            p.tags = edit(p.tags)
+            self.tag_index.update(p)
+        if projects:
+            self.touch("projects", ids=[p.id for p in projects])
+
+    def dirty(self):
+        return [c for c in COLLECTIONS if self.revisions[c] != self._saved_revisions[c]]
+
+    def save(self):
+        """
+        Persist pending changes. With write-behind enabled the write is handed to the
+        background saver and coalesced with other saves in the same window; otherwise
+        this flushes immediately and returns the flush stats.
+        """
+        if WRITE_BEHIND_MS > 0:
+            _write_behind().schedule(self)
+            return None
+        return self.flush()
+
+    def flush(self):
+        """
+        Write the dirty collections now and return what was touched:
+        {"collections": [...], "files": n, "bytes": n, "ms": n}.
+        Nothing is written at all when no collection changed.
+        """
+        with self._flush_lock:
+            return self._flush()
+
+    # --- Backup Import ---
+
+    def import_backup(self, f):
+        """
+        Merge a pacer.json backup (binary file object, plain or gzipped) into the store.
+        Projects and binned projects are matched by id across both lists; when both sides differ the
+        one with the later timestamp (see _stamp) wins, ties keep ours. Focus sessions and tags are
+        added unless already present. The backup is streamed record by record and nothing changes
+        until it has been read completely; the result is committed as one save.
+        Returns a report: {"added": {...}, "updated": {...}, "unchanged": n, "conflicts": [...], "invalid": [...]}.
+        Raises ValueError for a file that isn't a readable backup.
+        """
+        report = {"added": {c: 0 for c in BACKUP_COLLECTIONS.values()}, "updated": {"projects": 0, "deleted": 0},
+                  "unchanged": 0, "conflicts": [], "invalid": []}
+        staged = {}  # project id -> (incoming project, target collection)
+        with self.lock:
+            seen_sessions = {fingerprint(x) for x in self.focus_sessions}
+            seen_tags = set(self.tags)
+        new_sessions, new_tags = [], []
+        counts = dict.fromkeys(BACKUP_COLLECTIONS, 0)
+        version = None
+        for section, record in iter_backup(f):
+            if section == "version":
+                version = record
+                if not str(version).startswith(BACKUP_MAJOR):
+                    raise ValueError(f"Unsupported backup version: {version}")
+                continue
+            if section not in BACKUP_COLLECTIONS:
+                continue  # timestamp, or keys from a newer minor version
+            index = counts[section]
+            counts[section] += 1
+            target = BACKUP_COLLECTIONS[section]
+            try:
+                if target == "tags":
+                    if not isinstance(record, str) or not record:
+                        raise ValueError("tag is not a name")
+                    if record not in seen_tags:
+                        seen_tags.add(record)
+                        new_tags.append(record)
+                    continue
+                if target == "focus":
+                    session = _backup_session(record)
+                    key = fingerprint(session)
+                    if key not in seen_sessions:
+                        seen_sessions.add(key)
+                        new_sessions.append(session)
+                    continue
+                incoming = _backup_project(record)
+            except ValueError as e:
+                report["invalid"].append({"section": section, "index": index, "error": str(e)})
+                continue
+            ours = self.projects.get(incoming.id) or self.deleted.get(incoming.id)
+            if ours is None:
+                staged[incoming.id] = (incoming, target)
+                continue
+            ours_target = "projects" if incoming.id in self.projects else "deleted"
+            if ours_target == target and fingerprint(ours) == fingerprint(incoming):
+                report["unchanged"] += 1
+            elif _stamp(incoming) > _stamp(ours):
+                staged[incoming.id] = (incoming, target)
+                report["conflicts"].append({"collection": target, "id": incoming.id, "kept": "backup"})
+            else:
+                report["conflicts"].append({"collection": ours_target, "id": incoming.id, "kept": "ours"})
+        if version is None:
+            raise ValueError("Not a Pacer backup: no version")
+
+        with self.lock:
+            changed = set()
+            if staged:
+                live = {p.id: p for p in self.projects}
+                binned = {p.id: p for p in self.deleted}
+                for pid, (project, target) in staged.items():
+                    into, other = (live, binned) if target == "projects" else (binned, live)
+                    moved = other.pop(pid, None) is not None
+                    if moved:
+                        changed.update(("projects", "deleted"))
+                    report["updated" if moved or pid in into else "added"][target] += 1
+                    into[pid] = project  # replaced in place, keeping its position
+                    changed.add(target)
+                for c, items in (("projects", live), ("deleted", binned)):
+                    if c in changed:
+                        self._set_items(c, list(items.values()))
+            if new_sessions:
+                self.focus_sessions.extend(new_sessions)
+                for session in new_sessions:
+                    self.focus_rollups.add(session)
+                report["added"]["focus"] = len(new_sessions)
+                changed.add("focus")
+            if new_tags:
+                self.tags.extend(new_tags)
+                report["added"]["tags"] = len(new_tags)
+                changed.add("tags")
+            self.touch(*changed, ids=list(staged))
+        if changed:
+            self.save()
+        return report
+
+    # --- Cross-Worker Sync ---
+
+    def refresh(self):
+        """
+        Pick up saves made by other workers since we last read or wrote.
+        Costs one small read when nothing changed; returns True if the store was updated.
+        """
+        if read_revision() == self.disk_revision:
+            return False
+        with store_lock(), self.lock:
+            return self._sync_with_disk()
+
+    def _sync_with_disk(self):
+        """
+        Merge the on-disk state into memory if another worker saved since our last sync.
+        Collections we haven't touched simply adopt the disk version; dirty ones are merged with
+        merge3() and stay dirty if our changes survive. Call with store_lock() and self.lock held.
+        """
+        disk_revision = read_revision()
+        if disk_revision == self.disk_revision:
+            return False
+        projects, deleted = load_data()
+        theirs = {"projects": projects, "deleted": deleted, "focus": load_focus_data(), "tags": load_tags(), "journal": load_journal()}
+        dirty = self.dirty()
+        for c in COLLECTIONS:
+            base = self._fingerprints(c, theirs[c])
+            if c in dirty:
+                merged, lost = merge3(self._base[c], self._items(c), theirs[c], MERGE_KEYS[c])
+                if lost:
+                    self.conflicts.append({"at": datetime.now(), "collection": c, "keys": lost})
+                still_dirty = self._fingerprints(c, merged) != base
+            else:
+                merged, still_dirty = theirs[c], False
+            self._set_items(c, merged)
+            self._base[c] = base
+            self.revisions[c] += 1  # sessions notice the change through store.revision
+            if not still_dirty:
+                self._saved_revisions[c] = self.revisions[c]
+        self._frame_dirty = None  # every project may have changed
+        self._save_dirty = None
+        self.disk_revision = disk_revision
+        return True
+
+    def _flush(self):
+        if not self.dirty():
+            self.save_totals["skipped"] += 1
+            self.last_save = {"collections": [], "files": 0, "bytes": 0, "ms": 0.0}
+            return self.last_save
+
+        started = time.perf_counter()
+        with store_lock():
+            # Take a consistent view of the collections; sessions may keep mutating while we write
+            with self.lock:
+                merged = self._sync_with_disk()
+                dirty = self.dirty()
+                revisions = dict(self.revisions)
+                # Projects changed since the last save: only they are encoded and diffed
+                ids, self._save_dirty = self._save_dirty, set()
+                items = {c: list(self._items(c)) for c in COLLECTIONS}
+                rollups = self.focus_rollups.to_dict() if "focus" in dirty else None
+                written_base = {}
+                for c in dirty:
+                    if ids is not None and c in ("projects", "deleted"):
+                        # Patch the merge base for just those projects (None = no longer there)
+                        coll = self._items(c)
+                        written_base[c] = {pid: (fingerprint(coll.get(pid)) if pid in coll else None) for pid in ids}
+                    else:
+                        written_base[c] = self._fingerprints(c, items[c])
+            written = []
+            try:
+                # projects and deleted share one store file (or one pair of tables)
+                if "projects" in dirty or "deleted" in dirty:
+                    written.append(save_data(items["projects"], items["deleted"], ids=ids))
+                if "focus" in dirty:
+                    written.append(save_focus_data(items["focus"]))
+                    written.append(save_focus_rollups(rollups))
+                if "tags" in dirty:
+                    written.append(save_tags(items["tags"]))
+                if "journal" in dirty:
+                    written.append(save_journal(items["journal"]))
+            except BaseException:
+                with self.lock:
+                    self._save_dirty = None  # which of them reached disk is unknown: diff all next time
+                raise
+            if dirty:
+                self.disk_revision += 1
+                write_revision(self.disk_revision)
+        self._saved_revisions = revisions
+        for c, base in written_base.items():
+            if ids is not None and c in ("projects", "deleted"):
+                patched = self._base[c]
+                for pid, fp in base.items():
+                    if fp is None:
+                        patched.pop(pid, None)
+                    else:
+                        patched[pid] = fp
+            else:
+                self._base[c] = base
+
+        self.last_save = {
+            "collections": dirty,
+            "files": sum(1 for b in written if b),
+            "bytes": sum(written),
+            "merged": merged,
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        self.save_totals["saves"] += 1
+        self.save_totals["files"] += self.last_save["files"]
+        self.save_totals["bytes"] += self.last_save["bytes"]
+        return self.last_save
+
+
+if __name__ == "__main__":
+    # Import a backup without going through the browser upload: python store.py pacer.json[.gz]
+    import sys
+    store = PacerStore.load()
+    with open(sys.argv[1], "rb") as f:
+        print(json.dumps(store.import_backup(f), indent=2))
+    store.flush()
@@ -0,0 +1,54 @@
+# Tag Index
+# Inverted index tag -> ids of the live projects carrying it, so filtering by tag and renaming or
+# deleting a tag only visit the projects involved instead of every project's tag list.
+# The store keeps it in step with add/bin/restore, tag edits and merges (see store.py).
+
+
+class TagIndex:
+    """Live projects indexed by tag. Re-index a project with update() after assigning its tags."""
+
+    def __init__(self, projects=()):
+        self._ids = {}   # tag -> set of project ids
+        self._tags = {}  # project id -> tags it is indexed under
+        for p in projects:
+            self.add(p)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, project):
+        if project.id in self._tags:
+            self.remove(project.id)
+        tags = tuple(project.tags)
+        for t in tags:
+            self._ids.setdefault(t, set()).add(project.id)
+        self._tags[project.id] = tags
+
+    def remove(self, project_id):
+        for t in self._tags.pop(project_id, ()):
+            ids = self._ids.get(t)
+            if ids is not None:
+                ids.discard(project_id)
+                if not ids:
+                    del self._ids[t]
+
+    def update(self, project):
+        """Re-index after project.tags changed (same as add for a known project)."""
+        self.add(project)
+
+    def ids(self, tag):
+        """Ids of the projects tagged `tag` (a copy, safe to keep)."""
+        return set(self._ids.get(tag, ()))
+
+    def counts(self):
+        """tag -> number of live projects using it."""
+        return {t: len(ids) for t, ids in self._ids.items()}
+
+    def matching(self, query):
+        """Ids of the projects with a tag containing `query` (case-insensitive)."""
+        q = query.lower()
+        out = set()
+        for t, ids in self._ids.items():
+            if q in t.lower():
+                out |= ids
+        return out
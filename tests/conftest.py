@@ -0,0 +1,62 @@
+# The app is a flat set of modules run from the repository root (streamlit run app.py);
+# make them importable from the tests the same way.
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import persistence  # noqa: E402
+import sqlite_store  # noqa: E402
+import store  # noqa: E402
+from models import Project, Task  # noqa: E402
+
+# Day 0 for make_project(); tests import the builders with `from conftest import make_project`
+BASE_DAY = datetime(2026, 1, 1)
+
+
+def make_project(pid, start=0, length=30, goal=None, tasks=None, done=0, total=2, tags=(), reward=None):
+    """
+    A project running from BASE_DAY + `start` days for `length` days. `tasks` names its checkpoints;
+    by default it has `total` of them with the first `done` completed, and completing them all also
+    stamps completed_at a day before the end date.
+    """
+    if tasks is None:
+        tasks = [Task(f"t{i}", i < done) for i in range(total)]
+    else:
+        tasks = [Task(t) for t in tasks]
+    p = Project(pid, pid if goal is None else goal, BASE_DAY + timedelta(days=start),
+                BASE_DAY + timedelta(days=start + length), tasks=tasks, tags=list(tags), reward=reward)
+    if p.tasks and p.done_count == len(p.tasks):
+        p.completed_at = p.end_date - timedelta(days=1)
+    return p
+
+
+def make_projects(n, **kwargs):
+    """Projects "p0" .. "p<n-1>", starting a day apart."""
+    return [make_project(f"p{i}", i, **kwargs) for i in range(n)]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Every data file in `tmp_path`, writes synchronous, and no state left from an earlier load."""
+    monkeypatch.setattr(persistence, "DATA_FILE", str(tmp_path / "pacer_store.json"))
+    monkeypatch.setattr(persistence, "LOCK_FILE", str(tmp_path / "pacer_store.json.lock"))
+    monkeypatch.setattr(persistence, "REVISION_FILE", str(tmp_path / "pacer_store.json.rev"))
+    monkeypatch.setattr(persistence, "LOG_FILE", str(tmp_path / "pacer_store.json.log"))
+    for name in ("JOURNAL_FILE", "FOCUS_FILE", "FOCUS_LOG_FILE", "FOCUS_ROLLUPS_FILE", "TAGS_FILE"):
+        monkeypatch.setattr(persistence, name, str(tmp_path / os.path.basename(getattr(persistence, name))))
+    monkeypatch.setattr(persistence, "_persisted", {"projects": {}, "deleted": {}})
+    monkeypatch.setattr(persistence, "_log_started", None)
+    monkeypatch.setattr(persistence, "_focus_log", {"count": None, "tail": None})
+    monkeypatch.setattr(sqlite_store, "DB_FILE", str(tmp_path / "pacer_store.db"))
+    monkeypatch.setattr(sqlite_store, "_conn", None)
+    monkeypatch.setattr(sqlite_store, "_rows", {table: {} for table in sqlite_store._rows})
+    monkeypatch.setattr(store, "WRITE_BEHIND_MS", 0)
+    yield tmp_path
+    if persistence._compactor is not None:
+        persistence._compactor.join()
+    if sqlite_store._conn is not None:
+        sqlite_store._conn.close()
@@ -0,0 +1,195 @@
+import io
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from analytics import COLUMNS, MetricsCache, ProjectFrame, dashboard_metrics, project_status, project_statuses
+from conftest import make_project
+from models import ProjectIndex
+from persistence import write_backup
+from store import PacerStore
+
+TODAY = date(2026, 3, 1)
+
+
+class _Store(SimpleNamespace):
+    """The parts of PacerStore a ProjectFrame syncs from."""
+
+    def __init__(self, projects=()):
+        super().__init__(projects=ProjectIndex(projects), deleted=ProjectIndex(),
+                         revisions={"projects": 0, "deleted": 0})
+
+    def touch(self):
+        self.revisions["projects"] += 1
+        self.revisions["deleted"] += 1
+
+
+def _table(frame, rows=None):
+    """Frame content per project id, independent of which rows were assigned."""
+    ids = {row: pid for pid, row in frame._row.items()}
+    rows = np.flatnonzero(frame.used) if rows is None else rows
+    return {ids[r]: tuple(int(getattr(frame, c)[r]) if c != "tag" else
+                          (frame.tag_names[frame.tag[r]] if frame.tag[r] >= 0 else None)
+                          for c in COLUMNS) for r in rows}
+
+
+def test_sync_is_a_no_op_until_revisions_move():
+    store = _Store([make_project("a", 0, 10)])
+    frame = ProjectFrame().sync(store)
+    store.projects.get("a").set_task_completed(store.projects.get("a").tasks[0], True)
+    frame.sync(store, ["a"])
+    assert frame.done[frame._row["a"]] == 0
+    store.touch()
+    frame.sync(store, ["a"])
+    assert frame.done[frame._row["a"]] == 1
+
+
+def test_incremental_sync_matches_a_fresh_frame():
+    rng = random.Random(3)
+    store = _Store(make_project(f"p{i}", rng.randrange(90), rng.randrange(30), tags=[rng.choice("xyz")])
+                   for i in range(50))
+    frame = ProjectFrame().sync(store)
+    for step in range(400):
+        pid = f"p{rng.randrange(70)}"
+        op = rng.random()
+        if pid in store.projects and op < 0.2:
+            store.deleted.add(store.projects.pop(pid))        # to the bin
+        elif pid in store.deleted and op < 0.4:
+            store.projects.add(store.deleted.pop(pid))        # restore
+        elif pid in store.deleted:
+            store.deleted.pop(pid)                             # purge
+        elif pid in store.projects:
+            p = store.projects.get(pid)
+            p.set_task_completed(p.tasks[rng.randrange(len(p.tasks))], rng.random() < 0.5)
+            p.end_date = p.end_date + timedelta(days=rng.randrange(-3, 4))
+        else:
+            store.projects.add(make_project(pid, rng.randrange(90), rng.randrange(30), tags=[rng.choice("xyz")]))
+        store.touch()
+        frame.sync(store, [pid])
+        if step % 20 == 0:
+            fresh = ProjectFrame.from_projects(store.projects, store.deleted)
+            assert _table(frame) == _table(fresh)
+            assert sorted(_table(frame, frame.rows())) == sorted(p.id for p in store.projects)
+
+
+def test_full_sync_when_ids_unknown():
+    store = _Store([make_project("a", 0, 10), make_project("b", 5, 10)])
+    frame = ProjectFrame().sync(store)
+    store.projects.pop("a")
+    store.projects.get("b").tags = ["new"]
+    store.touch()
+    frame.sync(store)
+    assert _table(frame) == _table(ProjectFrame.from_projects(store.projects))
+
+
+def test_dashboard_counts_agree_with_project_status():
+    rng = random.Random(5)
+    projects = []
+    for i in range(200):
+        total = rng.randrange(1, 4)
+        projects.append(make_project(f"p{i}", rng.randrange(120), rng.randrange(30),
+                                 done=rng.choice([0, total, rng.randrange(total + 1)]), total=total))
+    frame = ProjectFrame.from_projects(projects)
+    metrics = dashboard_metrics(frame, frame.rows(), TODAY)
+    statuses = [project_status(p, TODAY) for p in projects]
+    assert metrics["total"] == len(projects)
+    assert metrics["done"] == sum(s.done for s in statuses)
+    assert metrics["delayed"] == sum(s.status == "Late" for s in statuses)
+    assert metrics["planned"] == sum(not s.done and p.start_day > TODAY for p, s in zip(projects, statuses))
+    assert metrics["done"] + metrics["delayed"] + metrics["planned"] + metrics["active"] == len(projects)
+
+
+def test_store_mutations_resync_only_the_projects_they_changed(monkeypatch):
+    monkeypatch.setattr(PacerStore, "save", lambda self: None)  # in memory only
+    store = PacerStore([make_project(f"p{i}", i, 10, tags=["x"]) for i in range(20)], [], [], ["x"], [])
+    store.frame()
+    written = []
+    write = ProjectFrame._write
+    monkeypatch.setattr(ProjectFrame, "_write", lambda self, p, d: written.append(p.id) or write(self, p, d))
+
+    def synced():
+        frame = store.frame()
+        ids = sorted(written)
+        assert _table(frame) == _table(ProjectFrame.from_projects(store.projects, store.deleted))
+        written.clear()
+        return ids
+
+    p3 = store.get_project("p3")
+    p3.set_task_completed(p3.tasks[0], True)
+    store.commit("projects", ids=[p3.id])
+    assert synced() == ["p3"]
+    store.set_project_dates(store.get_project("p4"), end_date=datetime(2026, 6, 1))
+    store.set_project_tags(store.get_project("p5"), ["y"])
+    assert synced() == ["p4", "p5"]
+    store.bin_project("p6", datetime(2026, 2, 1))
+    assert synced() == ["p6"]
+    store.restore_project("p6")
+    store.bin_project("p7", datetime(2026, 2, 1))
+    assert synced() == ["p6", "p7"]
+    store.purge_project("p7")
+    store.add_project(make_project("new", 0, 5))
+    assert synced() == ["new"]
+    out = io.StringIO()
+    write_backup(out, [make_project("imported", 0, 5)], [], [], [])
+    store.import_backup(io.BytesIO(out.getvalue().encode("utf-8")))
+    assert synced() == ["imported"]
+    # No ids given: every row is checked again
+    store.touch("projects")
+    assert len(synced()) == len(store.projects)
+
+
+def test_metrics_cache_evicts_least_recently_used():
+    cache = MetricsCache(size=2)
+    computed = []
+
+    def get(key):
+        return cache.get(key, lambda: computed.append(key) or key.upper())
+
+    assert [get("a"), get("b"), get("a")] == ["A", "B", "A"]
+    get("c")            # evicts "b", the least recently used
+    get("a")
+    get("b")
+    assert computed == ["a", "b", "c", "b"]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_sidebar_metrics_recomputed_only_when_the_store_changes(monkeypatch):
+    monkeypatch.setattr(PacerStore, "save", lambda self: None)
+    store = PacerStore([make_project("a", 0, 10), make_project("b", 80, 10)], [], [], [], [])
+    first = store.sidebar_metrics()
+    assert store.sidebar_metrics() is first
+    assert store.metrics_cache.misses == 1
+    a = store.get_project("a")
+    for t in a.tasks:
+        a.set_task_completed(t, True)
+    store.commit("projects", ids=["a"])
+    assert store.sidebar_metrics()["done"] == first["done"] + 1
+    assert store.metrics_cache.misses == 2
+
+
+def test_project_status():
+    early = make_project("early", 0, 10, done=2)
+    assert project_status(early, TODAY) == ("Early", 1.0, True, 0, (early.end_day - TODAY).days)
+    late = make_project("late", 0, 10, done=1)
+    status = project_status(late, TODAY)
+    assert (status.status, status.label, status.done) == ("Late", "Late", False)
+    assert status.delay_days == (TODAY - late.end_day).days > 0
+    on_time = make_project("on_time", 0, 10, done=2)
+    on_time.completed_at = on_time.end_date
+    assert project_status(on_time, TODAY).label == "Completed"
+    assert project_status(make_project("active", 55, 30), TODAY).status == "Active"
+
+
+def test_project_statuses_shared_until_projects_change(monkeypatch):
+    monkeypatch.setattr(PacerStore, "save", lambda self: None)
+    store = PacerStore([make_project("a", 55, 30), make_project("b", 0, 10)], [], [], [], [])
+    statuses = store.project_statuses()
+    assert statuses == project_statuses(store.projects, date.today())
+    assert store.project_statuses() is statuses
+    # Other collections moving on doesn't invalidate them
+    store.touch("focus", "journal")
+    assert store.project_statuses() is statuses
+    store.bin_project("b", datetime(2026, 2, 1))
+    assert set(store.project_statuses()) == {"a"}
@@ -0,0 +1,145 @@
+import functools
+import io
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import persistence
+import store as store_module
+from conftest import make_project, make_projects
+from persistence import iter_backup, write_backup
+from store import PacerStore
+
+
+def _backup_bytes(projects=(), deleted=(), focus=(), tags=("Work",)):
+    out = io.StringIO()
+    write_backup(out, projects, deleted, list(focus), list(tags), timestamp=datetime(2026, 3, 1))
+    return out.getvalue().encode("utf-8")
+
+
+def test_backup_streams_every_record_in_order():
+    projects = make_projects(3, done=1, tags=["Work"])
+    focus = [{"date": "2026-01-02T10:00:00", "duration": 25, "project_id": "p0"}]
+    raw = _backup_bytes(projects, make_projects(1, done=1, tags=["Work"]), focus)
+    pairs = list(iter_backup(io.BytesIO(raw)))
+    assert pairs[:2] == [("version", persistence.BACKUP_VERSION), ("timestamp", "2026-03-01T00:00:00")]
+    assert [v["id"] for k, v in pairs if k == "projects"] == ["p0", "p1", "p2"]
+    assert [v["id"] for k, v in pairs if k == "deleted_projects"] == ["p0"]
+    assert [v for k, v in pairs if k == "focus_sessions"] == focus
+    assert [v for k, v in pairs if k == "tags"] == ["Work"]
+    # Same content as parsing the whole document at once
+    doc = json.loads(raw)
+    assert [v for k, v in pairs if k == "projects"] == doc["projects"]
+
+
+def test_empty_sections_and_empty_object():
+    assert list(iter_backup(io.BytesIO(b'{"projects": [], "tags": []}'))) == []
+    assert list(iter_backup(io.BytesIO(b"{}"))) == []
+
+
+def test_records_spanning_chunks(monkeypatch):
+    monkeypatch.setattr(persistence, "_CHUNK", 7)
+    raw = _backup_bytes(make_projects(5, done=1, tags=["Work"]))
+    assert [v["id"] for k, v in iter_backup(io.BytesIO(raw)) if k == "projects"] == [f"p{i}" for i in range(5)]
+
+
+def test_gzip_backup_matches_plain():
+    raw = _backup_bytes(make_projects(4, done=1, tags=["Work"]))
+    plain = list(iter_backup(io.BytesIO(raw)))
+    assert list(iter_backup(io.BytesIO(gzip.compress(raw)))) == plain
+
+
+def test_upload_is_left_open():
+    f = io.BytesIO(gzip.compress(_backup_bytes(make_projects(2, done=1, tags=["Work"]))))
+    first = list(iter_backup(f))
+    assert not f.closed
+    f.seek(0)
+    assert list(iter_backup(f)) == first
+
+
+@pytest.mark.parametrize("raw", [
+    b'{"projects": [{"id": "p0"}, {"id": "p1"',     # cut off mid-record
+    b'{"projects": [{"id": "p0"}]',                  # missing closing brace
+    b'{"projects": [{"id": "p0"} {"id": "p1"}]}',    # missing comma
+    b'["projects"]',                                 # not an object
+    b'{1: []}',                                      # non-string key
+    b'',
+])
+def test_malformed_backup_raises_value_error(raw):
+    with pytest.raises(ValueError):
+        list(iter_backup(io.BytesIO(raw)))
+
+
+def test_truncated_gzip_raises_value_error():
+    packed = gzip.compress(_backup_bytes(make_projects(20, done=1, tags=["Work"])))
+    with pytest.raises(ValueError):
+        list(iter_backup(io.BytesIO(packed[:len(packed) // 2])))
+
+
+def test_corrupt_gzip_raises_value_error():
+    packed = bytearray(gzip.compress(_backup_bytes(make_projects(2, done=1, tags=["Work"]))))
+    packed[3] = 0xff  # reserved header flag bits
+    with pytest.raises(ValueError):
+        list(iter_backup(io.BytesIO(bytes(packed))))
+
+
+def test_invalid_utf8_raises_value_error():
+    with pytest.raises(ValueError):
+        list(iter_backup(io.BytesIO(b'{"tags": ["\xff\xfe"]}')))
+
+
+def test_oversized_record_is_rejected_without_reading_everything(monkeypatch):
+    monkeypatch.setattr(persistence, "_CHUNK", 16)
+    monkeypatch.setattr(persistence, "MAX_BACKUP_RECORD", 1024)
+    f = io.BytesIO(b'{"projects": ["' + b'a' * 100_000)
+    with pytest.raises(ValueError, match="larger than"):
+        list(iter_backup(f))
+    assert f.tell() < 10_000
+
+
+def test_deeply_nested_record_raises_value_error():
+    with pytest.raises(ValueError, match="nested"):
+        list(iter_backup(io.BytesIO(b'{"projects": [' + b'[' * 100_000 + b']' * 100_000 + b']}')))
+
+
+def test_export_matches_a_whole_document_dump(data_dir):
+    projects = make_projects(3, done=1, tags=["Work"])
+    focus = [{"date": "2026-01-02T10:00:00", "duration": 25, "project_id": "p0"}]
+    path = str(data_dir / "pacer.json")
+    size = persistence.export_backup(path, projects, projects[:1], focus, ["Work"])
+    raw = open(path, "rb").read()
+    assert size == len(raw)
+    doc = json.loads(raw)
+    expected = {"version": persistence.BACKUP_VERSION, "timestamp": doc["timestamp"],
+                "projects": [p.to_dict() for p in projects], "deleted_projects": [projects[0].to_dict()],
+                "focus_sessions": focus, "tags": ["Work"]}
+    assert raw.decode("utf-8") == json.dumps(expected, indent=2, default=str)
+
+
+def test_gzip_export_is_the_plain_export_compressed(data_dir, monkeypatch):
+    monkeypatch.setattr(persistence, "write_backup", functools.partial(write_backup, timestamp=datetime(2026, 3, 1)))
+    projects = make_projects(4, done=1, tags=["Work"])
+    plain, packed = str(data_dir / "pacer.json"), str(data_dir / "pacer.json.gz")
+    persistence.export_backup(plain, projects, [], [], ["Work"])
+    persistence.export_backup(packed, projects, [], [], ["Work"], compress=True)
+    assert gzip.decompress(open(packed, "rb").read()) == open(plain, "rb").read()
+    assert not [n for n in os.listdir(data_dir) if n.endswith(".tmp")]
+
+
+def test_backup_file_is_reused_until_the_store_changes(data_dir, monkeypatch):
+    persistence.save_data(make_projects(3))
+    store = PacerStore.load()
+    exports = []
+    export = store_module.export_backup
+    monkeypatch.setattr(store_module, "export_backup", lambda path, *a, **kw: exports.append(path) or export(path, *a, **kw))
+    first = store.backup_file()
+    assert store.backup_file() == first and len(exports) == 1
+    store.add_project(make_project("new"))
+    second = store.backup_file()
+    assert second != first and len(exports) == 2
+    # The export of the older revision is dropped; the new one holds the added project
+    assert not os.path.exists(first)
+    assert [v["id"] for k, v in iter_backup(open(second, "rb")) if k == "projects"][-1] == "new"
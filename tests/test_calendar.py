@@ -0,0 +1,109 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import streamlit as st
+from dateutil.relativedelta import relativedelta
+from streamlit.testing.v1 import AppTest
+
+import persistence
+from models import Project
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def at(data_dir):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    persistence.save_data([Project("p1", "Calendar project", today, today + timedelta(days=2))])
+    st.cache_resource.clear()  # get_store() must load from data_dir
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.session_state.view_mode = "Calendar"
+    app.run()
+    assert not app.exception
+    yield app
+    st.cache_resource.clear()
+
+
+def _click(at, payload):
+    """Deliver a calendar callback payload the way the component does: as its widget value."""
+    key = f"cal_{datetime.now():%Y-%m}_{at.session_state.calendar_instance}"
+    at.session_state[key] = payload
+    at.run()
+    assert not at.exception
+
+
+EVENT = {"callback": "eventClick", "eventClick": {"event": {"id": "p1", "extendedProps": {"projectId": "p1"}}}}
+
+
+def test_same_event_reopens_after_closing_the_dialog(at):
+    _click(at, EVENT)
+    assert at.session_state.selected_project_id == "p1"
+    # Any rerun while the payload is still the component's value is a replay
+    at.run()
+    assert at.session_state.selected_project_id == "p1"
+    at.button(key="close_x_p1").click().run()
+    assert at.session_state.selected_project_id is None
+    # The rerun after closing must not reopen it from the stale payload...
+    at.run()
+    assert at.session_state.selected_project_id is None
+    # ...but clicking the same event again does
+    _click(at, EVENT)
+    assert at.session_state.selected_project_id == "p1"
+
+
+def test_same_day_can_be_picked_again_after_clearing(at):
+    day = {"callback": "dateClick", "dateClick": {"date": f"{datetime.now():%Y-%m-%d}"}}
+    _click(at, day)
+    assert at.session_state.clicked_date is not None
+    [b for b in at.sidebar.button if b.label == "Clear Date"][0].click().run()
+    assert at.session_state.clicked_date is None
+    at.run()
+    assert at.session_state.clicked_date is None
+    _click(at, day)
+    assert at.session_state.clicked_date is not None
+
+
+def _events(at):
+    """Event ids handed to the calendar component on the last run."""
+    [cal] = [e for e in at.get("component_instance") if "-cal_" in e.proto.id]
+    return [e["id"] for e in json.loads(cal.proto.json_args)["events"]]
+
+
+@pytest.fixture
+def months(data_dir):
+    """Projects around the current month's grid (one week before to two weeks after the month)."""
+    first = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    nxt = first + relativedelta(months=1)
+    persistence.save_data([
+        Project("this", "This month", first + timedelta(days=3), first + timedelta(days=5)),
+        Project("spill_in", "Ends in the leading week", first - timedelta(days=20), first - timedelta(days=3)),
+        Project("spill_out", "Starts in the trailing weeks", nxt + timedelta(days=10), nxt + timedelta(days=40)),
+        Project("past", "Two months ago", first - relativedelta(months=2), first - relativedelta(months=2) + timedelta(days=3)),
+        Project("next", "Next month", nxt + timedelta(days=20), nxt + timedelta(days=22)),
+    ])
+    st.cache_resource.clear()
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.session_state.view_mode = "Calendar"
+    app.run()
+    assert not app.exception
+    yield app
+    st.cache_resource.clear()
+
+
+def test_events_cover_only_the_visible_grid(months):
+    assert sorted(_events(months)) == ["spill_in", "spill_out", "this"]
+    months.button(key="nav_fwd").click().run()
+    assert sorted(_events(months)) == ["next", "spill_out"]
+
+
+def test_search_and_edits_refresh_the_cached_events(months):
+    months.text_input(key="search_query").input("starts").run()
+    assert _events(months) == ["spill_out"]
+    months.text_input(key="search_query").input("").run()
+    assert sorted(_events(months)) == ["spill_in", "spill_out", "this"]
+    # Binning a project bumps the projects revision: the month is rebuilt without it
+    _click(months, dict(EVENT, eventClick={"event": {"id": "this", "extendedProps": {"projectId": "this"}}}))
+    months.button(key="dlg_del_proj_this").click().run()
+    assert sorted(_events(months)) == ["spill_in", "spill_out"]
@@ -0,0 +1,63 @@
+import random
+from datetime import date, timedelta
+
+from conftest import BASE_DAY, make_project
+from date_index import IntervalIndex
+
+
+def _brute(projects, start, end):
+    return sorted(p.id for p in projects.values() if p.start_day <= end and p.end_day >= start)
+
+
+def _day(offset):
+    return date(2026, 1, 1) + timedelta(days=offset)
+
+
+def test_overlap_bounds_are_inclusive():
+    index = IntervalIndex([make_project("a", 0, 4), make_project("b", 10, 0)])
+    assert [p.id for p in index.overlapping(_day(4), _day(9))] == ["a"]
+    assert [p.id for p in index.overlapping(_day(5), _day(9))] == []
+    assert [p.id for p in index.overlapping(_day(10), _day(10))] == ["b"]
+    assert [p.id for p in index.overlapping(_day(-5), _day(20))] == ["a", "b"]
+
+
+def test_results_ordered_by_start_day():
+    index = IntervalIndex([make_project("late", 9, 30), make_project("early", 0, 30), make_project("mid", 5, 30)])
+    assert [p.id for p in index.overlapping(_day(10), _day(10))] == ["early", "mid", "late"]
+
+
+def test_update_and_remove():
+    a = make_project("a", 0, 2)
+    index = IntervalIndex([a, make_project("b", 20, 2)])
+    a.start_date, a.end_date = BASE_DAY + timedelta(days=30), BASE_DAY + timedelta(days=31)
+    index.update(a)
+    assert len(index) == 2
+    assert [p.id for p in index.overlapping(_day(0), _day(2))] == []
+    assert [p.id for p in index.overlapping(_day(30), _day(30))] == ["a"]
+    index.remove("a")
+    index.remove("missing")
+    assert len(index) == 1
+    assert [p.id for p in index.overlapping(_day(-100), _day(100))] == ["b"]
+
+
+def test_matches_brute_force_under_random_edits():
+    rng = random.Random(7)
+    projects = {}
+    index = IntervalIndex()
+    for step in range(2000):
+        pid = f"p{rng.randrange(300)}"
+        if pid in projects and rng.random() < 0.3:
+            del projects[pid]
+            index.remove(pid)
+        else:
+            # add() for a known id re-indexes it, like update()
+            p = projects[pid] = make_project(pid, rng.randrange(365), rng.randrange(60))
+            index.add(p)
+        if step % 50 == 0:
+            assert len(index) == len(projects)
+            for _ in range(20):
+                start = rng.randrange(-30, 400)
+                end = start + rng.randrange(45)
+                got = index.overlapping(_day(start), _day(end))
+                assert sorted(p.id for p in got) == _brute(projects, _day(start), _day(end))
+                assert [p.start_day for p in got] == sorted(p.start_day for p in got)
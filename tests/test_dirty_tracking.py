@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import persistence
+import store as store_module
+from conftest import make_project, make_projects
+from store import PacerStore
+
+
+@pytest.fixture
+def loaded(data_dir):
+    persistence.save_data(make_projects(3))
+    persistence.save_tags(["Work"])
+    return PacerStore.load()
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Basenames of the files written through atomic_write."""
+    seen = []
+    write = persistence.atomic_write
+    monkeypatch.setattr(persistence, "atomic_write", lambda path, *a, **kw: seen.append(os.path.basename(path)) or write(path, *a, **kw))
+    return seen
+
+
+def test_unchanged_store_writes_nothing(loaded, writes, data_dir):
+    before = sorted(os.listdir(data_dir))
+    assert loaded.flush()["files"] == 0
+    assert loaded.save_totals == {"saves": 0, "skipped": 1, "files": 0, "bytes": 0}
+    assert writes == [] and sorted(os.listdir(data_dir)) == before
+
+
+def test_only_dirty_collections_are_written(loaded, writes, monkeypatch):
+    saved = []
+    monkeypatch.setattr(store_module, "save_data", lambda *a, **kw: saved.append(1) or 0)
+    loaded.add_tag("Home")
+    assert loaded.last_save["collections"] == ["tags"]
+    # The tags file, plus the shared revision every save bumps
+    assert writes == ["pacer_tags.json", "pacer_store.json.rev"] and saved == []
+    assert loaded.dirty() == []
+    # The next save has nothing left to do
+    assert loaded.flush()["collections"] == []
+
+
+def test_project_edit_leaves_the_other_files_alone(loaded, writes):
+    loaded.add_project(make_project("new"))
+    assert loaded.last_save["collections"] == ["projects"]
+    assert "pacer_tags.json" not in writes and "pacer_journal.json" not in writes
+    assert "new" in {p.id for p in persistence.load_data()[0]}
+
+
+def test_failed_write_stays_dirty(loaded, monkeypatch):
+    def fail(*a, **kw):
+        raise OSError("disk full")
+    write = store_module.save_tags
+    monkeypatch.setattr(store_module, "save_tags", fail)
+    with pytest.raises(OSError):
+        loaded.add_tag("Home")
+    assert loaded.dirty() == ["tags"]
+    monkeypatch.setattr(store_module, "save_tags", write)
+    assert loaded.flush()["collections"] == ["tags"]
+    assert persistence.load_tags() == ["Work", "Home"]
@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timedelta
+
+import persistence
+from conftest import BASE_DAY
+from persistence import load_focus_data, save_focus_data
+from store import PacerStore
+
+
+def _session(i, project_id="p0"):
+    return {"date": BASE_DAY + timedelta(hours=i), "duration": 25, "project_id": project_id}
+
+
+def _lines(data_dir):
+    return (data_dir / "pacer_focus.ndjson").read_text().splitlines()
+
+
+def test_new_sessions_are_appended(data_dir):
+    sessions = [_session(i) for i in range(3)]
+    save_focus_data(sessions)
+    assert json.loads(_lines(data_dir)[0]) == {"schema": persistence.SCHEMA_VERSION}
+    before = (data_dir / "pacer_focus.ndjson").read_bytes()
+    sessions.append(_session(3))
+    written = save_focus_data(sessions)
+    after = (data_dir / "pacer_focus.ndjson").read_bytes()
+    assert after.startswith(before) and len(after) - len(before) == written
+    assert save_focus_data(sessions) == 0  # nothing new, nothing written
+    assert load_focus_data() == sessions
+
+
+def test_load_keeps_recording_order(data_dir):
+    sessions = [_session(5), _session(1), _session(3)]  # recorded out of date order (e.g. imported)
+    save_focus_data(sessions)
+    loaded = load_focus_data()
+    assert loaded == sessions and isinstance(loaded[0]["date"], datetime)
+
+
+def test_list_that_no_longer_extends_the_log_is_rewritten(data_dir):
+    sessions = [_session(i) for i in range(3)]
+    save_focus_data(sessions)
+    reordered = [sessions[2], sessions[0], sessions[1], _session(9)]
+    save_focus_data(reordered)
+    assert len(_lines(data_dir)) == 1 + 4
+    assert load_focus_data() == reordered
+
+
+def test_torn_last_line_is_dropped_and_the_log_rewritten(data_dir):
+    sessions = [_session(i) for i in range(2)]
+    save_focus_data(sessions)
+    with open(data_dir / "pacer_focus.ndjson", "a") as f:
+        f.write('{"date": "2026-01-0')  # crash mid-append
+    assert load_focus_data() == sessions
+    assert len(_lines(data_dir)) == 1 + 2
+    assert (data_dir / "pacer_focus.ndjson").read_text().endswith("\n")
+    # Appending after the repair still lines up with the log
+    save_focus_data(sessions + [_session(7)])
+    assert load_focus_data() == sessions + [_session(7)]
+
+
+def test_legacy_json_is_migrated_into_the_log(data_dir):
+    legacy = [{"date": "2026-01-03T09:00:00", "duration": 50}, {"date": "2026-01-01T09:00:00", "duration": 25}]
+    (data_dir / "pacer_focus.json").write_text(json.dumps(legacy))
+    loaded = load_focus_data()
+    assert [s["date"] for s in loaded] == [datetime(2026, 1, 1, 9), datetime(2026, 1, 3, 9)]
+    assert len(_lines(data_dir)) == 1 + 2
+    assert (data_dir / "pacer_focus.json").exists()  # left in place
+
+
+def test_store_appends_one_line_per_session(data_dir):
+    store = PacerStore.load()
+    for i in range(3):
+        store.add_focus_session(_session(i))
+    assert len(_lines(data_dir)) == 1 + 3
+    assert PacerStore.load().focus_sessions == [_session(i) for i in range(3)]
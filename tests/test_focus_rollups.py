@@ -0,0 +1,64 @@
+import json
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from focus_rollups import FocusRollups
+from store import PacerStore
+
+
+def _sessions(n, seed=1):
+    rng = random.Random(seed)
+    sessions = []
+    for _ in range(n):
+        when = datetime(2025, 11, 1) + timedelta(hours=rng.randrange(24 * 200))
+        sessions.append({"date": rng.choice([when, when.isoformat()]), "duration": rng.choice([15, 25, 50]),
+                         "project_id": rng.choice(["a", "b", None])})
+    return sessions
+
+
+def test_rollups_match_brute_force():
+    sessions = _sessions(500)
+    rollups = FocusRollups.from_sessions(sessions)
+    by_day, by_month, by_project = defaultdict(int), defaultdict(int), defaultdict(int)
+    for s in sessions:
+        when = s["date"] if isinstance(s["date"], datetime) else datetime.fromisoformat(s["date"])
+        by_day[when.date()] += s["duration"]
+        by_month[(when.year, when.month)] += s["duration"]
+        by_project[s["project_id"]] += s["duration"]
+    assert rollups.sessions == 500
+    for day, minutes in by_day.items():
+        assert rollups.day_minutes(day) == minutes
+    for year in (2025, 2026):
+        assert rollups.month_minutes(year) == {m: by_month.get((year, m), 0) for m in range(1, 13)}
+    for pid, minutes in by_project.items():
+        assert rollups.project_minutes(pid) == minutes
+    assert rollups.day_minutes(date(2024, 1, 1)) == 0
+
+
+def test_undated_sessions_only_count_as_sessions():
+    rollups = FocusRollups.from_sessions([{"date": "not a date", "duration": 25}, {"duration": 25},
+                                          {"date": "2026-01-05T09:00:00", "duration": None}])
+    assert rollups.sessions == 3
+    assert rollups.by_day == {"2026-01-05": [0, 1]}
+
+
+def test_incremental_add_matches_rebuild_and_round_trips():
+    sessions = _sessions(200, seed=2)
+    rollups = FocusRollups.from_sessions(sessions[:150])
+    for s in sessions[150:]:
+        rollups.add(s)
+    rebuilt = FocusRollups.from_sessions(sessions)
+    assert rollups.to_dict() == rebuilt.to_dict()
+    # Persisted as JSON (the no-project bucket is stored under "")
+    restored = FocusRollups.from_dict(json.loads(json.dumps(rollups.to_dict())))
+    assert restored.to_dict() == rollups.to_dict()
+    assert restored.project_minutes(None) == rollups.project_minutes(None)
+
+
+def test_store_rebuilds_stale_persisted_rollups():
+    sessions = _sessions(10, seed=3)
+    current = FocusRollups.from_sessions(sessions).to_dict()
+    stale = FocusRollups.from_sessions(sessions[:9]).to_dict()
+    assert PacerStore([], [], sessions, [], [], focus_rollups=current).focus_rollups.to_dict() == current
+    assert PacerStore([], [], sessions, [], [], focus_rollups=stale).focus_rollups.to_dict() == current
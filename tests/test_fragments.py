@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+from streamlit.errors import StreamlitAPIException
+
+import fragments
+
+
+@pytest.fixture
+def st(monkeypatch):
+    """Just enough of streamlit for fragments.py: session state and a recorded st.rerun()."""
+    fake = SimpleNamespace(session_state={}, reruns=[], refuse=False)
+
+    def rerun(scope=None):
+        if scope is not None and fake.refuse:
+            raise StreamlitAPIException("fragment not registered")
+        fake.reruns.append(scope)
+
+    fake.rerun = rerun
+    monkeypatch.setattr(fragments, "st", fake)
+    return fake
+
+
+def _layout(revisions):
+    fragments.reset()
+    fragments.track("sidebar", revisions, "projects", "focus")
+    fragments.track("calendar", revisions, "projects")
+    fragments.track("journal", revisions, "journal")
+
+
+def test_stale_lists_fragments_whose_collections_moved(st):
+    revisions = {"projects": 1, "focus": 1, "journal": 1}
+    _layout(revisions)
+    assert fragments.stale(revisions) == []
+    revisions["focus"] += 1
+    assert fragments.stale(revisions) == ["sidebar"]
+    revisions["projects"] += 1
+    assert fragments.stale(revisions) == ["sidebar", "calendar"]
+    # Rendering again records the new revisions
+    fragments.track("calendar", revisions, "projects")
+    assert fragments.stale(revisions) == ["sidebar"]
+
+
+def test_invalidate_reruns_stale_and_named_fragments_once(st):
+    revisions = {"projects": 1, "focus": 1, "journal": 1}
+    _layout(revisions)
+    revisions["projects"] += 1
+    fragments.invalidate(revisions, "journal", "calendar", "not-rendered")
+    assert st.reruns == [["sidebar", "calendar", "journal"]]
+
+
+def test_nothing_to_rerun_leaves_the_default_rerun(st):
+    revisions = {"projects": 1, "focus": 1, "journal": 1}
+    _layout(revisions)
+    fragments.invalidate(revisions)
+    fragments.rerun("not-rendered")
+    assert st.reruns == []
+
+
+def test_untargetable_rerun_falls_back_to_full_app(st):
+    revisions = {"projects": 1, "focus": 1, "journal": 1}
+    _layout(revisions)
+    st.refuse = True
+    fragments.rerun("calendar")
+    assert st.reruns == [None]
+
+
+def test_reset_forgets_the_previous_layout(st):
+    revisions = {"projects": 1, "focus": 1, "journal": 1}
+    _layout(revisions)
+    fragments.reset()
+    revisions["projects"] += 1
+    assert fragments.stale(revisions) == []
@@ -0,0 +1,65 @@
+from store import fingerprint, merge3
+
+
+def _key(item):
+    return item["id"]
+
+
+def _base(*items):
+    return {item["id"]: fingerprint(item) for item in items}
+
+
+A = {"id": "a", "goal": "A"}
+B = {"id": "b", "goal": "B"}
+C = {"id": "c", "goal": "C"}
+
+
+def test_unchanged_on_both_sides():
+    assert merge3(_base(A, B), [A, B], [A, B], _key) == ([A, B], [])
+
+
+def test_change_on_one_side_wins():
+    ours = {**A, "goal": "ours"}
+    theirs = {**B, "goal": "theirs"}
+    merged, conflicts = merge3(_base(A, B), [ours, B], [A, theirs], _key)
+    assert merged == [ours, theirs]
+    assert conflicts == []
+
+
+def test_same_change_on_both_sides_is_not_a_conflict():
+    edit = {**A, "goal": "same"}
+    assert merge3(_base(A), [edit], [dict(edit)], _key) == ([edit], [])
+
+
+def test_conflicting_changes_keep_disk_version():
+    ours, theirs = {**A, "goal": "ours"}, {**A, "goal": "theirs"}
+    assert merge3(_base(A), [ours], [theirs], _key) == ([theirs], ["a"])
+
+
+def test_additions_from_both_sides_disk_order_first():
+    merged, conflicts = merge3(_base(A), [A, C], [B, A], _key)
+    assert merged == [B, A, C]
+    assert conflicts == []
+
+
+def test_deletions_on_either_side():
+    # Deleted by us, untouched on disk -> gone; deleted on disk, untouched by us -> gone
+    assert merge3(_base(A, B), [B], [A, B], _key) == ([B], [])
+    assert merge3(_base(A, B), [A, B], [A], _key) == ([A], [])
+
+
+def test_delete_against_edit_is_a_conflict_and_disk_wins():
+    edited = {**A, "goal": "edited"}
+    # We deleted it, disk edited it: the edit survives
+    assert merge3(_base(A), [], [edited], _key) == ([edited], ["a"])
+    # We edited it, disk deleted it: stays deleted
+    assert merge3(_base(A), [edited], [], _key) == ([], ["a"])
+
+
+def test_content_keyed_collections():
+    # Focus sessions, tags and journal entries are matched by content (see MERGE_KEYS)
+    s1, s2, s3 = {"duration": 25}, {"duration": 50}, {"duration": 15}
+    base = {fingerprint(s): fingerprint(s) for s in (s1, s2)}
+    merged, conflicts = merge3(base, [s1, s2, s3], [s1], fingerprint)
+    assert merged == [s1, s3]
+    assert conflicts == []
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import persistence
+from conftest import make_projects
+from store import PacerStore
+
+
+@pytest.fixture
+def good(data_dir):
+    """A good snapshot of p0..p2, then replaced by whatever the test writes (it becomes .1)."""
+    persistence.save_data(make_projects(3))
+    return data_dir
+
+
+def _snapshot(data_dir, suffix=""):
+    return (data_dir / f"pacer_store.json{suffix}").read_text()
+
+
+def _ids(projects):
+    return sorted(p.id for p in projects)
+
+
+@pytest.mark.parametrize("bad", [
+    "{not json",
+    "",
+    json.dumps({"schema": persistence.SCHEMA_VERSION, "projects": [{"id": "x", "start_date": "soon"}], "deleted": []}),
+])
+def test_corrupt_snapshot_is_recovered_and_replaced(good, bad):
+    persistence.atomic_write(persistence.DATA_FILE, bad)  # the good file moves to .1
+    projects, deleted = persistence.load_data()
+    assert _ids(projects) == ["p0", "p1", "p2"]
+    # The recovered data is the snapshot again; the bad file was rotated out to .1
+    assert sorted(p["id"] for p in json.loads(_snapshot(good))["projects"]) == ["p0", "p1", "p2"]
+    assert _snapshot(good, ".1") == bad
+    # Loading again needs no recovery
+    persistence.load_data()
+    assert _snapshot(good, ".1") == bad
+
+
+def test_recovery_replays_the_log_on_the_older_generation(good):
+    store = PacerStore.load()
+    p = store.get_project("p1")
+    p.goal = "Logged edit"
+    store.commit_project(p)
+    persistence.atomic_write(persistence.DATA_FILE, "{torn")
+    projects, _ = persistence.load_data()
+    assert {p.id: p.goal for p in projects}["p1"] == "Logged edit"
+
+
+def test_nothing_readable_raises_instead_of_loading_empty(good):
+    persistence.atomic_write(persistence.DATA_FILE, "{torn")
+    (good / "pacer_store.json.1").write_text("[")
+    with pytest.raises(RuntimeError, match="No readable project store"):
+        persistence.load_data()
+    with pytest.raises(RuntimeError):
+        PacerStore.load()
+    # The unreadable files are left for manual repair
+    assert _snapshot(good) == "{torn"
+
+
+def test_compaction_recovers_too(good):
+    store = PacerStore.load()
+    p = store.get_project("p2")
+    p.goal = "Before compaction"
+    store.commit_project(p)
+    persistence.atomic_write(persistence.DATA_FILE, "{torn")
+    persistence.compact_log()
+    assert not (good / "pacer_store.json.log").exists()
+    projects, _ = persistence.load_data()
+    assert {p.id: p.goal for p in projects} == {"p0": "p0", "p1": "p1", "p2": "Before compaction"}
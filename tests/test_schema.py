@@ -0,0 +1,142 @@
+import os
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import persistence
+import sqlite_store
+from persistence import SCHEMA_VERSION, load_versioned, schema_of, upgrade
+
+
+@pytest.fixture
+def journal_file(tmp_path, monkeypatch):
+    path = tmp_path / "pacer_journal.json"
+    monkeypatch.setattr(persistence, "JOURNAL_FILE", str(path))
+    return path
+
+
+def test_schema_of():
+    assert schema_of([1, 2]) == 1
+    assert schema_of({"tags": []}) == 1
+    assert schema_of({"schema": 2, "tags": []}) == 2
+
+
+def test_upgrade_runs_each_step_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(persistence, "SCHEMA_VERSION", 3)
+    monkeypatch.setitem(persistence.MIGRATIONS, ("demo", 1), lambda d: calls.append(1) or {"items": d})
+    monkeypatch.setitem(persistence.MIGRATIONS, ("demo", 2), lambda d: calls.append(2) or {**d, "extra": True})
+    assert upgrade("demo", ["a"]) == {"items": ["a"], "extra": True, "schema": 3}
+    assert calls == [1, 2]
+    # Already current: untouched
+    assert upgrade("demo", {"schema": 3, "items": []}) == {"schema": 3, "items": []}
+    assert calls == [1, 2]
+
+
+def test_upgrade_refuses_newer_schema():
+    with pytest.raises(RuntimeError):
+        upgrade("tags", {"schema": SCHEMA_VERSION + 1, "tags": []})
+
+
+def test_store_migration_normalises_dates():
+    data = upgrade("store", [{"id": "p1", "goal": "G", "start_date": "2026-01-02 03:04:05",
+                              "end_date": "2026-01-09T00:00:00", "tasks": [{"task": "t", "completed": 1}]}])
+    assert data["schema"] == SCHEMA_VERSION
+    assert data["deleted"] == []
+    (project,) = data["projects"]
+    assert project["start_date"] == "2026-01-02T03:04:05"
+    assert project["tasks"][0]["completed"] is True
+
+
+def test_journal_migration_keeps_unreadable_dates():
+    data = upgrade("journal", [{"id": "a", "date": "2026-01-02 03:04:05"}, {"id": "b", "date": "someday"}])
+    a, b = data["entries"]
+    assert a["date"] == "2026-01-02T03:04:05"
+    assert b["date"] is None and b["unparsed_date"] == "someday"
+
+
+def test_load_versioned_missing_file_returns_default(tmp_path):
+    assert load_versioned(str(tmp_path / "none.json"), "tags", {"tags": ["x"]}) == {"tags": ["x"]}
+
+
+def test_load_versioned_rewrites_old_file_once(tmp_path):
+    path = tmp_path / "pacer_tags.json"
+    path.write_text(json.dumps(["Work", "Home"]))
+    written = []
+    data = load_versioned(str(path), "tags", None, written.append)
+    assert data == {"schema": SCHEMA_VERSION, "tags": ["Work", "Home"]}
+    assert written == [data]
+    # A current file is parsed as is and never rewritten
+    path.write_text(json.dumps(data))
+    assert load_versioned(str(path), "tags", None, written.append) == data
+    assert len(written) == 1
+
+
+def test_load_versioned_without_rewrite_leaves_file(tmp_path):
+    path = tmp_path / "pacer_tags.json"
+    path.write_text(json.dumps(["Work"]))
+    assert load_versioned(str(path), "tags", None)["tags"] == ["Work"]
+    assert json.loads(path.read_text()) == ["Work"]
+
+
+def test_load_versioned_falls_back_to_older_generation(tmp_path):
+    path = tmp_path / "pacer_tags.json"
+    path.write_text("{not json")
+    (tmp_path / "pacer_tags.json.1").write_text(json.dumps({"schema": SCHEMA_VERSION, "tags": ["Old"]}))
+    assert load_versioned(str(path), "tags", None)["tags"] == ["Old"]
+
+
+def test_old_journal_is_upgraded_on_disk_once(journal_file):
+    journal_file.write_text(json.dumps([{"id": "a", "date": "2026-01-02T03:04:05", "content": "hi"}]))
+    (entry,) = persistence.load_journal()
+    assert entry["date"] == datetime(2026, 1, 2, 3, 4, 5)
+    assert json.loads(journal_file.read_text())["schema"] == SCHEMA_VERSION
+    # The pre-upgrade file stays behind as generation .1
+    assert json.loads((journal_file.parent / "pacer_journal.json.1").read_text())[0]["id"] == "a"
+
+
+def test_current_journal_is_not_rewritten(journal_file):
+    persistence.save_journal([{"id": "a", "date": datetime(2026, 1, 2), "content": "hi"}])
+    before = journal_file.stat().st_mtime_ns
+    persistence.load_journal()
+    assert journal_file.stat().st_mtime_ns == before
+    assert not (journal_file.parent / "pacer_journal.json.1").exists()
+
+
+def test_shipped_journal_fixture_is_current():
+    with open(os.path.join(os.path.dirname(persistence.__file__), "pacer_journal.json")) as f:
+        assert schema_of(json.load(f)) == SCHEMA_VERSION
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    path = tmp_path / "pacer_store.db"
+    monkeypatch.setattr(sqlite_store, "DB_FILE", str(path))
+    monkeypatch.setattr(sqlite_store, "_conn", None)
+    yield path
+    if sqlite_store._conn is not None:
+        sqlite_store._conn.close()
+
+
+def _legacy_db(path, version=0):
+    conn = sqlite3.connect(path)
+    conn.executescript(sqlite_store.SCHEMA)
+    conn.execute("INSERT INTO projects (id, goal, start_date, created_at) VALUES ('p1', 'G', '2026-01-02 03:04:05', 'garbage')")
+    conn.execute(f"PRAGMA user_version = {version}")
+    conn.commit()
+    conn.close()
+
+
+def test_sqlite_db_is_upgraded_in_place(db_file):
+    _legacy_db(db_file)
+    conn = sqlite_store._connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute("SELECT start_date, created_at FROM projects").fetchone() == ("2026-01-02T03:04:05", "garbage")
+
+
+def test_sqlite_db_from_newer_version_is_refused(db_file):
+    _legacy_db(db_file, SCHEMA_VERSION + 1)
+    with pytest.raises(RuntimeError):
+        sqlite_store._connect()
@@ -0,0 +1,89 @@
+import random
+
+from conftest import make_project
+from search_index import SearchIndex, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Write the Report, v2!") == ["write", "the", "report", "v2"]
+    assert tokenize("学习Python") == ["学习", "python"]
+    assert tokenize("学习计划") == ["学习", "习计", "计划"]
+    assert tokenize("学") == ["学"]
+    assert tokenize("Café_au lait") == ["café", "au", "lait"]
+    assert tokenize(None) == [] and tokenize("") == []
+
+
+def test_prefix_and_all_tokens_must_match():
+    index = SearchIndex([make_project("a", goal="Quarterly report"), make_project("b", goal="Report card"),
+                         make_project("c", goal="学习计划")])
+    assert sorted(index.search("rep")) == ["a", "b"]
+    assert index.search("quart rep") == ["a"]
+    assert index.search("quart card") == []
+    assert index.search("学") == ["c"]
+    assert index.search("计划") == ["c"]
+    assert index.search("   ") == []
+
+
+def test_goal_hits_rank_above_task_hits():
+    index = SearchIndex([make_project("task", goal="Chores", tasks=["garden"]), make_project("goal", goal="Garden")])
+    assert index.search("garden") == ["goal", "task"]
+    assert index.search("garden", limit=1) == ["goal"]
+
+
+def test_checkpoints_rewards_and_journal_are_searchable():
+    journal = [{"id": "j1", "content": "felt great about the marathon", "project_id": "a"},
+               {"id": "j2", "content": "marathon without a project", "project_id": None}]
+    index = SearchIndex([make_project("a", goal="Run", tasks=["stretch"], reward="ice cream")], journal)
+    assert index.search("stretch") == ["a"]
+    assert index.search("ice") == ["a"]
+    # Journal hits count for their project; an entry without one never shows up
+    assert index.search("marathon") == ["a"]
+    index.remove_journal(journal[0])
+    assert index.search("marathon") == []
+
+
+def test_reindex_and_remove_leave_no_stale_terms():
+    p = make_project("a", goal="Old title", tasks=["alpha"])
+    index = SearchIndex([p])
+    p.goal = "New title"
+    index.index_project(p)
+    assert index.search("old") == []
+    assert index.search("new") == ["a"]
+    index.remove_project("a")
+    assert index.search("title") == []
+    assert len(index) == 0
+    assert index._terms == [] and index._postings == {}
+
+
+def test_reset_replaces_documents():
+    index = SearchIndex([make_project("a", goal="Alpha")], [{"id": "j", "content": "alpha notes", "project_id": "a"}])
+    index.reset_projects([make_project("b", goal="Beta")])
+    assert index.search("beta") == ["b"]
+    # The journal entry still counts for "a" until the journal is reset too
+    assert index.search("alpha") == ["a"]
+    index.reset_journal([])
+    assert index.search("alpha") == []
+
+
+def test_matches_brute_force_under_random_edits():
+    rng = random.Random(11)
+    words = ["plan", "planet", "report", "run", "running", "read", "学习", "计划", "garden", "gold"]
+    projects = {}
+    index = SearchIndex()
+    for step in range(600):
+        pid = f"p{rng.randrange(40)}"
+        if pid in projects and rng.random() < 0.25:
+            del projects[pid]
+            index.remove_project(pid)
+        else:
+            p = projects[pid] = make_project(pid, goal=" ".join(rng.sample(words, 2)),
+                                         tasks=[rng.choice(words)], reward=rng.choice(words + [None]))
+            index.index_project(p)
+        if step % 25 == 0:
+            for query in ("pla", "run", "re g", "学", "gold plan", "zzz"):
+                expected = set()
+                for p in projects.values():
+                    terms = set(tokenize(p.goal)) | set(tokenize(p.reward)) | {w for t in p.tasks for w in tokenize(t.label)}
+                    if all(any(term.startswith(tok) for term in terms) for tok in tokenize(query)):
+                        expected.add(p.id)
+                assert set(index.search(query)) == expected
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+import pytest
+
+import persistence
+import sqlite_store
+from conftest import BASE_DAY, make_project, make_projects
+from models import Project, Task
+
+
+def _reopen(monkeypatch):
+    """Drop the connection and the cached rows, as a new process would start."""
+    sqlite_store._conn.close()
+    monkeypatch.setattr(sqlite_store, "_conn", None)
+    monkeypatch.setattr(sqlite_store, "_rows", {table: {} for table in sqlite_store._rows})
+
+
+@pytest.fixture
+def rich(data_dir):
+    """A project using every stored field, plus a binned one."""
+    p = make_project("rich", tags=["Work", "Home"], reward="Cake", done=1, total=3)
+    p.tasks[0].extra = {"note": "first"}
+    p.extra = {"status": "In Progress", "description": "Extra keys ride along"}
+    gone = make_project("gone")
+    gone.deleted_at = BASE_DAY + timedelta(days=4)
+    return [p, make_project("plain")], [gone]
+
+
+def test_projects_round_trip_every_field(rich, monkeypatch):
+    projects, deleted = rich
+    sqlite_store.save_data(projects, deleted)
+    _reopen(monkeypatch)
+    loaded, loaded_deleted = sqlite_store.load_data()
+    assert [p.to_dict() for p in loaded] == [p.to_dict() for p in projects]
+    assert [p.to_dict() for p in loaded_deleted] == [p.to_dict() for p in deleted]
+
+
+def test_full_diff_writes_only_the_changed_rows(rich):
+    projects, deleted = rich
+    sqlite_store.save_data(projects, deleted)
+    assert sqlite_store.save_data(projects, deleted) == 0
+    projects[1].goal = "Renamed"
+    row = sqlite_store._project_row(projects[1].to_dict())
+    assert sqlite_store.save_data(projects, deleted) == sqlite_store._row_bytes(row)
+    # Ticking a checkpoint rewrites that task row only
+    projects[0].set_task_completed(projects[0].tasks[1], True)
+    task = sqlite_store._task_rows(projects[0].to_dict())[1]
+    assert sqlite_store.save_data(projects, deleted) == sqlite_store._row_bytes(task)
+
+
+def test_removed_tasks_and_projects_are_deleted(rich, monkeypatch):
+    projects, deleted = rich
+    sqlite_store.save_data(projects, deleted)
+    projects[0].remove_task(2)
+    sqlite_store.save_data(projects[:1], [])
+    _reopen(monkeypatch)
+    loaded, loaded_deleted = sqlite_store.load_data()
+    assert [p.id for p in loaded] == ["rich"] and loaded_deleted == []
+    assert [t.task for t in loaded[0].tasks] == ["t0", "t1"]
+    assert sqlite_store._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 2
+
+
+def test_list_order_survives_updates(data_dir, monkeypatch):
+    projects = make_projects(5)
+    sqlite_store.save_data(projects)
+    projects[0].goal = "Updated in place"
+    sqlite_store.save_data(projects)
+    _reopen(monkeypatch)
+    assert [p.id for p in sqlite_store.load_data()[0]] == [f"p{i}" for i in range(5)]
+
+
+def test_other_collections_round_trip(data_dir, monkeypatch):
+    sessions = [{"date": BASE_DAY + timedelta(hours=i), "duration": 25, "project_id": "p0"} for i in range(3)]
+    journal = [{"id": "j1", "date": BASE_DAY, "content": "Notes", "project_name": "Goal", "project_id": "p0"}]
+    sqlite_store.save_focus_data(sessions)
+    sqlite_store.save_tags(["Work", "Home"])
+    sqlite_store.save_journal(journal)
+    sqlite_store.write_revision(7)
+    # Renaming one tag rewrites its position row only
+    assert sqlite_store.save_tags(["Job", "Home"]) == sqlite_store._row_bytes((0, "Job"))
+    _reopen(monkeypatch)
+    assert sqlite_store.load_focus_data() == sessions
+    assert sqlite_store.load_tags() == ["Job", "Home"]
+    assert sqlite_store.load_journal() == journal
+    assert sqlite_store.read_revision() == 7
+
+
+def test_new_database_imports_the_json_store(data_dir):
+    projects = [make_project("a", tags=["Work"]), Project("b", "Second", BASE_DAY, BASE_DAY + timedelta(days=3),
+                                                         tasks=[Task("only", True)])]
+    persistence.save_data(projects, [make_project("binned")])
+    persistence.save_tags(["Work"])
+    persistence.save_focus_data([{"date": BASE_DAY, "duration": 50, "project_id": "a"}])
+    loaded, deleted = sqlite_store.load_data()  # first connect creates the database
+    assert [p.to_dict() for p in loaded] == [p.to_dict() for p in projects]
+    assert [p.id for p in deleted] == ["binned"]
+    assert sqlite_store.load_tags() == ["Work"]
+    assert sqlite_store.load_focus_data() == [{"date": BASE_DAY, "duration": 50, "project_id": "a"}]
+    # The JSON files are left as they were
+    assert [p.id for p in persistence.load_data()[0]] == ["a", "b"]
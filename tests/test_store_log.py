@@ -0,0 +1,152 @@
+import json
+import os
+
+import pytest
+
+import persistence
+import sqlite_store
+from conftest import make_project, make_projects
+from store import PacerStore
+
+
+def _log_ops(data_dir):
+    path = data_dir / "pacer_store.json.log"
+    if not path.exists():
+        return []
+    return [op for line in path.read_text().splitlines() for op in json.loads(line)["ops"]]
+
+
+def _disk(data_dir):
+    """Snapshot plus replayed log, as {collection: {id: goal}}."""
+    projects, deleted = persistence.load_data()
+    return {"projects": {p.id: p.goal for p in projects}, "deleted": {p.id: p.goal for p in deleted}}
+
+
+def _memory(store):
+    return {"projects": {p.id: p.goal for p in store.projects}, "deleted": {p.id: p.goal for p in store.deleted}}
+
+
+@pytest.fixture
+def loaded(data_dir):
+    """A store saved to data_dir (first save: full snapshot) and loaded back, as the app does."""
+    persistence.save_data(make_projects(50))
+    return PacerStore.load()
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    """Ids of the projects JSON-encoded for the store file."""
+    seen = []
+    encode = persistence._encode
+    monkeypatch.setattr(persistence, "_encode", lambda p: seen.append(p.id) or encode(p))
+    return seen
+
+
+def test_save_appends_only_the_changed_project(data_dir, loaded, encodes):
+    snapshot = (data_dir / "pacer_store.json").read_text()
+    p = loaded.get_project("p7")
+    p.goal = "Renamed"
+    loaded.commit_project(p)
+    assert encodes == ["p7"]
+    assert [(op["op"], op["id"]) for op in _log_ops(data_dir)] == [("put", "p7")]
+    # The snapshot is left alone; the log carries the change
+    assert (data_dir / "pacer_store.json").read_text() == snapshot
+    assert _disk(data_dir) == _memory(loaded)
+
+
+def test_bin_restore_purge_and_add_replay(data_dir, loaded, encodes):
+    loaded.bin_project("p1", persistence.datetime(2026, 2, 1))
+    loaded.bin_project("p2", persistence.datetime(2026, 2, 1))
+    loaded.restore_project("p1")
+    loaded.purge_project("p2")
+    loaded.add_project(make_project("new"))
+    assert sorted(set(encodes)) == ["new", "p1", "p2"]
+    assert [(op["op"], op["coll"], op["id"]) for op in _log_ops(data_dir)][-2:] == [
+        ("del", "deleted", "p2"), ("put", "projects", "new")]
+    assert _disk(data_dir) == _memory(loaded)
+    assert "p2" not in _disk(data_dir)["deleted"]
+
+
+def test_unknown_ids_fall_back_to_a_full_diff(data_dir, loaded, encodes):
+    loaded.get_project("p3").goal = "Edited without ids"
+    loaded.commit("projects")
+    assert len(encodes) == len(loaded.projects)
+    assert [op["id"] for op in _log_ops(data_dir)] == ["p3"]
+
+
+def test_unchanged_save_writes_nothing(data_dir, loaded):
+    loaded.commit("projects", ids=["p4"])
+    assert _log_ops(data_dir) == []
+
+
+def test_torn_last_log_line_is_skipped(data_dir, loaded):
+    p = loaded.get_project("p5")
+    p.goal = "Kept"
+    loaded.commit_project(p)
+    with open(data_dir / "pacer_store.json.log", "a") as f:
+        f.write('{"ts": 1, "schema": 2, "ops": [{"op": "del", "coll": "projects", "id": "p6"')
+    disk = _disk(data_dir)
+    assert disk["projects"]["p5"] == "Kept"
+    assert "p6" in disk["projects"]
+
+
+def test_compaction_folds_the_log_into_the_snapshot(data_dir, loaded):
+    for i in range(5):
+        p = loaded.get_project(f"p{i}")
+        p.goal = f"Goal {i}!"
+        loaded.commit_project(p)
+    loaded.bin_project("p9", persistence.datetime(2026, 2, 1))
+    before = _disk(data_dir)
+    persistence.compact_log()
+    assert not (data_dir / "pacer_store.json.log").exists()
+    assert not (data_dir / "pacer_store.json.log.compacting").exists()
+    assert _disk(data_dir) == before == _memory(loaded)
+    # Saves after a compaction start a new log
+    p = loaded.get_project("p0")
+    p.goal = "After"
+    loaded.commit_project(p)
+    assert [op["id"] for op in _log_ops(data_dir)] == ["p0"]
+
+
+def test_interrupted_compaction_is_finished(data_dir, loaded):
+    p = loaded.get_project("p1")
+    p.goal = "In the pending log"
+    loaded.commit_project(p)
+    os.replace(data_dir / "pacer_store.json.log", data_dir / "pacer_store.json.log.compacting")
+    p = loaded.get_project("p2")
+    p.goal = "In the live log"
+    loaded.commit_project(p)
+    assert _disk(data_dir) == _memory(loaded)
+    persistence.compact_log()
+    assert not (data_dir / "pacer_store.json.log.compacting").exists()
+    assert _disk(data_dir) == _memory(loaded)
+
+
+def test_log_size_threshold_starts_background_compaction(data_dir, loaded, monkeypatch):
+    monkeypatch.setattr(persistence, "LOG_COMPACT_BYTES", 1)
+    p = loaded.get_project("p1")
+    p.goal = "Triggers compaction"
+    loaded.commit_project(p)
+    persistence._compactor.join()
+    assert not (data_dir / "pacer_store.json.log").exists()
+    assert _disk(data_dir) == _memory(loaded)
+
+
+def test_sqlite_save_rebuilds_only_the_changed_rows(data_dir, monkeypatch):
+    sqlite_store.save_data(make_projects(30, total=3), [])
+    built = []
+    row = sqlite_store._project_row
+    monkeypatch.setattr(sqlite_store, "_project_row", lambda p, deleted=False: built.append(p["id"]) or row(p, deleted))
+    projects, deleted = sqlite_store.load_data()
+    p = next(p for p in projects if p.id == "p4")
+    p.remove_task(0)
+    moved = projects.pop(projects.index(next(p for p in projects if p.id == "p5")))
+    deleted.append(moved)
+    sqlite_store.save_data(projects, deleted, ids=["p4", "p5"])
+    assert sorted(built) == ["p4", "p5"]
+    loaded_projects, loaded_deleted = sqlite_store.load_data()
+    assert [p.id for p in loaded_deleted] == ["p5"]
+    assert len(next(p for p in loaded_projects if p.id == "p4").tasks) == 2
+    assert [p.to_dict() for p in loaded_projects] == [p.to_dict() for p in projects]
+    # A full diff afterwards finds nothing left to write
+    assert sqlite_store.save_data(projects, deleted) == 0
@@ -0,0 +1,81 @@
+import pytest
+
+import persistence
+from conftest import BASE_DAY, make_project
+from store import PacerStore
+from tag_index import TagIndex
+
+
+@pytest.fixture
+def store(data_dir):
+    persistence.save_data([make_project("a", tags=["Work", "Home"]), make_project("b", tags=["Work"]),
+                           make_project("c", tags=["Side"])],
+                          [make_project("binned", tags=["Work"])])
+    persistence.save_tags(["Work", "Home", "Side"])
+    return PacerStore.load()
+
+
+def _ids(store, tag):
+    return {p.id for p in store.projects_tagged(tag)}
+
+
+def test_index_add_update_remove():
+    a, b = make_project("a", tags=["Work"]), make_project("b", tags=["Work", "Home"])
+    index = TagIndex([a, b])
+    assert index.ids("Work") == {"a", "b"} and index.counts() == {"Work": 2, "Home": 1}
+    a.tags = ["Home"]
+    index.update(a)
+    assert index.ids("Work") == {"b"} and index.ids("Home") == {"a", "b"}
+    index.remove("b")
+    assert index.counts() == {"Home": 1}
+    assert index.matching("om") == {"a"}
+
+
+def test_rename_moves_live_projects_and_persists(store, monkeypatch):
+    encoded = []
+    encode = persistence._encode
+    monkeypatch.setattr(persistence, "_encode", lambda p: encoded.append(p.id) or encode(p))
+    store.rename_tag("Work", "Job")
+    assert _ids(store, "Job") == {"a", "b"} and _ids(store, "Work") == set()
+    assert store.tag_index.counts() == {"Job": 2, "Home": 1, "Side": 1}
+    assert sorted(encoded) == ["a", "b"]  # only the projects that carried the tag
+    reloaded = PacerStore.load()
+    assert reloaded.tags == ["Job", "Home", "Side"]
+    assert _ids(reloaded, "Job") == {"a", "b"}
+    # Binned projects keep their tags as they were
+    assert reloaded.deleted.get("binned").tags == ["Work"]
+
+
+def test_rename_onto_an_existing_tag_is_refused(store):
+    store.rename_tag("Work", "Home")
+    assert store.tags == ["Work", "Home", "Side"]
+    assert _ids(store, "Work") == {"a", "b"}
+
+
+def test_delete_untags_live_projects_and_persists(store):
+    store.delete_tag("Work")
+    assert _ids(store, "Work") == set() and "Work" not in store.tag_index.counts()
+    assert store.get_project("a").tags == ["Home"] and store.get_project("b").tags == []
+    reloaded = PacerStore.load()
+    assert reloaded.tags == ["Home", "Side"]
+    assert reloaded.get_project("a").tags == ["Home"]
+
+
+def test_bin_restore_and_retag_keep_the_index_in_step(store):
+    store.bin_project("a", BASE_DAY)
+    assert _ids(store, "Home") == set() and _ids(store, "Work") == {"b"}
+    store.restore_project("a")
+    assert _ids(store, "Home") == {"a"} and _ids(store, "Work") == {"a", "b"}
+    store.set_project_tags(store.get_project("c"), ["Work"])
+    assert _ids(store, "Work") == {"a", "b", "c"} and _ids(store, "Side") == set()
+    # A restored binned project is indexed under its tags too
+    store.restore_project("binned")
+    assert "binned" in _ids(store, "Work")
+
+
+def test_merge_with_another_workers_rename_reindexes(store):
+    other = PacerStore.load()
+    other.rename_tag("Work", "Job")
+    store.add_project(make_project("d", tags=["Side"]))  # this save merges the rename from disk
+    assert _ids(store, "Job") == {"a", "b"} and _ids(store, "Work") == set()
+    assert _ids(store, "Side") == {"c", "d"}
@@ -0,0 +1,89 @@
+import atexit
+import threading
+
+import pytest
+
+import persistence
+import store as store_module
+from conftest import make_project, make_projects
+from store import PacerStore, WriteBehindSaver
+
+
+@pytest.fixture
+def saver(data_dir, monkeypatch):
+    """A write-behind saver with a short window, installed as the process-wide one."""
+    saver = WriteBehindSaver(50)
+    monkeypatch.setattr(store_module, "WRITE_BEHIND_MS", 50)
+    monkeypatch.setattr(store_module, "_saver", saver)
+    yield saver
+    saver.close()
+
+
+class SlowStore:
+    """Stand-in store whose flush blocks until released, to catch a flush in flight."""
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.flushes = 0
+
+    def flush(self):
+        self.started.set()
+        self.release.wait(5)
+        self.flushes += 1
+
+
+def test_a_burst_of_saves_is_one_flush(saver):
+    persistence.save_data(make_projects(3))
+    store = PacerStore.load()
+    for i in range(20):
+        store.get_project("p0").goal = f"goal {i}"
+        assert store.commit("projects", ids=["p0"]) is None  # handed to the saver, not written yet
+    saver.close()
+    assert store.save_totals["saves"] == 1
+    assert {p.id: p.goal for p in persistence.load_data()[0]}["p0"] == "goal 19"
+
+
+def test_close_waits_for_the_flush_in_flight(saver):
+    slow = SlowStore()
+    saver.schedule(slow)
+    assert slow.started.wait(5)
+    # The background thread already took the store, so flush_all() alone would not see it
+    threading.Timer(0.1, slow.release.set).start()
+    saver.close()
+    assert slow.flushes == 1
+
+
+def test_close_flushes_what_is_still_pending(data_dir):
+    saver = WriteBehindSaver(60_000)  # the window never ends on its own
+    atexit.unregister(saver.close)  # its thread is still asleep at exit; it is a daemon, let it go
+    persistence.save_data(make_projects(1))
+    store = PacerStore.load()
+    store.add_project(make_project("new"))
+    saver.schedule(store)
+    saver.close(timeout=0.1)
+    assert "new" in {p.id for p in persistence.load_data()[0]}
+
+
+def test_save_after_close_writes_synchronously(saver):
+    persistence.save_data(make_projects(1))
+    store = PacerStore.load()
+    saver.close()
+    store.add_project(make_project("late"))
+    assert "late" in {p.id for p in persistence.load_data()[0]}
+
+
+def test_failed_flush_is_retried(saver, monkeypatch):
+    persistence.save_data(make_projects(1))
+    store = PacerStore.load()
+    flush, calls = store.flush, []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("collection changed size during iteration")
+        return flush()
+    monkeypatch.setattr(store, "flush", flaky)
+    store.add_project(make_project("new"))
+    saver.close()
+    assert len(calls) == 2
+    assert "new" in {p.id for p in persistence.load_data()[0]}